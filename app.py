@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
-from io import StringIO
-import sys
+import numpy as np
 import os
 import json
 from datetime import datetime
@@ -25,8 +24,9 @@ if not os.path.exists('score/__init__.py'):
     with open('score/__init__.py', 'w') as f:
         f.write('from .scorer import PropertyScorer\n\n__all__ = [\'PropertyScorer\']')
 
-# Import PropertyScorer
-from score.scorer import PropertyScorer
+# Import the scorer cache and the lazy trace view
+from score.memo import ScorerCache
+from score.trace import TraceView, new_trace
 
 # Set page title
 st.title("PropertyScorer Experiment UI")
@@ -35,6 +35,14 @@ st.title("PropertyScorer Experiment UI")
 if 'history' not in st.session_state:
     st.session_state.history = []
 
+# Compiled scorers, reused when a configuration comes back
+if 'scorer_cache' not in st.session_state:
+    st.session_state.scorer_cache = ScorerCache()
+
+def keep_results():
+    """Opening a verbose expander reruns the page; keep showing the last run."""
+    st.session_state.keep_results = True
+
 # Create sidebar for property toggling
 st.sidebar.header("Property Selection")
 st.sidebar.write("Toggle which properties to include in the experiment:")
@@ -260,27 +268,18 @@ with tab2:
             qualities_data[property_name][prop] = data["quality"]
 
 with tab3:
-    # Function to capture print output
-    def capture_output(func, *args, **kwargs):
-        old_stdout = sys.stdout
-        sys.stdout = mystdout = StringIO()
-        
-        result = func(*args, **kwargs)
-        
-        sys.stdout = old_stdout
-        return result, mystdout.getvalue()
-
     # Run calculation button
     st.header("Run Calculation")
     
-    if st.button("Run Calculation"):
+    run = st.button("Run Calculation")
+    if run:
         # Format profile for PropertyScorer
         formatted_profile = {}
         for prop, config in profile.items():
             formatted_profile[prop] = config
 
-        # Create scorer
-        scorer = PropertyScorer(
+        # Create scorer (or reuse the one compiled for this configuration)
+        scorer = st.session_state.scorer_cache.scorer(
             formatted_profile,
             must_have_tolerance=must_have_tolerance,
             margin_epsilon=margin_epsilon,
@@ -290,20 +289,18 @@ with tab3:
         
         # Run calculations
         results = {}
-        verbose_outputs = {}
         
-        for name, raw in properties_data.items():
+        traces = new_trace(len(properties_data), len(scorer.plan))
+        for i, (name, raw) in enumerate(properties_data.items()):
             qual = qualities_data[name]
             
-            # Run without verbose
-            score = scorer.score_property(raw, qual, verbose=False)
+            # Score once, recording the per-factor trace
+            score = scorer.score_property(raw, qual, trace=traces[i])
             results[name] = score
-            
-            # Run with verbose
-            _, verbose_output = capture_output(
-                scorer.score_property, raw, qual, verbose=True
-            )
-            verbose_outputs[name] = verbose_output
+        
+        # Trace text is formatted only when an expander is opened
+        verbose_outputs = TraceView(list(results), traces, scorer.plan.keys,
+                                    np.array(list(results.values())))
         
         # Store in history
         st.session_state.history.append({
@@ -317,7 +314,7 @@ with tab3:
                 "quality_floor": quality_floor
             },
             "results": results.copy(),
-            "verbose_outputs": verbose_outputs.copy(),
+            "verbose_outputs": verbose_outputs,
             "active_props": {
                 "walk_dist": use_walk_dist,
                 "walk_time": use_walk_time, 
@@ -325,6 +322,13 @@ with tab3:
                 "drive_time": use_drive_time
             }
         })
+    
+    # Toggling a verbose expander reruns the page without the button;
+    # keep_results shows the same run again
+    if run or st.session_state.pop("keep_results", False):
+        run_num = len(st.session_state.history)
+        results = st.session_state.history[-1]["results"]
+        verbose_outputs = st.session_state.history[-1]["verbose_outputs"]
         
         # Display results
         st.header("Results")
@@ -335,11 +339,14 @@ with tab3:
         
         st.dataframe(results_df, hide_index=True)
         
-        # Show verbose outputs in expanders
+        # Show verbose outputs in expanders, formatted only once opened
         st.subheader("Verbose Output")
-        for name, verbose in verbose_outputs.items():
-            with st.expander(f"Property {name} verbose output"):
-                st.text(verbose)
+        for name in verbose_outputs:
+            expander = st.expander(f"Property {name} verbose output",
+                                   key=f"verbose_{run_num}_{name}", on_change=keep_results)
+            with expander:
+                if expander.open:
+                    st.text(verbose_outputs[name])
 
 with tab4:
     # Display history in a more compact format
@@ -381,7 +388,12 @@ with tab4:
             # Create a compact summary of results
             results_summary = " | ".join([f"{name}: {score:.3f}" for name, score in entry["results"].items()])
             
-            with st.expander(f"Test #{test_num} - {entry['timestamp']} - {results_summary}"):
+            expander = st.expander(f"Test #{test_num} - {entry['timestamp']} - {results_summary}",
+                                   key=f"history_{test_num}", on_change="rerun")
+            with expander:
+                # an entry's contents (and its trace text) render only once opened
+                if not expander.open:
+                    continue
                 tab1, tab2, tab3 = st.tabs(["Configuration", "Data", "Results"])
                 
                 with tab1:
@@ -57,7 +57,7 @@ with tab1:
 
 with tab2:
     # Create property data inputs
-    properties_data, qualities_data = create_property_data(active_properties)
+    properties_data, qualities_data = create_property_data(active_properties, profile)
 
 with tab3:
     # Run calculation and display results
@@ -1,4 +1,18 @@
 # Initialize score package
 from .scorer import PropertyScorer
+from .plan import CompiledProfile, FactorPlan
+from .config import FactorConfig, ScorerParams
+from .ragged import RaggedArray, SortedRagged
+from .index import MustHaveIndex
+from .incremental import IncrementalScorer
+from .result import BatchResult
+from .matrix import score_matrix
+from .parallel import ParallelScorer, SharedBatch
+from .cache import FeedCache
+from .store import PropertyStore
+from .memo import ScorerCache, PropertyScoreCache
 
-__all__ = ['PropertyScorer']
\ No newline at end of file
+__all__ = ['PropertyScorer', 'FactorConfig', 'ScorerParams', 'CompiledProfile', 'FactorPlan', 'RaggedArray', 'SortedRagged', 'MustHaveIndex',
+           'IncrementalScorer', 'BatchResult', 'score_matrix',
+           'ParallelScorer', 'SharedBatch', 'FeedCache', 'PropertyStore',
+           'ScorerCache', 'PropertyScoreCache']
\ No newline at end of file
@@ -0,0 +1,455 @@
+# score/cache.py
+
+"""
+On-disk columnar cache of parsed feeds.
+
+A feed is cached under its content hash: one .npy file per array plus a
+JSON manifest. Every factor is stored separately, tagged with a hash of
+the parts of its spec that affect parsing, so editing one factor (or
+asking for a new one) reparses just that factor. Arrays are loaded
+memory-mapped, so a warm load costs next to nothing whatever the feed size.
+
+Layout:
+    <root>/index.json                  path → (size, mtime_ns, sha256)
+    <root>/<sha256>/manifest.json
+    <root>/<sha256>/ids.npy            property ids, file order
+    <root>/<sha256>/priority.npy       raw "Priority order" cells (if any)
+    <root>/<sha256>/<key>.npy          scalar factor values
+    <root>/<sha256>/<key>.q.npy        its qualities (NaN = none)
+    <root>/<sha256>/<key>.values.npy   multi factor CSR values
+    <root>/<sha256>/<key>.offsets.npy  … offsets
+    <root>/<sha256>/<key>.valid.npy    … row mask
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+from collections.abc import Mapping as MappingABC
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .columns import batch_len
+from .pipeline import feed_bounds, parse_chunks, read_chunks
+from .ragged import RaggedArray
+
+# Bump when the on-disk layout or the parse semantics change
+CACHE_VERSION = 1
+
+# Spec fields that change what a factor parses to
+_SPEC_FIELDS = ("csv_column", "multi", "multi_path", "qual_method")
+
+
+def file_sha256(path: str, block: int = 1 << 20) -> str:
+    """Hex sha256 of a file's content, read in blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def spec_hash(info: Mapping[str, Any], defaults: Mapping[str, Any]) -> str:
+    """Hash of everything in a factor spec that affects its parsed columns."""
+    spec = {f: info.get(f, defaults.get(f)) for f in _SPEC_FIELDS}
+    # binary / mid_is_best qualities read the default band
+    spec["default"] = info.get("default")
+    spec["version"] = CACHE_VERSION
+    blob = json.dumps(spec, sort_keys=True, default=str).encode()
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+class CachedFeed:
+    """
+    A parsed feed in file order, as loaded from a FeedCache.
+
+    Attributes:
+        ids:        property ids (the id column, or "Row <n>")
+        priorities: raw priority cells as strings, or None
+        columns:    factor_key → float array or RaggedArray (memory-mapped)
+        qualities:  factor_key → float array (memory-mapped), scalar factors
+        unparsed:   factor_key → number of scalar cells that failed to
+                    parse (stored as 0.0)
+        rebuilt:    factor keys that had to be parsed on this load
+    """
+
+    __slots__ = ("ids", "priorities", "columns", "qualities", "unparsed", "rebuilt")
+
+    def __init__(self,
+                 ids: np.ndarray,
+                 priorities: Optional[np.ndarray],
+                 columns: Dict[str, Any],
+                 qualities: Dict[str, np.ndarray],
+                 unparsed: Dict[str, int],
+                 rebuilt: List[str]):
+        self.ids        = ids
+        self.priorities = priorities
+        self.columns    = columns
+        self.qualities  = qualities
+        self.unparsed   = unparsed
+        self.rebuilt    = rebuilt
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class _FeedColumns(MappingABC):
+    """Mapping factor_key → column that parses each factor on first lookup."""
+
+    def __init__(self, feed: "LazyFeed", loaded: Dict[str, Any], keys: Iterable[str]):
+        self._feed   = feed
+        self._loaded = loaded
+        self._keys   = tuple(keys)
+        self.rows    = len(feed)         # lets batch_len skip loading a column
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._loaded:
+            if key not in self._keys:
+                raise KeyError(key)
+            self._feed.load((key,))
+        return self._loaded[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class LazyFeed:
+    """
+    A feed whose factor columns are materialized on demand.
+
+    Only the ids (and priorities) are read up front. `columns` and
+    `qualities` look like CachedFeed's, but a factor is parsed, or
+    memory-mapped from the FeedCache, the first time it is looked up and
+    kept from then on; a profile that uses five factors of eighty never
+    pays for the other seventy-five. `load` materializes several factors
+    in a single pass over the file.
+
+    Attributes:
+        source:     content hash of the feed file
+        ids:        property ids (the id column, or "Row <n>")
+        priorities: raw priority cells as strings, or None
+        columns:    lazy Mapping factor_key → float array or RaggedArray
+        qualities:  lazy Mapping factor_key → float array, scalar factors
+        unparsed:   factor_key → unparsable cell count, loaded factors
+    """
+
+    def __init__(self,
+                 cache: FeedCache,
+                 path: str,
+                 factors: Mapping[str, Dict[str, Any]],
+                 defaults: Mapping[str, Any]):
+        folder, manifest = cache._open(path)
+        self._cache    = cache
+        self._path     = path
+        self._folder   = folder
+        self._factors  = factors
+        self._defaults = defaults
+        self.source    = os.path.basename(folder)
+        self.ids       = np.load(os.path.join(folder, "ids.npy"), mmap_mode="r")
+        self.priorities = (np.load(os.path.join(folder, "priority.npy"), mmap_mode="r")
+                           if manifest["has_priority"] else None)
+        self.unparsed: Dict[str, int] = {}
+        self._columns: Dict[str, Any] = {}
+        self._qualities: Dict[str, np.ndarray] = {}
+        self.columns   = _FeedColumns(self, self._columns, factors)
+        self.qualities = _FeedColumns(self, self._qualities,
+                                      [k for k, info in factors.items() if not info.get("multi")])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def loaded(self) -> List[str]:
+        """Factor keys materialized so far."""
+        return list(self.unparsed)
+
+    def load(self, keys: Iterable[str]) -> None:
+        """
+        Materialize every factor in `keys` not loaded yet, in one pass.
+
+        Columns come from the cache folder of the file the ids were read
+        from; if a factor still has to be parsed and the file has changed
+        since, raises ValueError rather than pair old ids with new rows.
+        """
+        todo = {key: self._factors[key] for key in keys if key not in self.unparsed}
+        if not todo:
+            return
+        manifest = self._cache._manifest(self._folder)
+        if manifest is None:
+            raise ValueError(f"cache folder {self._folder} is gone; open {self._path} again")
+        feed = self._cache._load(self._path, self._folder, manifest, todo, self._defaults,
+                                 source=self.source)
+        self._columns.update(feed.columns)
+        self._qualities.update(feed.qualities)
+        self.unparsed.update(feed.unparsed)
+
+
+class FeedCache:
+    """
+    Parse a CSV feed once and reload it memory-mapped afterwards.
+
+    The content hash is remembered per path with the file's size and
+    mtime, so an unchanged file is not rehashed on every load.
+
+    Args:
+        root:            cache directory
+        chunk_rows:      rows parsed at a time on a miss
+        id_column:       column holding the property id
+        priority_column: column kept alongside the ids (if present)
+        dtype:           dtype of the cached factor values; np.float32
+                         (columns.COMPACT_DTYPE) halves the cache and the
+                         bandwidth of scoring from it, within the bound
+                         documented in columns.py. Qualities stay float64.
+    """
+
+    def __init__(self,
+                 root: str = ".score_cache",
+                 *,
+                 chunk_rows: int = 50_000,
+                 id_column: str = "Address",
+                 priority_column: str = "Priority order",
+                 dtype: Any = np.float64):
+        self.root            = root
+        self.chunk_rows      = chunk_rows
+        self.id_column       = id_column
+        self.priority_column = priority_column
+        self.dtype           = np.dtype(dtype)
+
+    # ─── Source identity ────────────────────────────────────────────────
+
+    def source_hash(self, path: str) -> str:
+        """Content hash of `path`, rehashing only when size or mtime changed."""
+        index_path = os.path.join(self.root, "index.json")
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+
+        st  = os.stat(path)
+        key = os.path.abspath(path)
+        hit = index.get(key)
+        if hit and hit["size"] == st.st_size and hit["mtime_ns"] == st.st_mtime_ns:
+            return hit["sha256"]
+
+        digest = file_sha256(path)
+        index[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        os.makedirs(self.root, exist_ok=True)
+        self._write_json(index_path, index)
+        return digest
+
+    # ─── Load ───────────────────────────────────────────────────────────
+
+    def load(self,
+             path: str,
+             factors: Mapping[str, Dict[str, Any]],
+             defaults: Mapping[str, Any]) -> CachedFeed:
+        """
+        Parsed columns of `factors` for the feed at `path`.
+
+        Factors missing from the cache, or cached under a different spec,
+        are parsed (in chunks) and added; the rest are memory-mapped.
+        """
+        folder, manifest = self._open(path)
+        return self._load(path, folder, manifest, factors, defaults)
+
+    def _load(self,
+              path: str,
+              folder: str,
+              manifest: Dict[str, Any],
+              factors: Mapping[str, Dict[str, Any]],
+              defaults: Mapping[str, Any],
+              *,
+              source: Optional[str] = None) -> CachedFeed:
+        """
+        load() from an already opened folder. With `source` (the hash the
+        folder was opened for) factors are only parsed from `path` while it
+        still has that content; otherwise ValueError.
+        """
+        stale = {key: info for key, info in factors.items()
+                 if manifest["factors"].get(key, {}).get("spec") != spec_hash(info, defaults)
+                 or manifest["factors"][key].get("dtype", "<f8") != self.dtype.str}
+        if stale:
+            if source is not None and self.source_hash(path) != source:
+                raise ValueError(f"{path} changed since its ids were read (source {source}); "
+                                 f"open it again")
+            self._build_factors(path, folder, manifest, stale, defaults)
+
+        def arr(name: str) -> np.ndarray:
+            return np.load(os.path.join(folder, name), mmap_mode="r")
+
+        columns: Dict[str, Any] = {}
+        qualities: Dict[str, np.ndarray] = {}
+        for key in factors:
+            if manifest["factors"][key]["multi"]:
+                columns[key] = RaggedArray(arr(f"{key}.values.npy"), arr(f"{key}.offsets.npy"),
+                                           arr(f"{key}.valid.npy"))
+            else:
+                columns[key]   = arr(f"{key}.npy")
+                qualities[key] = arr(f"{key}.q.npy")
+
+        priorities = arr("priority.npy") if manifest["has_priority"] else None
+        unparsed   = {key: manifest["factors"][key].get("unparsed", 0) for key in factors}
+        return CachedFeed(arr("ids.npy"), priorities, columns, qualities, unparsed, list(stale))
+
+    def lazy(self,
+             path: str,
+             factors: Mapping[str, Dict[str, Any]],
+             defaults: Mapping[str, Any]) -> "LazyFeed":
+        """
+        The feed at `path` with its ids loaded and each factor parsed (or
+        memory-mapped from the cache) only when it is first looked up.
+        """
+        return LazyFeed(self, path, factors, defaults)
+
+    # ─── Build ──────────────────────────────────────────────────────────
+
+    def _open(self, path: str) -> Tuple[str, Dict[str, Any]]:
+        """Cache folder and manifest for `path`, caching its ids on a miss."""
+        folder   = os.path.join(self.root, self.source_hash(path))
+        manifest = self._manifest(folder)
+        if manifest is None:
+            manifest = self._build_rows(path, folder)
+        return folder, manifest
+
+    def _manifest(self, folder: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(folder, "manifest.json")) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != CACHE_VERSION or manifest.get("id_column") != self.id_column:
+            return None
+        return manifest
+
+    def _build_rows(self, path: str, folder: str) -> Dict[str, Any]:
+        """Cache the ids (and priorities) and start a fresh manifest."""
+        os.makedirs(folder, exist_ok=True)
+        wanted = (self.id_column, self.priority_column)
+        ids: List[str] = []
+        priorities: List[str] = []
+        has_priority = False
+        for df in pd.read_csv(path, chunksize=self.chunk_rows, usecols=lambda c: c in wanted):
+            if self.id_column in df.columns:
+                ids += df[self.id_column].astype(str).tolist()
+            else:
+                ids += [f"Row {len(ids) + i + 1}" for i in range(len(df))]
+            if self.priority_column in df.columns:
+                has_priority = True
+                priorities += df[self.priority_column].astype(str).tolist()
+
+        self._save(folder, "ids.npy", np.array(ids, dtype=str))
+        if has_priority:
+            self._save(folder, "priority.npy", np.array(priorities, dtype=str))
+        manifest = {"version": CACHE_VERSION, "id_column": self.id_column,
+                    "rows": len(ids), "has_priority": has_priority, "factors": {}}
+        self._write_json(os.path.join(folder, "manifest.json"), manifest)
+        return manifest
+
+    def _build_factors(self,
+                       path: str,
+                       folder: str,
+                       manifest: Dict[str, Any],
+                       factors: Mapping[str, Dict[str, Any]],
+                       defaults: Mapping[str, Any]) -> None:
+        """
+        Parse `factors` in one streaming pass and add them to the cache.
+
+        Each parsed chunk is written straight into the factor files, so
+        memory stays bounded by chunk_rows whatever the feed size. Arrays
+        with one entry per row are preallocated .npy memmaps (the row count
+        is in the manifest); multi-POI values, whose total is only known at
+        the end, are appended to a raw file and wrapped as .npy last.
+        """
+        bounds = feed_bounds(path, factors, defaults, chunk_rows=self.chunk_rows)
+        chunks = read_chunks(path, factors, chunk_rows=self.chunk_rows, id_column=None)
+        rows   = manifest["rows"]
+        multi  = {key for key, info in factors.items() if info.get("multi")}
+
+        def tmp(name: str) -> str:
+            return os.path.join(folder, f".{name}.tmp")
+
+        arrays: Dict[str, np.ndarray] = {}
+
+        def per_row(name: str, dtype: Any, length: int) -> np.ndarray:
+            arrays[name] = np.lib.format.open_memmap(tmp(name), mode="w+",
+                                                     dtype=dtype, shape=(length,))
+            return arrays[name]
+
+        for key in factors:
+            if key in multi:
+                per_row(f"{key}.offsets.npy", np.int64, rows + 1)[0] = 0
+                per_row(f"{key}.valid.npy", bool, rows)
+            else:
+                per_row(f"{key}.npy", self.dtype, rows)
+                per_row(f"{key}.q.npy", np.float64, rows)
+
+        values = {key: open(tmp(f"{key}.values"), "wb") for key in multi}
+        sizes  = dict.fromkeys(multi, 0)
+        unparsed: Dict[str, int] = {}
+        start  = 0
+        try:
+            for _, columns, qualities in parse_chunks(chunks, factors, defaults, bounds,
+                                                      id_column=None, unparsed=unparsed):
+                stop = start + batch_len(columns)
+                if stop > rows:
+                    raise ValueError(f"{path} has more rows than its cached ids ({rows})")
+                for key in factors:
+                    col = columns[key]
+                    if key in multi:
+                        vals = col.values[col.offsets[0]:col.offsets[-1]]
+                        values[key].write(vals.astype(self.dtype).tobytes())
+                        arrays[f"{key}.offsets.npy"][start + 1:stop + 1] = \
+                            col.offsets[1:] - col.offsets[0] + sizes[key]
+                        arrays[f"{key}.valid.npy"][start:stop] = col.valid
+                        sizes[key] += len(vals)
+                    else:
+                        arrays[f"{key}.npy"][start:stop] = col
+                        arrays[f"{key}.q.npy"][start:stop] = qualities.get(key, np.nan)
+                start = stop
+        finally:
+            for f in values.values():
+                f.close()
+        if start != rows:
+            raise ValueError(f"{path} has {start} rows, its cached ids {rows}")
+
+        for name, arr in arrays.items():
+            arr.flush()
+            os.replace(tmp(name), os.path.join(folder, name))
+        arrays.clear()
+        for key in multi:
+            raw = tmp(f"{key}.values")
+            vals = (np.memmap(raw, dtype=self.dtype, mode="r") if sizes[key]
+                    else np.zeros(0, dtype=self.dtype))
+            self._save(folder, f"{key}.values.npy", vals)
+            del vals
+            os.remove(raw)
+
+        for key, info in factors.items():
+            manifest["factors"][key] = {"spec": spec_hash(info, defaults), "multi": key in multi,
+                                        "unparsed": unparsed.get(key, 0), "dtype": self.dtype.str}
+
+        # the manifest goes last, so a crash never points at missing files
+        self._write_json(os.path.join(folder, "manifest.json"), manifest)
+
+    @staticmethod
+    def _save(folder: str, name: str, arr: np.ndarray) -> None:
+        tmp = os.path.join(folder, f".{name}.tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, arr)
+        os.replace(tmp, os.path.join(folder, name))
+
+    @staticmethod
+    def _write_json(path: str, obj: Any) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(obj, f)
+        os.replace(tmp, path)
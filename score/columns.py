@@ -0,0 +1,152 @@
+# score/columns.py
+
+"""
+Helpers for columnar property batches: a Mapping factor_key → column, where
+a column is a 1-D float array (scalar factors, NaN = missing), a
+RaggedArray (multi-POI factors) or a sequence of lists.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .ragged import RaggedArray, SortedRagged
+
+
+def batch_len(*mappings: Optional[Mapping[str, Any]]) -> int:
+    """
+    Return the number of properties in a columnar batch (0 if empty).
+
+    A Mapping that knows its row count may expose it as `rows`, so lazily
+    opened columns are not opened just to be measured.
+    """
+    for m in mappings:
+        rows = getattr(m, "rows", None)
+        if rows is not None:
+            return rows
+        for col in (m or {}).values():
+            if col is not None:
+                return len(col)
+    return 0
+
+
+def is_multi_column(col: Any) -> bool:
+    """
+    True for a multi-POI column: a RaggedArray, or a sequence holding lists
+    (or only missing rows, which reads the same either way).
+    """
+    if isinstance(col, RaggedArray):
+        return True
+    if isinstance(col, np.ndarray):
+        return False
+    return all(v is None or isinstance(v, list) for v in col) or any(isinstance(v, list) for v in col)
+
+
+def take_column(col: Any, rows: np.ndarray) -> Any:
+    """Select `rows` (int indices) from a single column."""
+    if isinstance(col, RaggedArray):
+        return col.take(rows)
+    if isinstance(col, np.ndarray):
+        return col[rows]
+    return [col[i] for i in rows.tolist()]
+
+
+def slice_column(col: Any, start: int, stop: int) -> Any:
+    """Select the contiguous rows [start, stop) from a single column."""
+    if isinstance(col, RaggedArray):
+        return col.slice(start, stop)
+    return col[start:stop]
+
+
+def slice_rows(columns: Optional[Mapping[str, Any]], start: int, stop: int) -> Dict[str, Any]:
+    """Select the contiguous rows [start, stop) from every column of a batch."""
+    return {key: slice_column(col, start, stop)
+            for key, col in (columns or {}).items() if col is not None}
+
+
+def take_rows(columns: Optional[Mapping[str, Any]], rows: np.ndarray) -> Dict[str, Any]:
+    """Select `rows` from every column of a batch."""
+    rows = np.asarray(rows, dtype=np.int64)
+    return {key: take_column(col, rows)
+            for key, col in (columns or {}).items() if col is not None}
+
+
+# Compact mode: factor values stored as float32, scored in float64. Each
+# stored value x is then off by at most |x| * COMPACT_EPS, which moves a
+# factor's raw match by at most that times its slope (1 / (upper - target),
+# 1 / (target - lower) or 1 / must_have_tolerance). The one exception is a
+# value whose rounding carries it across a band edge or a must_have
+# threshold, i.e. one within |x| * COMPACT_EPS of it: that factor takes the
+# other branch, as it would for any value on the far side of the edge.
+# min, max, mean, median, percentile and the k-means move no more than
+# their inputs, so the bound carries over to multi-POI factors; decay-
+# weighted means also move through their weights and are not covered.
+# Across factors the score moves by the weighted mean of the factor
+# moves, each scaled by the blend's slope when a quality is present
+# (tests/test_compact.py checks exactly this against score_property).
+COMPACT_DTYPE = np.float32
+COMPACT_EPS   = 2.0 ** -24
+
+
+def compact(columns: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of a batch with every factor column (scalar values and POI
+    values alike) stored as float32, half the memory and bandwidth of
+    float64. Quality columns are small and are best left alone. Scores
+    computed from it deviate from the float64 ones as bounded above.
+    """
+    out: Dict[str, Any] = {}
+    for key, col in columns.items():
+        if col is None:
+            pass
+        elif is_multi_column(col):
+            if not isinstance(col, RaggedArray):
+                col = RaggedArray.from_lists(col)
+            col = type(col)(col.values.astype(COMPACT_DTYPE), col.offsets, col.valid)
+        else:
+            col = np.asarray(col, dtype=float).astype(COMPACT_DTYPE)
+        out[key] = col
+    return out
+
+
+def presort(columns: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of a batch with every multi-POI column as a SortedRagged, for
+    scoring many profiles against the same listings (see SortedRagged
+    for what that trades).
+    """
+    out: Dict[str, Any] = {}
+    for key, col in columns.items():
+        if col is not None and is_multi_column(col):
+            if not isinstance(col, RaggedArray):
+                col = RaggedArray.from_lists(col)
+            col = SortedRagged.from_ragged(col)
+        out[key] = col
+    return out
+
+
+def columns_from_records(records: Sequence[Mapping[str, Any]],
+                         keys: Iterable[str],
+                         multi: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Turn per-property dicts into a columnar batch.
+
+    Args:
+        records: one dict factor_key → value per property (as for
+                 score_property); None or absent means missing
+        keys:    factor keys to extract
+        multi:   keys holding lists of POI values → RaggedArray columns
+
+    Returns:
+        Mapping factor_key → float array (NaN = missing) or RaggedArray.
+    """
+    multi = set(multi)
+    out: Dict[str, Any] = {}
+    for key in keys:
+        vals = [rec.get(key) for rec in records]
+        if key in multi:
+            out[key] = RaggedArray.from_lists(vals)
+        else:
+            out[key] = np.array([np.nan if v is None else v for v in vals], dtype=float)
+    return out
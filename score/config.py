@@ -0,0 +1,216 @@
+# score/config.py
+
+"""
+Typed, immutable factor configs and scorer parameters.
+
+FactorConfig and ScorerParams are validated once when built, hash in
+constant time (the hash is computed up front) and are read-only
+Mappings, so they go anywhere a config dict or a **kwargs dict goes:
+
+    profile = {"train_dist": FactorConfig(mode="nice_to_have", target=1.0,
+                                          lower=0.5, upper=1.5,
+                                          direction=-1, weight=4)}
+    params  = ScorerParams(quality_weight=0.7)
+    scorer  = PropertyScorer(profile, **params)
+
+Plain dicts keep working everywhere; these types only add the checks up
+front and make a configuration safe to share and to use as a cache key.
+"""
+
+from __future__ import annotations
+from collections.abc import Mapping
+from numbers import Integral, Real
+from typing import Any, Iterator, Tuple
+
+from .plan import AGG_CODES, MODE_CODES, _Frozen
+
+REQUIRED = ("mode", "target", "direction", "weight")
+
+
+def _restore(cls: type, items: Tuple[Tuple[str, Any], ...]) -> "_Record":
+    return cls(**dict(items))
+
+
+def check_factor(factor: str, cfg: Mapping[str, Any]) -> None:
+    """
+    The checks on a factor config that do not depend on scorer parameters
+    (the lower/upper nudge needs margin_epsilon and stays in the scorer).
+    Raises ValueError like PropertyScorer always has.
+    """
+    missing = set(REQUIRED) - cfg.keys()
+    if missing:
+        raise ValueError(f"[{factor}] missing keys: {missing}")
+
+    if cfg["mode"] not in MODE_CODES:
+        raise ValueError(f"[{factor}] invalid mode={cfg['mode']}")
+
+    if cfg["direction"] not in (-1, 1):
+        raise ValueError(f"[{factor}] direction must be -1 or +1")
+
+    if cfg["weight"] <= 0:
+        raise ValueError(f"[{factor}] weight must be > 0")
+
+    if cfg.get("multi") and cfg.get("aggregation") not in AGG_CODES:
+        raise ValueError(f"[{factor}] invalid aggregation={cfg.get('aggregation')}")
+
+
+class _Record(_Frozen, Mapping):
+    """Frozen read-only Mapping over a fixed set of fields; None means unset."""
+
+    __slots__ = ("_items", "_hash")
+
+    FIELDS: Tuple[str, ...] = ()
+
+    def _freeze(self, values: Mapping[str, Any]) -> None:
+        items = tuple((name, values[name]) for name in self.FIELDS
+                      if values[name] is not None)
+        for name in self.FIELDS:
+            object.__setattr__(self, name, values[name])
+        object.__setattr__(self, "_items", items)
+        object.__setattr__(self, "_hash", hash((type(self).__name__, items)))
+
+    def __getitem__(self, key: str) -> Any:
+        value = getattr(self, key, None) if key in self.FIELDS else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, _ in self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is type(self):
+            return self._hash == other._hash and self._items == other._items
+        return Mapping.__eq__(self, other)
+
+    def __reduce__(self):
+        # rebuilt rather than restored: str hashes differ between processes
+        return _restore, (type(self), self._items)
+
+    def __repr__(self) -> str:
+        body = ", ".join(f"{name}={value!r}" for name, value in self._items)
+        return f"{type(self).__name__}({body})"
+
+    def replace(self, **changes: Any):
+        """A validated copy with some fields changed (None unsets one)."""
+        return type(self)(**{**{name: getattr(self, name) for name in self.FIELDS}, **changes})
+
+
+class FactorConfig(_Record):
+    """
+    One factor's scoring config, as in PropertyScorer's profile.
+
+    Fields are the config dict's keys; optional ones left as None are
+    absent from the Mapping, so `cfg.get("aggregation")` behaves as on a
+    dict. The mode / direction / weight / aggregation checks run here, once;
+    a non-nice_to_have config must also satisfy lower ≤ target ≤ upper.
+    Pass `factor` (the profile key) to have errors name the factor, as
+    PropertyScorer's do.
+    """
+
+    FIELDS = (
+        "mode", "target", "lower", "upper", "direction", "weight",
+        "multi", "aggregation", "nearest_k", "farthest_k", "percentile",
+        "decay_function", "decay_rate",
+    )
+    __slots__ = FIELDS
+
+    def __init__(self,
+                 mode: str,
+                 target: float,
+                 direction: int,
+                 weight: float,
+                 lower: float = None,
+                 upper: float = None,
+                 *,
+                 multi: bool = None,
+                 aggregation: str = None,
+                 nearest_k: int = None,
+                 farthest_k: int = None,
+                 percentile: float = None,
+                 decay_function: str = None,
+                 decay_rate: float = None,
+                 factor: str = None):
+        # `factor` only names the factor in error messages; it is not a field
+        name = factor or type(self).__name__
+        values = {
+            "mode":           mode,
+            "target":         target,
+            "lower":          lower,
+            "upper":          upper,
+            "direction":      direction,
+            "weight":         weight,
+            "multi":          multi,
+            "aggregation":    aggregation,
+            "nearest_k":      nearest_k,
+            "farthest_k":     farthest_k,
+            "percentile":     percentile,
+            "decay_function": decay_function,
+            "decay_rate":     decay_rate,
+        }
+        for field in ("target", "lower", "upper", "weight"):
+            if values[field] is not None and not isinstance(values[field], Real):
+                raise ValueError(f"[{name}] {field} must be a number, got {values[field]!r}")
+        self._freeze(values)
+        check_factor(name, self)
+
+        # the nice_to_have band is nudged by the scorer, which knows the epsilon
+        if mode != "nice_to_have":
+            l = target if lower is None else lower
+            u = target if upper is None else upper
+            if not (l <= target <= u):
+                raise ValueError(f"[{name}] require lower ≤ target ≤ upper ({l}, {target}, {u})")
+
+
+class ScorerParams(_Record):
+    """
+    PropertyScorer's keyword parameters, range-checked up front instead of
+    clamped. Every field is always set, so `**params` passes all of them;
+    the defaults are PropertyScorer's.
+    """
+
+    FIELDS = (
+        "max_quality", "quality_floor", "quality_weight", "qual_exp",
+        "raw_floor", "must_have_tolerance", "margin_epsilon", "log_blend",
+    )
+    __slots__ = FIELDS
+
+    def __init__(self,
+                 *,
+                 max_quality: int = 5,
+                 quality_floor: float = 0.10,
+                 quality_weight: float = 0.80,
+                 qual_exp: float = 1.0,
+                 raw_floor: float = 0.05,
+                 must_have_tolerance: float = 0.0,
+                 margin_epsilon: float = 1e-6,
+                 log_blend: bool = False):
+        # _qual divides by max_quality - 1
+        if not isinstance(max_quality, Integral) or max_quality < 2:
+            raise ValueError(f"max_quality must be an int ≥ 2, got {max_quality!r}")
+        for name, value in (("quality_floor", quality_floor),
+                            ("quality_weight", quality_weight),
+                            ("raw_floor", raw_floor)):
+            if not 0.0 <= value <= 1.0:
+                raise ValueError(f"{name} must be in [0, 1], got {value!r}")
+        for name, value in (("qual_exp", qual_exp),
+                            ("must_have_tolerance", must_have_tolerance),
+                            ("margin_epsilon", margin_epsilon)):
+            if not value >= 0.0:
+                raise ValueError(f"{name} must be ≥ 0, got {value!r}")
+        self._freeze({
+            "max_quality":         max_quality,
+            "quality_floor":       quality_floor,
+            "quality_weight":      quality_weight,
+            "qual_exp":            qual_exp,
+            "raw_floor":           raw_floor,
+            "must_have_tolerance": must_have_tolerance,
+            "margin_epsilon":      margin_epsilon,
+            "log_blend":           bool(log_blend),
+        })
@@ -0,0 +1,70 @@
+# score/incremental.py
+
+from __future__ import annotations
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .columns import batch_len
+from .result import BatchResult, FactorColumn, combine_factors
+from .scorer import PropertyScorer
+
+
+class IncrementalScorer:
+    """
+    Rescore a fixed batch as the profile is tweaked, recomputing only the
+    factors whose configuration actually changed.
+
+    The fs column of every active factor from the previous run is kept,
+    keyed on PropertyScorer.factor_signature. A new profile reuses every
+    column whose signature is unchanged, so a weight-only change costs no
+    per-factor work at all, just a new weighted mean.
+
+    Args:
+        columns:   the batch, as passed to PropertyScorer.score_many
+        qualities: quality columns, as passed to score_many
+
+    Attributes:
+        recomputed: factor keys whose fs had to be computed on the last call
+    """
+
+    def __init__(self,
+                 columns: Mapping[str, Any],
+                 qualities: Optional[Mapping[str, Any]] = None):
+        self.columns   = columns
+        self.qualities = qualities or {}
+        self.n         = batch_len(columns, qualities)
+        self.recomputed: Tuple[str, ...] = ()
+        # factor_key → (signature, FactorColumn)
+        self._factors: Dict[str, Tuple[Any, FactorColumn]] = {}
+
+    def _update(self, scorer: PropertyScorer) -> List[Tuple[str, float, FactorColumn]]:
+        """Bring the cached factor columns in line with `scorer`."""
+        kept, steps, recomputed = {}, [], []
+        for fp, col in scorer._batch_factors(self.columns):
+            sig    = scorer.factor_signature(fp)
+            cached = self._factors.get(fp.key)
+            if cached is None or cached[0] != sig:
+                cached = (sig, scorer._factor_many(fp, col, self.qualities.get(fp.key), self.n))
+                recomputed.append(fp.key)
+            kept[fp.key] = cached
+            steps.append((fp.key, fp.weight, cached[1]))
+
+        self._factors   = kept
+        self.recomputed = tuple(recomputed)
+        return steps
+
+    def score(self, scorer: PropertyScorer) -> np.ndarray:
+        """
+        Scores for the batch under `scorer`, identical to
+        `scorer.score_many(columns, qualities)`.
+        """
+        steps = self._update(scorer)
+        return combine_factors(self.n, [(w, col) for _, w, col in steps])
+
+    def evaluate(self, scorer: PropertyScorer, *, trace: bool = False) -> BatchResult:
+        """Incremental counterpart of `scorer.evaluate(columns, qualities, trace=)`."""
+        steps  = self._update(scorer)
+        scores = combine_factors(self.n, [(w, col) for _, w, col in steps])
+        return BatchResult([k for k, _, _ in steps], [col for _, _, col in steps], scores,
+                           self.qualities if trace else None)
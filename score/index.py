@@ -0,0 +1,85 @@
+# score/index.py
+
+from __future__ import annotations
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .plan import MUST_HAVE
+from .ragged import RaggedArray
+
+
+class MustHaveIndex:
+    """
+    Sorted per-factor index over a loaded columnar corpus.
+
+    must_have factors are pure threshold tests, so a profile's must_have
+    constraints resolve to one binary search per factor plus an
+    intersection of row ids, before any scoring happens.
+
+    Only scalar columns are indexed: a multi-POI factor's aggregate depends
+    on the profile's band, so its must_have is left to the scorer. Each
+    column is sorted lazily, the first time a profile asks for it.
+
+    Args:
+        columns: the corpus, as passed to PropertyScorer.score_many
+    """
+
+    def __init__(self, columns: Mapping[str, Any]):
+        self.columns = columns
+        self._sorted: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._n = next((len(c) for c in columns.values() if c is not None), 0)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _column(self, key: str) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Return (sorted values, their row ids, row ids of missing values)."""
+        if key not in self._sorted:
+            col = self.columns.get(key)
+            if col is None or isinstance(col, RaggedArray):
+                return None
+            col     = np.asarray(col, dtype=float)
+            missing = np.isnan(col)
+            ids     = np.flatnonzero(~missing)
+            order   = np.argsort(col[ids], kind="stable")
+            self._sorted[key] = (col[ids][order], ids[order], np.flatnonzero(missing))
+        return self._sorted[key]
+
+    def candidates(self, scorer) -> np.ndarray:
+        """
+        Row ids (ascending) that can pass every indexed must_have of `scorer`.
+
+        The result is a superset of the rows that score_property would not
+        zero on a must_have: a row inside the soft tolerance can still round
+        to r == 0, and rows missing the factor are kept because a missing
+        raw value skips the factor rather than failing it.
+        """
+        tol  = scorer.tol
+        sets = []
+        for fp in scorer.plan.active_factors():
+            if fp.mode != MUST_HAVE or fp.multi:
+                continue
+            entry = self._column(fp.key)
+            if entry is None:
+                continue
+            vals, ids, missing = entry
+            t = fp.target
+            if fp.direction < 0:
+                bound = t + tol if tol else t
+                hits  = ids[:np.searchsorted(vals, bound, side="right")]
+            else:
+                bound = t - tol if tol else t
+                hits  = ids[np.searchsorted(vals, bound, side="left"):]
+            sets.append(np.concatenate([hits, missing]) if len(missing) else hits)
+
+        if not sets:
+            return np.arange(self._n)
+
+        sets.sort(key=len)
+        rows = np.sort(sets[0])
+        for other in sets[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
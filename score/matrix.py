@@ -0,0 +1,209 @@
+# score/matrix.py
+
+from __future__ import annotations
+from collections import defaultdict
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .columns import batch_len, slice_rows
+from .plan import FactorPlan, MUST_HAVE
+from .ragged import RaggedArray, aggregate as aggregate_segments
+from .scorer import PropertyScorer
+
+# Target number of (profile, property) cells held per chunk of properties:
+# 2 MB per float64 (P, chunk) matrix; a step holds several, peaking
+# around 15 MB (measured with tracemalloc at 64 profiles)
+_CHUNK_CELLS = 1 << 18
+
+
+def _agg_key(fp: FactorPlan) -> Tuple[Any, ...]:
+    """Everything a multi-POI aggregate depends on (band, mode, decay)."""
+    return (fp.lower, fp.upper, fp.agg, fp.nearest_k, fp.farthest_k, fp.pct,
+            fp.decay, fp.decay_rate, fp.target if fp.decay else None, fp.decay_span)
+
+
+def _raw_grid(x: np.ndarray,
+              fps: Sequence[FactorPlan],
+              scorers: Sequence[PropertyScorer]) -> np.ndarray:
+    """
+    PropertyScorer._raw_many for several profiles at once, broadcast over
+    a (profiles, values) grid with the same per-element operations.
+    """
+    X     = x[None, :]
+    T     = np.array([fp.target for fp in fps])[:, None]
+    L     = np.array([fp.lower for fp in fps])[:, None]
+    U     = np.array([fp.upper for fp in fps])[:, None]
+    INV_U = np.array([fp.inv_upper for fp in fps])[:, None]
+    INV_L = np.array([fp.inv_lower for fp in fps])[:, None]
+    NEG   = np.array([fp.direction < 0 for fp in fps])[:, None]
+    MUST  = np.array([fp.mode == MUST_HAVE for fp in fps])[:, None]
+    TOL   = np.array([sc.tol for sc in scorers], dtype=float)[:, None]
+    INV_T = np.array([sc.inv_tol for sc in scorers])[:, None]
+    FLOOR = np.array([sc.r_floor for sc in scorers])[:, None]
+    SOFT  = TOL != 0
+
+    # must_have
+    ok   = np.where(NEG, X <= T, X >= T)
+    soft = np.where(NEG, X <= T + TOL, X >= T - TOL)
+    ramp = np.where(NEG, 1.0 - (X - T) * INV_T, 1.0 - (T - X) * INV_T)
+    r_must = np.where(ok, 1.0, np.where(SOFT & soft, ramp, 0.0))
+
+    # nice_to_have
+    raw = np.where(NEG,
+                   np.where(X <= T, 1.0, 1.0 - (X - T) * INV_U),
+                   np.where(X >= T, 1.0, 1.0 - (T - X) * INV_L))
+    in_band = (X >= L) & (X <= U)
+    r_nice  = np.where(in_band, np.maximum(FLOOR, raw), 0.0)
+
+    return np.where(MUST, r_must, r_nice)
+
+
+def _factor_grid(x: np.ndarray,
+                 present: np.ndarray,
+                 ratings: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+                 fps: Sequence[FactorPlan],
+                 scorers: Sequence[PropertyScorer],
+                 qual_tables: Dict[Tuple[Any, ...], np.ndarray]
+                 ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (fs, failed) for one factor column under several profiles, shape
+    (profiles, n). _raw and the blend's power run once per distinct value
+    of the column rather than once per property.
+
+    `ratings` is (has_q, distinct ratings, inverse index over has_q rows),
+    or None when the column has no rated property.
+    """
+    n = len(x)
+    ux, inv = np.unique(x[present], return_inverse=True)
+    inv = inv.reshape(-1)
+    with np.errstate(invalid="ignore"):
+        r_u = _raw_grid(ux, fps, scorers)
+
+    fs     = np.zeros((len(fps), n))
+    failed = np.zeros((len(fps), n), dtype=bool)
+    fs[:, present] = r_u[:, inv]
+    must = np.array([fp.mode == MUST_HAVE for fp in fps])
+    if must.any():
+        failed[np.ix_(must, present)] = (r_u[must] == 0.0)[:, inv]
+
+    if ratings is None:
+        return fs, failed
+    has_q, uq, qinv = ratings
+    rated = inv[has_q[present]]
+    for row, sc in enumerate(scorers):
+        params = (sc.max_quality, sc.q_floor, sc.q_weight, sc.qual_exp, sc._log_space)
+        qpart  = qual_tables.get(params)
+        if qpart is None:
+            qpart = qual_tables[params] = sc._qual_parts(uq)
+        fs[row, has_q] = sc._combine(sc._raw_parts(r_u[row])[rated], qpart[qinv])
+    return fs, failed
+
+
+def _ratings(qv: Optional[Any], present: np.ndarray):
+    """(has_q, distinct ratings, inverse index) for a quality column, or None."""
+    if qv is None:
+        return None
+    qv    = np.asarray(qv, dtype=float)
+    has_q = present & ~np.isnan(qv)
+    if not has_q.any():
+        return None
+    uq, qinv = np.unique(qv[has_q], return_inverse=True)
+    return has_q, uq, qinv.reshape(-1)
+
+
+def _score_chunk(seqs: List[List[FactorPlan]],
+                 scorers: Sequence[PropertyScorer],
+                 columns: Mapping[str, Any],
+                 qualities: Mapping[str, Any],
+                 n: int) -> np.ndarray:
+    """Score one chunk of properties against every profile."""
+    p_count      = len(scorers)
+    weighted_sum = np.zeros((p_count, n))
+    total_weight = np.zeros((p_count, n))
+    failed       = np.zeros((p_count, n), dtype=bool)
+
+    # shared across profiles: packed columns, aggregates, quality lookups
+    packed: Dict[str, RaggedArray] = {}
+    aggregates: Dict[Tuple[str, Tuple[Any, ...]], np.ndarray] = {}
+    ratings: Dict[str, Any] = {}
+    qual_tables: Dict[str, Dict[Tuple[Any, ...], np.ndarray]] = defaultdict(dict)
+
+    # step j adds every profile's j-th factor, so each profile accumulates
+    # in its own profile order, as score_property does
+    for j in range(max((len(s) for s in seqs), default=0)):
+        groups: Dict[Tuple[str, Any], List[int]] = defaultdict(list)
+        for p, seq in enumerate(seqs):
+            if j < len(seq):
+                fp = seq[j]
+                groups[(fp.key, _agg_key(fp) if fp.multi else None)].append(p)
+
+        for (key, agg), profs in groups.items():
+            fps = [seqs[p][j] for p in profs]
+            col = columns[key]
+            if agg is None:
+                x = np.asarray(col, dtype=float)
+                present = ~np.isnan(x)
+            else:
+                if key not in packed:
+                    packed[key] = col if isinstance(col, RaggedArray) else RaggedArray.from_lists(col)
+                if (key, agg) not in aggregates:
+                    aggregates[(key, agg)] = aggregate_segments(packed[key], fps[0])
+                x, present = aggregates[(key, agg)], packed[key].valid
+
+            if key not in ratings:
+                ratings[key] = _ratings(qualities.get(key), present)
+
+            fs, fail = _factor_grid(x, present, ratings[key], fps,
+                                    [scorers[p] for p in profs], qual_tables[key])
+            w   = np.array([fp.weight for fp in fps], dtype=float)[:, None]
+            idx = np.array(profs)
+            weighted_sum[idx] = np.where(present, weighted_sum[idx] + w * fs, weighted_sum[idx])
+            total_weight[idx] = np.where(present, total_weight[idx] + w, total_weight[idx])
+            failed[idx] |= fail
+
+    scores = np.zeros((p_count, n))
+    np.divide(weighted_sum, total_weight, out=scores, where=total_weight != 0)
+    scores[failed] = 0.0
+    return scores
+
+
+def score_matrix(scorers: Sequence[PropertyScorer],
+                 columns: Mapping[str, Any],
+                 qualities: Optional[Mapping[str, Any]] = None,
+                 *,
+                 chunk_size: Optional[int] = None) -> np.ndarray:
+    """
+    Score many profiles against the same columnar batch of properties.
+
+    The batch is parsed and packed once. Multi-POI aggregates are computed
+    once per distinct (band, aggregation) setting rather than once per
+    profile, and _raw is broadcast over a (profiles, distinct values) grid.
+
+    Args:
+        scorers:    one PropertyScorer per buyer profile (P)
+        columns:    the batch, as passed to PropertyScorer.score_many
+        qualities:  quality columns, as passed to score_many
+        chunk_size: properties scored per step; defaults to a size that
+                    keeps each (P, chunk) matrix at 2 MB, so a step's
+                    working set stays around 15 MB however large the batch
+
+    Returns:
+        float64 array of shape (P, N); row p equals
+        scorers[p].score_many(columns, qualities).
+    """
+    qualities = qualities or {}
+    n = batch_len(columns, qualities)
+    seqs = [[fp for fp in sc.plan.active_factors() if columns.get(fp.key) is not None]
+            for sc in scorers]
+    if chunk_size is None:
+        chunk_size = max(1, _CHUNK_CELLS // max(len(scorers), 1))
+
+    out = np.zeros((len(scorers), n))
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        out[:, start:stop] = _score_chunk(seqs, scorers,
+                                          slice_rows(columns, start, stop),
+                                          slice_rows(qualities, start, stop),
+                                          stop - start)
+    return out
@@ -0,0 +1,358 @@
+# score/memo.py
+
+"""
+Memoizing scorers by what they are configured with, not who built them.
+
+A profile fingerprint is a hash of a profile plus the scorer parameters
+that does not care about key order or int-vs-float spelling, so the same
+configuration always lands on the same cache entry however the UI
+assembled it. ScorerCache keeps compiled scorers (and their last result)
+under it; PropertyScoreCache keeps a live corpus's scores per profile and
+rescores only the listings that changed.
+"""
+
+from __future__ import annotations
+import hashlib
+import inspect
+import json
+import math
+import sys
+from collections import OrderedDict, namedtuple
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+from .scorer import PropertyScorer
+
+R = TypeVar("R")
+
+# PropertyScorer keyword arguments and their defaults
+SCORER_DEFAULTS: Dict[str, Any] = {
+    name: p.default
+    for name, p in inspect.signature(PropertyScorer.__init__).parameters.items()
+    if p.kind == p.KEYWORD_ONLY
+}
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "result_hits", "result_misses",
+                                     "entries", "nbytes", "max_entries", "max_bytes"])
+
+
+def _canonical(value: Any) -> Any:
+    """JSON-ready copy of `value` with numbers spelled one way."""
+    if isinstance(value, Mapping):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (bool, str)) or value is None:
+        return value
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    return repr(value)
+
+
+def profile_fingerprint(profile: Mapping[str, Mapping[str, Any]], **params: Any) -> str:
+    """
+    Hex digest identifying a (profile, scorer parameters) configuration.
+
+    Factor order, config key order and int/float spelling do not change
+    it, and parameters left at their PropertyScorer default hash the same
+    as when passed explicitly. Note that scores accumulate in profile
+    order, so two profiles equal up to factor order can differ in the
+    last bit.
+    """
+    unknown = params.keys() - SCORER_DEFAULTS.keys()
+    if unknown:
+        raise TypeError(f"unknown scorer parameters: {sorted(unknown)}")
+    blob = json.dumps({"profile": _canonical(profile),
+                       "params":  _canonical({**SCORER_DEFAULTS, **params})},
+                      sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def nbytes(obj: Any, _seen: Optional[set] = None) -> int:
+    """Rough deep size of a result: array buffers plus container overhead."""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes + sys.getsizeof(obj) if obj.base is None else sys.getsizeof(obj)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, Mapping):
+        return size + sum(nbytes(k, seen) + nbytes(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(nbytes(v, seen) for v in obj)
+    for name in getattr(type(obj), "__slots__", ()):
+        size += nbytes(getattr(obj, name, None), seen)
+    if hasattr(obj, "__dict__"):
+        size += nbytes(vars(obj), seen)
+    return size
+
+
+class _Entry:
+    __slots__ = ("scorer", "data_key", "result", "nbytes")
+
+    def __init__(self, scorer: PropertyScorer):
+        self.scorer   = scorer
+        self.data_key = None
+        self.result   = None
+        self.nbytes   = 0
+
+
+class ScorerCache:
+    """
+    LRU cache of compiled PropertyScorers keyed by profile_fingerprint,
+    each holding the result it last produced, so flipping between a few
+    configurations neither revalidates a profile nor rescores the batch.
+
+    Args:
+        max_entries: scorers kept (least recently used go first)
+        max_bytes:   bound on the summed size of the cached results (see
+                     `nbytes`); a result larger than this is not kept
+    """
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 256 << 20):
+        self.max_entries = max_entries
+        self.max_bytes   = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._nbytes = 0
+        self.hits = self.misses = 0
+        self.result_hits = self.result_misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _entry(self, profile: Mapping[str, Mapping[str, Any]], params: Dict[str, Any]) -> _Entry:
+        key   = profile_fingerprint(profile, **params)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self._entries[key] = _Entry(PropertyScorer(profile, **params))
+            self._evict()
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return entry
+
+    def scorer(self, profile: Mapping[str, Mapping[str, Any]], **params: Any) -> PropertyScorer:
+        """The compiled scorer for this configuration, built on a miss."""
+        return self._entry(profile, params).scorer
+
+    def evaluate(self,
+                 profile: Mapping[str, Mapping[str, Any]],
+                 data_key: Hashable,
+                 run: Callable[[PropertyScorer], R],
+                 **params: Any) -> R:
+        """
+        `run(scorer)` for this configuration, or the result it gave last
+        time if `data_key` (anything identifying the scored data, compared
+        with ==) is unchanged.
+        """
+        entry = self._entry(profile, params)
+        if entry.result is not None and entry.data_key == data_key:
+            self.result_hits += 1
+            return entry.result
+
+        self.result_misses += 1
+        result = run(entry.scorer)
+        size   = nbytes(result)
+        self._nbytes -= entry.nbytes
+        if size <= self.max_bytes:
+            entry.data_key, entry.result, entry.nbytes = data_key, result, size
+        else:
+            entry.data_key, entry.result, entry.nbytes = None, None, 0
+        self._nbytes += entry.nbytes
+        self._evict()
+        return result
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until both bounds hold."""
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 self._nbytes > self.max_bytes):
+            _, old = self._entries.popitem(last=False)
+            self._nbytes -= old.nbytes
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of scorer lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.result_hits, self.result_misses,
+                         len(self._entries), self._nbytes, self.max_entries, self.max_bytes)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._nbytes = 0
+
+
+def _present(d: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Copy of `d` without its missing (None or NaN) values."""
+    return {k: v for k, v in (d or {}).items()
+            if v is not None and not (isinstance(v, float) and math.isnan(v))}
+
+
+def property_hash(raw: Mapping[str, Any], quality: Optional[Mapping[str, Any]] = None) -> str:
+    """Hex digest of one property's content; None and NaN both read as missing."""
+    blob = json.dumps([_canonical(_present(raw)), _canonical(_present(quality))],
+                      sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def _cell(col: Any, row: int) -> Any:
+    """Value of one row of a batch column, as score_property takes it."""
+    if col is None:
+        return None
+    val = col[row]
+    if isinstance(val, (float, np.floating)):
+        return None if math.isnan(val) else float(val)
+    return val
+
+
+class _Scores:
+    __slots__ = ("scores", "seen")
+
+    def __init__(self, scores: np.ndarray, seen: int):
+        self.scores = scores
+        self.seen   = seen
+
+
+class PropertyScoreCache:
+    """
+    Scores of a live corpus for any number of profiles, kept up to date
+    one listing at a time.
+
+    The corpus starts as a columnar batch; `upsert` then replaces or adds
+    single properties. Scores are cached per profile fingerprint, and an
+    upsert only marks its own row stale (and only if the property's content
+    hash actually changed), so after one listing changes each profile
+    rescores one row rather than the whole corpus.
+
+    Args:
+        ids:          property id per row of the batch
+        columns:      the batch, as passed to PropertyScorer.score_many
+        qualities:    its quality columns
+        max_profiles: profiles whose scores are kept (least recently used
+                      go first)
+        scorers:      ScorerCache to build scorers through (default: a
+                      private one of the same size)
+
+    Attributes:
+        recomputed: number of rows scored on the last `scores` call
+    """
+
+    def __init__(self,
+                 ids: Sequence[Hashable],
+                 columns: Mapping[str, Any],
+                 qualities: Optional[Mapping[str, Any]] = None,
+                 *,
+                 max_profiles: int = 32,
+                 scorers: Optional[ScorerCache] = None):
+        self.ids          = list(ids)
+        self.columns      = columns
+        self.qualities    = qualities or {}
+        self.max_profiles = max_profiles
+        self.scorers      = scorers if scorers is not None else ScorerCache(max_profiles)
+        self.recomputed   = 0
+        self._base        = len(self.ids)             # rows held by `columns`
+        self._rows        = {pid: i for i, pid in enumerate(self.ids)}
+        self._records: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        self._hashes: Dict[int, str] = {}
+        self._log: List[int] = []                    # rows changed, oldest first
+        self._log_start = 0                          # changes dropped from _log
+        self._cache: "OrderedDict[str, _Scores]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def record(self, pid: Hashable) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """(raw, quality) dicts of a property, as score_property takes them."""
+        row = self._rows[pid]
+        if row in self._records:
+            return self._records[row]
+        raw  = {k: _cell(col, row) for k, col in self.columns.items()}
+        qual = {k: _cell(col, row) for k, col in self.qualities.items()}
+        return _present(raw), _present(qual)
+
+    def upsert(self,
+               pid: Hashable,
+               raw: Mapping[str, Any],
+               quality: Optional[Mapping[str, Any]] = None) -> bool:
+        """
+        Set a property's content, adding it if `pid` is new.
+
+        Args:
+            raw:     factor_key → raw value or list of values (None = missing)
+            quality: factor_key → rating
+
+        Returns:
+            False if the content was unchanged (nothing is invalidated).
+        """
+        digest = property_hash(raw, quality)
+        row = self._rows.get(pid)
+        if row is None:
+            row = self._rows[pid] = len(self.ids)
+            self.ids.append(pid)
+        else:
+            old = self._hashes.get(row)
+            if old is None:
+                old = self._hashes[row] = property_hash(*self.record(pid))
+            if old == digest:
+                return False
+        self._records[row] = (_present(raw), _present(quality))
+        self._hashes[row]  = digest
+        self._log.append(row)
+        return True
+
+    def scores(self, profile: Mapping[str, Mapping[str, Any]], **params: Any) -> np.ndarray:
+        """
+        Scores of every property under this configuration, aligned with
+        `ids` and identical to scoring the current corpus from scratch.
+        Rows changed since the profile was last asked for are rescored;
+        the rest come from the cache. Each call returns a new array, which
+        later upserts leave alone.
+        """
+        # a copy: later upserts update the cached array in place
+        return self._refresh(profile, params).scores.copy()
+
+    def score(self, pid: Hashable, profile: Mapping[str, Mapping[str, Any]], **params: Any) -> float:
+        """Score of one property (brings the profile's cached scores up to date)."""
+        return float(self._refresh(profile, params).scores[self._rows[pid]])
+
+    def _refresh(self, profile: Mapping[str, Mapping[str, Any]], params: Dict[str, Any]) -> _Scores:
+        """The profile's cache entry, with the rows changed since its last use rescored."""
+        key    = profile_fingerprint(profile, **params)
+        scorer = self.scorers.scorer(profile, **params)
+        end    = self._log_start + len(self._log)
+        entry  = self._cache.get(key)
+        if entry is None:
+            scores = np.empty(len(self.ids))
+            scores[:self._base] = scorer.score_many(self.columns, self.qualities)
+            stale = self._records.keys()
+            entry = self._cache[key] = _Scores(scores, end)
+        else:
+            self._cache.move_to_end(key)
+            stale = set(self._log[entry.seen - self._log_start:])
+            if len(entry.scores) < len(self.ids):
+                grown = np.empty(len(self.ids))
+                grown[:len(entry.scores)] = entry.scores
+                entry.scores = grown
+
+        for row in stale:
+            entry.scores[row] = scorer.score_property(*self._records[row])
+        entry.seen      = end
+        self.recomputed = len(stale)
+
+        while len(self._cache) > self.max_profiles:
+            self._cache.popitem(last=False)
+        self._trim_log()
+        return entry
+
+    def _trim_log(self) -> None:
+        """Forget changes every cached profile has already applied."""
+        seen = min((e.seen for e in self._cache.values()), default=self._log_start + len(self._log))
+        drop = seen - self._log_start
+        if drop:
+            del self._log[:drop]
+            self._log_start = seen
@@ -0,0 +1,261 @@
+# score/parallel.py
+
+from __future__ import annotations
+import heapq
+import os
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .columns import batch_len, is_multi_column, slice_rows
+from .matrix import score_matrix
+from .ragged import RaggedArray, SortedRagged
+from .scorer import PropertyScorer
+
+# (section, factor_key, field, dtype, byte offset, length) per stored array
+_Layout = Tuple[Tuple[str, str, str, str, int, int], ...]
+
+# Batch attached by the current worker process (see _init_worker)
+_BLOCK: Optional[shared_memory.SharedMemory] = None
+_BATCH: Optional[Tuple[Dict[str, Any], Dict[str, Any]]] = None
+
+
+class SharedBatch:
+    """
+    A columnar batch copied once into a single shared-memory block.
+
+    Worker processes rebuild the columns as numpy views onto the block from
+    the small, picklable `spec`, so the property data itself is never
+    pickled. Sequences of lists are packed into RaggedArrays first; a
+    SortedRagged keeps its running sums, so workers attach it as one.
+
+    Args:
+        columns:   the batch, as passed to PropertyScorer.score_many
+        qualities: quality columns, as passed to score_many
+    """
+
+    def __init__(self,
+                 columns: Mapping[str, Any],
+                 qualities: Optional[Mapping[str, Any]] = None):
+        arrays: List[Tuple[str, str, str, np.ndarray]] = []
+        for section, mapping in (("columns", columns), ("qualities", qualities or {})):
+            for key, col in mapping.items():
+                if col is None:
+                    continue
+                if is_multi_column(col):
+                    if not isinstance(col, RaggedArray):
+                        col = RaggedArray.from_lists(col)
+                    arrays += [(section, key, "values",  col.values),
+                               (section, key, "offsets", col.offsets),
+                               (section, key, "valid",   col.valid)]
+                    if isinstance(col, SortedRagged):
+                        arrays.append((section, key, "csum", col.csum))
+                else:
+                    # float32 (compact) columns stay float32 in the block
+                    arr = np.asarray(col)
+                    if arr.dtype.kind != "f":
+                        arr = np.asarray(col, dtype=float)
+                    arrays.append((section, key, "", arr))
+
+        layout, offset = [], 0
+        for section, key, field, arr in arrays:
+            layout.append((section, key, field, arr.dtype.str, offset, len(arr)))
+            offset += -(-arr.nbytes // 8) * 8   # keep every array 8-byte aligned
+
+        self.n      = batch_len(columns, qualities)
+        self.shm    = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.layout: _Layout = tuple(layout)
+        for (_, _, _, dtype, off, length), (_, _, _, arr) in zip(self.layout, arrays):
+            np.ndarray(length, dtype=dtype, buffer=self.shm.buf, offset=off)[:] = arr
+
+    @property
+    def spec(self) -> Tuple[str, _Layout]:
+        """What a worker needs to attach: (block name, layout)."""
+        return self.shm.name, self.layout
+
+    def close(self) -> None:
+        """Release the block (the creating process also unlinks it)."""
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> "SharedBatch":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def attach_batch(spec: Tuple[str, _Layout]
+                 ) -> Tuple[shared_memory.SharedMemory, Dict[str, Any], Dict[str, Any]]:
+    """
+    Attach to a SharedBatch from another process.
+
+    Returns:
+        (block, columns, qualities); the columns are read-only views that
+        stay valid while `block` is open.
+    """
+    name, layout = spec
+    shm = shared_memory.SharedMemory(name=name)
+    sections: Dict[str, Dict[str, Any]] = {"columns": {}, "qualities": {}}
+    fields: Dict[Tuple[str, str], Dict[str, np.ndarray]] = {}
+    for section, key, field, dtype, off, length in layout:
+        arr = np.ndarray(length, dtype=dtype, buffer=shm.buf, offset=off)
+        arr.setflags(write=False)
+        if field:
+            fields.setdefault((section, key), {})[field] = arr
+        else:
+            sections[section][key] = arr
+    for (section, key), f in fields.items():
+        if "csum" in f:
+            sections[section][key] = SortedRagged(f["values"], f["offsets"], f["valid"], f["csum"])
+        else:
+            sections[section][key] = RaggedArray(f["values"], f["offsets"], f["valid"])
+    return shm, sections["columns"], sections["qualities"]
+
+
+# ─── Worker side ────────────────────────────────────────────────────────
+
+def _init_worker(spec: Tuple[str, _Layout]) -> None:
+    """Pool initializer: attach the shared batch once per worker."""
+    global _BATCH, _BLOCK
+    _BLOCK, columns, qualities = attach_batch(spec)
+    _BATCH = (columns, qualities)
+
+
+def _shard(start: int, stop: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    columns, qualities = _BATCH
+    return slice_rows(columns, start, stop), slice_rows(qualities, start, stop)
+
+
+def _score_shard(scorer: PropertyScorer, start: int, stop: int) -> np.ndarray:
+    return scorer.score_many(*_shard(start, stop))
+
+
+def _matrix_shard(scorers: Sequence[PropertyScorer], start: int, stop: int) -> np.ndarray:
+    return score_matrix(scorers, *_shard(start, stop))
+
+
+def _top_k_shard(scorer: PropertyScorer, k: int, start: int, stop: int
+                 ) -> List[Tuple[float, int]]:
+    """The shard's k best as (-score, row), best first; ties keep row order."""
+    scores = scorer.score_many(*_shard(start, stop))
+    best   = np.argsort(-scores, kind="stable")[:k]
+    return [(-s, start + i) for s, i in zip(scores[best].tolist(), best.tolist())]
+
+
+# ─── Coordinator ────────────────────────────────────────────────────────
+
+class ParallelScorer:
+    """
+    Score one large batch on a process pool.
+
+    The batch is placed in shared memory once (see SharedBatch); each task
+    then only ships a scorer and a row range. Results are identical to the
+    single-process paths, since every shard runs the same batch code.
+
+    Use as a context manager, or call close() to stop the workers and
+    free the shared block.
+
+    Args:
+        columns:    the batch, as passed to PropertyScorer.score_many
+        qualities:  quality columns, as passed to score_many
+        workers:    pool size (default: os.cpu_count())
+        shard_size: properties per task (default: about four tasks per
+                    worker, so uneven shards still balance)
+        mp_context: optional multiprocessing context for the pool
+    """
+
+    def __init__(self,
+                 columns: Mapping[str, Any],
+                 qualities: Optional[Mapping[str, Any]] = None,
+                 *,
+                 workers: Optional[int] = None,
+                 shard_size: Optional[int] = None,
+                 mp_context: Any = None):
+        self.batch   = SharedBatch(columns, qualities)
+        self.n       = self.batch.n
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size or max(1, -(-self.n // (self.workers * 4)))
+        self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                         mp_context=mp_context,
+                                         initializer=_init_worker,
+                                         initargs=(self.batch.spec,))
+
+    def _ranges(self) -> List[Tuple[int, int]]:
+        return [(start, min(start + self.shard_size, self.n))
+                for start in range(0, self.n, self.shard_size)]
+
+    def score_many(self, scorer: PropertyScorer) -> np.ndarray:
+        """Parallel `scorer.score_many(columns, qualities)`."""
+        ranges = self._ranges()
+        parts  = self._pool.map(_score_shard, [scorer] * len(ranges), *zip(*ranges))
+        return np.concatenate(list(parts)) if ranges else np.zeros(0)
+
+    def score_matrix(self,
+                     scorers: Sequence[PropertyScorer],
+                     *,
+                     by: str = "properties") -> np.ndarray:
+        """
+        Parallel `score_matrix(scorers, columns, qualities)`.
+
+        Args:
+            scorers: one PropertyScorer per profile
+            by:      "properties" splits the batch into row ranges, every
+                     task scoring all profiles; "profiles" splits the
+                     profiles, every task scoring the whole batch
+
+        Returns:
+            float64 array of shape (len(scorers), N)
+        """
+        if by == "profiles":
+            step   = max(1, -(-len(scorers) // (self.workers * 4)))
+            groups = [scorers[i:i + step] for i in range(0, len(scorers), step)]
+            parts  = self._pool.map(_matrix_shard, groups, [0] * len(groups), [self.n] * len(groups))
+            return np.concatenate(list(parts)) if groups else np.zeros((0, self.n))
+        if by != "properties":
+            raise ValueError(f"by must be 'properties' or 'profiles', got {by!r}")
+        ranges = self._ranges()
+        parts  = self._pool.map(_matrix_shard, [scorers] * len(ranges), *zip(*ranges))
+        return np.concatenate(list(parts), axis=1) if ranges else np.zeros((len(scorers), 0))
+
+    def top_k(self,
+              scorer: PropertyScorer,
+              k: int,
+              ids: Optional[Sequence[Hashable]] = None) -> List[Tuple[Hashable, float]]:
+        """
+        The k best-scoring properties of the batch.
+
+        Every shard keeps only its own k best; those short lists are merged
+        here, so only O(k) results per shard cross process boundaries.
+
+        Args:
+            scorer: the profile to rank by
+            k:      number of results
+            ids:    optional property ids aligned with the batch rows
+                    (default: row indices)
+
+        Returns:
+            Up to k (property_id, score) pairs, best first; ties keep row
+            order, as in PropertyScorer.top_k.
+        """
+        if k <= 0:
+            return []
+        ranges = self._ranges()
+        parts  = self._pool.map(_top_k_shard, [scorer] * len(ranges), [k] * len(ranges),
+                                *zip(*ranges))
+        best = islice(heapq.merge(*parts), k)
+        return [(ids[row] if ids is not None else row, -neg) for neg, row in best]
+
+    def close(self) -> None:
+        """Stop the workers and free the shared block."""
+        self._pool.shutdown()
+        self.batch.close()
+
+    def __enter__(self) -> "ParallelScorer":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,299 @@
+# score/parsing.py
+
+"""
+Turning raw feed cells (CSV strings, JSON POI lists) into the numbers the
+scorer works on. Shared by the Streamlit UI and the streaming pipeline.
+"""
+
+from __future__ import annotations
+import json
+import math
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .ragged import RaggedArray
+
+
+# Time/distance patterns, compiled once
+_HOURS = re.compile(r'(\d+(?:\.\d+)?)\s*(?:h|hr|hour)')
+_MINS  = re.compile(r'(\d+(?:\.\d+)?)\s*(?:m|min)')
+_SECS  = re.compile(r'(\d+(?:\.\d+)?)\s*(?:s|sec)')
+_KM    = re.compile(r'([\d\.]+)\s*km\b')
+_M     = re.compile(r'([\d\.]+)\s*m\b')
+_NUM   = re.compile(r'([\d\.]+)')
+
+# A "clean" cell is nothing but number [unit] tokens ("12 mins",
+# "1 hour 15 mins", "0.8 km", "42"). For those a single scan gives the same
+# answer as the pattern searches above; anything else takes the full path.
+_UNIT  = r'(hours?|hrs?|mins?|secs?|km|m)\b'
+_CLEAN = re.compile(r'(?:\d+(?:\.\d+)?(?![\d.])\s*(?:' + _UNIT + r')?\s*)+')
+_TOKEN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:' + _UNIT + r')?')
+
+# Distinct cells remembered by parse_numeric (feeds repeat "12 mins" a lot)
+PARSE_CACHE_SIZE = 1 << 16
+
+
+def _parse_tokens(s: str) -> Optional[float]:
+    """parse_numeric for a clean, lower-cased cell, in one scan."""
+    hours = mins = secs = km = m = None
+    first = None
+    is_time = False
+    for num, unit in _TOKEN.findall(s):
+        first = first or num
+        if not unit:
+            continue
+        if unit == "km":
+            km = km or num
+        elif unit == "m":
+            # "m" reads as minutes in a time cell, metres otherwise
+            m, mins = m or num, mins or num
+        else:
+            is_time = True
+            if unit[0] == "h":
+                hours = hours or num
+            elif unit[0] == "m":
+                mins = mins or num
+            else:
+                secs = secs or num
+
+    if is_time:
+        total_min = 0.0
+        if hours is not None:
+            total_min += float(hours) * 60
+        if mins is not None:
+            total_min += float(mins)
+        if secs is not None:
+            total_min += float(secs) / 60.0
+        return total_min
+    if km is not None:
+        return float(km)
+    if m is not None:
+        return float(m) / 1000.0
+    return float(first)
+
+
+def _parse_text(s: str) -> Optional[float]:
+    """parse_numeric for any lower-cased, stripped string."""
+    if _CLEAN.fullmatch(s):
+        return _parse_tokens(s)
+
+    # --- 1) TIME detection ---
+    if any(unit in s for unit in ("hour", "hr", "min", "sec")):
+        total_min = 0.0
+
+        # hours → minutes
+        hours = _HOURS.search(s)
+        if hours:
+            total_min += float(hours.group(1)) * 60
+
+        # minutes
+        mins = _MINS.search(s)
+        if mins:
+            total_min += float(mins.group(1))
+
+        # seconds → minutes
+        secs = _SECS.search(s)
+        if secs:
+            total_min += float(secs.group(1)) / 60.0
+
+        # if we found at least one of the above, return
+        if hours or mins or secs:
+            return total_min
+
+    # --- 2) DISTANCE detection ---
+    # kilometers
+    km = _KM.search(s)
+    if km:
+        return float(km.group(1))
+
+    # meters → convert to km
+    m = _M.search(s)
+    if m:
+        return float(m.group(1)) / 1000.0
+
+    # --- 3) FALLBACK numeric ---
+    num = _NUM.search(s)
+    if num:
+        try:
+            return float(num.group(1))
+        except ValueError:
+            return None
+
+    return None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_str(val: str) -> Optional[float]:
+    return _parse_text(val.strip().lower())
+
+
+def parse_numeric(val: Any) -> Optional[float]:
+    """
+    Parse a string or number into a float, handling:
+      • Time: "1 hour 15 mins" → 75.0 (minutes)
+              "5 mins" → 5.0
+              "2 hr"  → 120.0
+              "90 sec"→ 1.5
+      • Distance: "2.3 km" → 2.3
+                  "500 m"  → 0.5
+      • Bare numbers: "42" → 42.0
+
+    Strings are memoized (see parse_cache_info), since feeds repeat the
+    same few cells over and over.
+
+    Returns:
+        float or None if unparsable.
+    """
+    # Already numeric?
+    if isinstance(val, (int, float)) and not math.isnan(val):
+        return float(val)
+
+    if not isinstance(val, str):
+        return None
+
+    return _parse_str(val)
+
+
+def parse_cache_info():
+    """hits / misses / maxsize / currsize of the parse_numeric cache."""
+    return _parse_str.cache_info()
+
+
+def clear_parse_cache() -> None:
+    _parse_str.cache_clear()
+
+
+# methods that rescale against the min/max of the whole column
+RANGE_METHODS = ("higher_is_better", "lower_is_better")
+
+
+def value_range(values: Sequence[Optional[float]]) -> Optional[Tuple[float, float]]:
+    """(min, max) of the non-None values, or None if there are none."""
+    clean = [v for v in values if v is not None]
+    if not clean:
+        return None
+    return min(clean), max(clean)
+
+
+def calc_quality(values: Sequence[Optional[float]],
+                 method: str,
+                 cfg: Dict[str, Any],
+                 bounds: Optional[Tuple[float, float]] = None) -> List[Optional[float]]:
+    """
+    Map raw values → quality [0.1,0.9], or None if 'neutral'.
+
+    `bounds` is the (min, max) of the whole column for the range-based
+    methods; by default it is taken from `values`, which is only right
+    when `values` is the whole column (the streaming pipeline passes the
+    bounds from a pre-pass instead).
+    """
+    n = len(values)
+    if method == "neutral":
+        return [None] * n
+
+    if method == "binary":
+        lb, ub = cfg["lower"], cfg["upper"]
+        return [0.9 if (v is not None and lb <= v <= ub) else 0.1 for v in values]
+
+    if method == "mid_is_best":
+        t = cfg["target"]; rng = max(cfg["upper"] - cfg["lower"], 1e-12)
+        return [0.9 - 0.8 * (abs(v - t) / rng) if v is not None else 0.5 for v in values]
+
+    if bounds is None:
+        bounds = value_range(values)
+    if bounds is None or bounds[0] == bounds[1]:
+        return [0.5] * n
+    mn, mx = bounds
+
+    if method == "higher_is_better":
+        return [0.1 + 0.8 * ((v - mn) / (mx - mn)) if v is not None else 0.5 for v in values]
+
+    # default: lower_is_better
+    return [0.1 + 0.8 * ((mx - v) / (mx - mn)) if v is not None else 0.5 for v in values]
+
+
+def extract_multi_path(poi_list: Sequence[Any], path: str) -> List[float]:
+    """
+    Given a list of dicts and a dotted path (e.g. "walking.distance"),
+    drill into each dict and return the numeric values found.
+    """
+    keys = path.split(".")
+    out  = []
+    for item in poi_list:
+        val = item
+        for k in keys:
+            if isinstance(val, dict):
+                val = val.get(k)
+            else:
+                val = None
+            if val is None:
+                break
+        num = parse_numeric(val)
+        if num is not None:
+            out.append(num)
+    return out
+
+
+def decode_poi_list(cell: Any) -> Any:
+    """Decode one JSON POI-list cell (a list passes through, anything else → [])."""
+    if isinstance(cell, str):
+        cell = json.loads(cell)
+    return cell if isinstance(cell, list) else []
+
+
+class MultiPathExtractor:
+    """
+    Pull the numbers at one or more dotted paths out of a column of POI
+    lists, straight into RaggedArrays.
+
+    Equivalent to extract_multi_path per cell and path, but each path is
+    split once, each cell is decoded once however many paths are read from
+    it (e.g. walking and driving, time and distance), and each distinct
+    leaf string is parsed once per call.
+
+    Args:
+        paths: dotted paths, e.g. ("walking.travel_time", "driving.distance")
+    """
+
+    __slots__ = ("paths", "_keys")
+
+    def __init__(self, paths: Sequence[str]):
+        self.paths = tuple(paths)
+        self._keys = tuple(tuple(p.split(".")) for p in self.paths)
+
+    def extract(self, cells: Iterable[Any]) -> List[RaggedArray]:
+        """One RaggedArray per path, one row per cell, values in POI order."""
+        values: List[List[float]] = [[] for _ in self._keys]
+        counts: List[List[int]]   = [[] for _ in self._keys]
+        parsed: Dict[Any, Optional[float]] = {}
+        for cell in cells:
+            pois = decode_poi_list(cell)
+            for keys, vals, cnt in zip(self._keys, values, counts):
+                before = len(vals)
+                for item in pois:
+                    val = item
+                    for k in keys:
+                        val = val.get(k) if isinstance(val, dict) else None
+                        if val is None:
+                            break
+                    if val is None:
+                        continue
+                    try:
+                        num = parsed[val]
+                    except KeyError:
+                        num = parsed[val] = parse_numeric(val)
+                    except TypeError:           # unhashable leaf (list, dict)
+                        num = None
+                    if num is not None:
+                        vals.append(num)
+                cnt.append(len(vals) - before)
+
+        out = []
+        for vals, cnt in zip(values, counts):
+            offsets = np.zeros(len(cnt) + 1, dtype=np.int64)
+            np.cumsum(cnt, out=offsets[1:])
+            out.append(RaggedArray(np.array(vals, dtype=float), offsets))
+        return out
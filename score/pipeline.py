@@ -0,0 +1,298 @@
+# score/pipeline.py
+
+"""
+Streaming CSV scoring: chunked reader → parse stage → batch scoring →
+sink, all generators, so memory stays bounded by the chunk size however
+large the feed is.
+
+Factor specs are FACTORS-style dicts (see score/defaults.py): each carries a
+`csv_column`, an optional `multi` flag with its `multi_path`, and a
+`qual_method`; missing options come from a defaults mapping.
+"""
+
+from __future__ import annotations
+import heapq
+import time
+from typing import (
+    TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterable, Iterator, List, Mapping,
+    Optional, Tuple,
+)
+
+import numpy as np
+import pandas as pd
+
+from .columns import slice_rows
+from .config import FactorConfig
+from .parsing import RANGE_METHODS, MultiPathExtractor, calc_quality, parse_numeric
+from .scorer import PropertyScorer
+
+if TYPE_CHECKING:
+    from .cache import CachedFeed, FeedCache
+
+# Multi-POI settings a factor spec passes on to the scorer
+MULTI_OPTIONS = ("aggregation", "nearest_k", "farthest_k", "percentile",
+                 "decay_function", "decay_rate")
+
+# (property ids, columns, qualities) for one chunk of the feed
+Batch = Tuple[List[Hashable], Dict[str, Any], Dict[str, np.ndarray]]
+
+
+def scoring_profile(profile: Mapping[str, Dict[str, Any]],
+                    factors: Mapping[str, Dict[str, Any]],
+                    defaults: Mapping[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Add each multi-POI factor's aggregation settings from its spec to a
+    profile, so the scorer aggregates as configured. FactorConfigs stay
+    FactorConfigs; dicts are copied, never modified.
+    """
+    merged = {}
+    for key, cfg in profile.items():
+        info = factors[key]
+        if info.get("multi"):
+            extra = {opt: info.get(opt, defaults[opt]) for opt in MULTI_OPTIONS if opt not in cfg}
+            if isinstance(cfg, FactorConfig):
+                cfg = cfg.replace(multi=True, **extra)
+            else:
+                cfg = {**cfg, "multi": True, **extra}
+        elif not isinstance(cfg, FactorConfig):
+            cfg = dict(cfg)
+        merged[key] = cfg
+    return merged
+
+
+def _scalar_values(series: pd.Series, unparsed: Optional[List[int]] = None) -> List[float]:
+    """
+    Parse a scalar column; unparsable cells become 0.0, as in the UI (and
+    are counted into unparsed[0] when given).
+    """
+    out = []
+    for cell in series:
+        n = parse_numeric(cell)
+        out.append(0.0 if n is None else n)
+        if n is None and unparsed is not None:
+            unparsed[0] += 1
+    return out
+
+
+def read_chunks(path: str,
+                factors: Mapping[str, Dict[str, Any]],
+                *,
+                chunk_rows: int = 50_000,
+                id_column: Optional[str] = "Address") -> Iterator[pd.DataFrame]:
+    """
+    Read only the columns the factors (and the id) need, `chunk_rows`
+    rows at a time.
+    """
+    wanted = {info["csv_column"] for info in factors.values()}
+    if id_column:
+        wanted.add(id_column)
+    yield from pd.read_csv(path, chunksize=chunk_rows,
+                           usecols=lambda c: c in wanted)
+
+
+def ranged_factors(factors: Mapping[str, Dict[str, Any]],
+                   defaults: Mapping[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """The scalar factors whose quality method rescales against the column's range."""
+    return {key: info for key, info in factors.items()
+            if not info.get("multi")
+            and info.get("qual_method", defaults["qual_method"]) in RANGE_METHODS}
+
+
+def quality_bounds(chunks: Iterable[pd.DataFrame],
+                   factors: Mapping[str, Dict[str, Any]],
+                   defaults: Mapping[str, Any]) -> Dict[str, Tuple[float, float]]:
+    """
+    Pre-pass over the feed: global (min, max) of every scalar factor whose
+    quality method rescales against the column's range, so per-chunk
+    qualities equal the whole-file ones.
+    """
+    bounds: Dict[str, Tuple[float, float]] = {}
+    ranged = ranged_factors(factors, defaults)
+    for df in chunks:
+        for key, info in ranged.items():
+            vals = _scalar_values(df[info["csv_column"]])
+            if not vals:
+                continue
+            lo, hi = min(vals), max(vals)
+            if key in bounds:
+                lo, hi = min(lo, bounds[key][0]), max(hi, bounds[key][1])
+            bounds[key] = (lo, hi)
+    return bounds
+
+
+def feed_bounds(path: str,
+                factors: Mapping[str, Dict[str, Any]],
+                defaults: Mapping[str, Any],
+                *,
+                chunk_rows: int = 50_000) -> Dict[str, Tuple[float, float]]:
+    """quality_bounds over a CSV file, reading only the columns it needs."""
+    ranged = ranged_factors(factors, defaults)
+    if not ranged:
+        return {}
+    return quality_bounds(read_chunks(path, ranged, chunk_rows=chunk_rows, id_column=None),
+                          ranged, defaults)
+
+
+def parse_chunks(chunks: Iterable[pd.DataFrame],
+                 factors: Mapping[str, Dict[str, Any]],
+                 defaults: Mapping[str, Any],
+                 bounds: Optional[Mapping[str, Tuple[float, float]]] = None,
+                 *,
+                 id_column: Optional[str] = "Address",
+                 unparsed: Optional[Dict[str, int]] = None) -> Iterator[Batch]:
+    """
+    Parse stage: turn each raw chunk into a columnar batch.
+
+    Scalar factors become float arrays (unparsable → 0.0) with a quality
+    column from the factor's `qual_method`; multi-POI factors become
+    RaggedArrays of the values at `multi_path`, raw-only. Each POI-list
+    column is decoded once for all the factors that read it.
+
+    If `unparsed` is given, the number of scalar cells that failed to
+    parse is added up in it per factor key.
+
+    Yields:
+        (property ids, columns, qualities) per chunk. Ids come from
+        `id_column`, or are "Row <n>" (1-based, across the whole feed).
+    """
+    bounds = bounds or {}
+    offset = 0
+
+    # one extractor per POI-list column, however many factors read it
+    paths: Dict[str, Dict[str, str]] = {}
+    for key, info in factors.items():
+        if info.get("multi"):
+            paths.setdefault(info["csv_column"], {})[key] = \
+                info.get("multi_path", defaults["multi_path"])
+    extractors = []
+    for csv_column, by_key in paths.items():
+        unique = list(dict.fromkeys(by_key.values()))
+        index  = [unique.index(p) for p in by_key.values()]
+        extractors.append((csv_column, MultiPathExtractor(unique), list(by_key), index))
+
+    for df in chunks:
+        n = len(df)
+        if id_column and id_column in df.columns:
+            ids = df[id_column].astype(str).tolist()
+        else:
+            ids = [f"Row {offset + i + 1}" for i in range(n)]
+        offset += n
+
+        columns: Dict[str, Any] = {}
+        qualities: Dict[str, np.ndarray] = {}
+        for csv_column, extractor, keys, index in extractors:
+            cols = extractor.extract(df[csv_column])
+            for key, i in zip(keys, index):
+                columns[key] = cols[i]
+        for key, info in factors.items():
+            if info.get("multi"):
+                continue
+            bad    = [0]
+            vals   = _scalar_values(df[info["csv_column"]], bad)
+            if unparsed is not None:
+                unparsed[key] = unparsed.get(key, 0) + bad[0]
+            method = info.get("qual_method", defaults["qual_method"])
+            quals  = calc_quality(vals, method, {**info.get("default", {}), **info},
+                                  bounds.get(key))
+            columns[key]   = np.array(vals, dtype=float)
+            qualities[key] = np.array([np.nan if q is None else q for q in quals], dtype=float)
+        yield ids, columns, qualities
+
+
+def _cached_batches(feed: "CachedFeed", chunk_rows: int) -> Iterator[Batch]:
+    """Slice a cached feed into batches of `chunk_rows`."""
+    for start in range(0, len(feed), chunk_rows):
+        stop = start + chunk_rows
+        yield (feed.ids[start:stop].tolist(),
+               slice_rows(feed.columns, start, stop),
+               slice_rows(feed.qualities, start, stop))
+
+
+def score_chunks(batches: Iterable[Batch],
+                 scorer: PropertyScorer) -> Iterator[Tuple[List[Hashable], np.ndarray]]:
+    """Scoring stage: (ids, scores) per parsed batch."""
+    for ids, columns, qualities in batches:
+        yield ids, scorer.score_many(columns, qualities)
+
+
+class TopK:
+    """
+    Sink keeping the k best (id, score) pairs seen so far, in O(k) memory.
+    Ties keep feed order, as PropertyScorer.top_k does.
+    """
+
+    def __init__(self, k: int):
+        self.k    = k
+        self.seen = 0
+        self._heap: List[Tuple[float, int, Hashable]] = []   # (score, -row, id)
+
+    def push(self, ids: List[Hashable], scores: np.ndarray) -> None:
+        """Offer one scored chunk."""
+        # only the chunk's own k best can enter; visit them best first
+        for i in np.argsort(-scores, kind="stable")[:self.k].tolist():
+            item = (float(scores[i]), -(self.seen + i), ids[i])
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, item)
+            elif item[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+            else:
+                break
+        self.seen += len(ids)
+
+    def results(self) -> List[Tuple[Hashable, float]]:
+        """The k best so far, best first."""
+        return [(pid, score) for score, _, pid in sorted(self._heap, reverse=True)]
+
+
+def stream_scores(path: str,
+                  scorer: PropertyScorer,
+                  factors: Mapping[str, Dict[str, Any]],
+                  defaults: Mapping[str, Any],
+                  *,
+                  chunk_rows: int = 50_000,
+                  id_column: Optional[str] = "Address",
+                  sinks: Iterable[Callable[[List[Hashable], np.ndarray], None]] = (),
+                  cache: Optional["FeedCache"] = None,
+                  ) -> Dict[str, float]:
+    """
+    Run the whole pipeline over a CSV feed.
+
+    Makes a pre-pass for the quality bounds when any factor needs them,
+    then streams chunk by chunk through parse and scoring into `sinks`
+    (e.g. TopK.push, or a writer). With a `cache`, the parsed columns are
+    loaded from it instead (parsing and storing whatever it lacks), and
+    only the scoring is chunked.
+
+    Args:
+        path:       CSV file
+        scorer:     the profile to score with; only its active factors
+                    are parsed
+        factors:    FACTORS-style specs, factor_key → spec
+        defaults:   fallbacks for options a spec omits
+        chunk_rows: rows held in memory at a time
+        id_column:  column holding the property id
+        sinks:      callables fed (ids, scores) for every chunk
+        cache:      optional FeedCache to load the parsed feed from
+
+    Returns:
+        {"rows", "seconds", "rows_per_sec"}
+    """
+    used = {fp.key: factors[fp.key] for fp in scorer.plan.active_factors()}
+    start = time.perf_counter()
+
+    if cache is not None:
+        batches = _cached_batches(cache.load(path, used, defaults), chunk_rows)
+    else:
+        bounds  = feed_bounds(path, used, defaults, chunk_rows=chunk_rows)
+        chunks  = read_chunks(path, used, chunk_rows=chunk_rows, id_column=id_column)
+        batches = parse_chunks(chunks, used, defaults, bounds, id_column=id_column)
+
+    rows = 0
+    for ids, scores in score_chunks(batches, scorer):
+        for sink in sinks:
+            sink(ids, scores)
+        rows += len(ids)
+
+    seconds = time.perf_counter() - start
+    return {"rows": rows, "seconds": seconds,
+            "rows_per_sec": rows / seconds if seconds else 0.0}
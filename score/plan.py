@@ -0,0 +1,164 @@
+# score/plan.py
+
+from __future__ import annotations
+from typing import Dict, Any, Iterator, Tuple
+
+import numpy as np
+
+# Mode codes
+MUST_HAVE    = 0
+NICE_TO_HAVE = 1
+IRRELEVANT   = 2
+
+MODE_CODES = {
+    "must_have":    MUST_HAVE,
+    "nice_to_have": NICE_TO_HAVE,
+    "irrelevant":   IRRELEVANT,
+}
+
+# Aggregation codes (multi-POI factors)
+AGG_MEAN       = 0
+AGG_MEDIAN     = 1
+AGG_MIN        = 2
+AGG_MAX        = 3
+AGG_K_NEAREST  = 4
+AGG_K_FARTHEST = 5
+AGG_PERCENTILE = 6
+
+AGG_CODES = {
+    "mean":       AGG_MEAN,
+    "median":     AGG_MEDIAN,
+    "min":        AGG_MIN,
+    "max":        AGG_MAX,
+    "k_nearest":  AGG_K_NEAREST,
+    "k_farthest": AGG_K_FARTHEST,
+    "percentile": AGG_PERCENTILE,
+}
+
+# Decay codes (0 = no weighted-decay aggregation)
+DECAY_NONE      = 0
+DECAY_LINEAR    = 1
+DECAY_EXP       = 2
+DECAY_QUADRATIC = 3
+
+DECAY_CODES = {
+    "linear":    DECAY_LINEAR,
+    "exp":       DECAY_EXP,
+    "quadratic": DECAY_QUADRATIC,
+}
+
+
+class _Frozen:
+    """Slot-based base whose attributes can only be set in __init__."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __setstate__(self, state: Tuple[Any, Dict[str, Any]]) -> None:
+        # unpickling (e.g. shipping a scorer to a worker process)
+        for name, value in state[1].items():
+            object.__setattr__(self, name, value)
+
+
+class FactorPlan(_Frozen):
+    """
+    One factor of a compiled profile.
+
+    Holds the validated config as plain attributes plus everything the
+    scoring paths would otherwise recompute per call:
+      - mode / agg / decay as integer codes
+      - inv_upper = 1 / (upper - target), inv_lower = 1 / (target - lower)
+      - pct = percentile * 100, decay_span = max(upper - lower, 1e-12)
+    """
+
+    __slots__ = (
+        "key", "mode", "direction", "target", "lower", "upper", "weight",
+        "multi", "agg", "nearest_k", "farthest_k", "pct",
+        "decay", "decay_rate", "decay_span", "inv_upper", "inv_lower",
+    )
+
+    def __init__(self, key: str, cfg: Dict[str, Any]):
+        t, l, u = cfg["target"], cfg["lower"], cfg["upper"]
+        decay   = cfg.get("decay_function")
+        values  = {
+            "key":        key,
+            "mode":       MODE_CODES[cfg["mode"]],
+            "direction":  cfg["direction"],
+            "target":     t,
+            "lower":      l,
+            "upper":      u,
+            "weight":     cfg["weight"],
+            "multi":      bool(cfg.get("multi")),
+            "agg":        AGG_CODES.get(cfg.get("aggregation"), AGG_MEAN),
+            "nearest_k":  cfg.get("nearest_k", 1),
+            "farthest_k": cfg.get("farthest_k", 1),
+            "pct":        cfg.get("percentile", 0.5) * 100,
+            # unknown decay names fall back to linear, as before
+            "decay":      DECAY_CODES.get(decay, DECAY_LINEAR) if decay else DECAY_NONE,
+            "decay_rate": float(cfg.get("decay_rate", 1.0)),
+            "decay_span": max(u - l, 1e-12),
+            # a zero-width side of the band is never divided by
+            "inv_upper":  1.0 / (u - t) if u > t else 0.0,
+            "inv_lower":  1.0 / (t - l) if t > l else 0.0,
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __repr__(self) -> str:
+        return f"FactorPlan({self.key!r}, mode={self.mode}, weight={self.weight})"
+
+    @property
+    def signature(self) -> Tuple[Any, ...]:
+        """Every attribute except key and weight: equal signatures give equal fs."""
+        return tuple(getattr(self, name) for name in self.__slots__
+                     if name not in ("key", "weight"))
+
+
+class CompiledProfile(_Frozen):
+    """
+    Immutable scoring plan built once from a validated profile.
+
+    Attributes:
+        factors:   every FactorPlan, in profile order
+        active:    indices into `factors` of the non-irrelevant ones
+        weights:   read-only float64 weight vector aligned with `active`
+        by_weight: the active FactorPlans, heaviest first (ties keep
+                   profile order)
+    """
+
+    __slots__ = ("factors", "active", "weights", "by_weight", "_index")
+
+    def __init__(self, profile: Dict[str, Dict[str, Any]]):
+        factors = tuple(FactorPlan(k, cfg) for k, cfg in profile.items())
+        active  = tuple(i for i, fp in enumerate(factors) if fp.mode != IRRELEVANT)
+        weights = np.array([factors[i].weight for i in active], dtype=float)
+        weights.setflags(write=False)
+        by_weight = tuple(sorted((factors[i] for i in active), key=lambda fp: -fp.weight))
+        object.__setattr__(self, "factors",   factors)
+        object.__setattr__(self, "active",    active)
+        object.__setattr__(self, "weights",   weights)
+        object.__setattr__(self, "by_weight", by_weight)
+        object.__setattr__(self, "_index",    {fp.key: fp for fp in factors})
+
+    def __getitem__(self, key: str) -> FactorPlan:
+        return self._index[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self.factors)
+
+    def active_factors(self) -> Iterator[FactorPlan]:
+        """Yield the non-irrelevant factors in profile order."""
+        for i in self.active:
+            yield self.factors[i]
+
+    @property
+    def keys(self) -> Tuple[str, ...]:
+        return tuple(fp.key for fp in self.factors)
@@ -0,0 +1,484 @@
+# score/ragged.py
+
+from __future__ import annotations
+import math
+from itertools import chain
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .plan import (
+    FactorPlan,
+    AGG_MEDIAN, AGG_MIN, AGG_MAX,
+    AGG_K_NEAREST, AGG_K_FARTHEST, AGG_PERCENTILE,
+    DECAY_EXP, DECAY_QUADRATIC,
+)
+
+
+def _float_values(values: Any) -> np.ndarray:
+    """`values` as a float32 or float64 array (anything else → float64)."""
+    arr = np.asarray(values)
+    if arr.dtype == np.float32 or arr.dtype == np.float64:
+        return arr
+    return arr.astype(float)
+
+
+class RaggedArray:
+    """
+    Packed list-of-lists for multi-POI factors (CSR layout).
+
+    Row i is `values[offsets[i]:offsets[i+1]]`. `valid[i]` is False for rows
+    that carried no list at all (missing raw), as opposed to an empty list.
+
+    Args:
+        values:  flat float64 array of every row's values, row after row
+                 (float32 is kept as is, see columns.compact; the kernels
+                 still compute in float64)
+        offsets: int64 array of length n+1, offsets[0] == 0
+        valid:   optional bool mask of length n (default: all True)
+    """
+
+    __slots__ = ("values", "offsets", "valid")
+
+    def __init__(self,
+                 values: np.ndarray,
+                 offsets: np.ndarray,
+                 valid: Optional[np.ndarray] = None):
+        self.values  = _float_values(values)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        n = len(self.offsets) - 1
+        self.valid   = np.ones(n, dtype=bool) if valid is None else np.asarray(valid, dtype=bool)
+
+    @classmethod
+    def from_lists(cls, rows: Sequence[Any]) -> "RaggedArray":
+        """Pack a sequence of lists; anything that is not a list marks a missing row."""
+        valid  = np.fromiter((isinstance(r, list) for r in rows), dtype=bool, count=len(rows))
+        counts = np.fromiter((len(r) if ok else 0 for r, ok in zip(rows, valid)),
+                             dtype=np.int64, count=len(rows))
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        lists  = (r for r, ok in zip(rows, valid) if ok)
+        values = np.fromiter(chain.from_iterable(lists), dtype=float, count=int(offsets[-1]))
+        return cls(values, offsets, valid)
+
+    @classmethod
+    def concat(cls, parts: Sequence["RaggedArray"]) -> "RaggedArray":
+        """Stack RaggedArrays row-wise."""
+        if not parts:
+            return cls(np.zeros(0), np.zeros(1, dtype=np.int64))
+        sizes   = [int(p.offsets[-1] - p.offsets[0]) for p in parts]
+        shifts  = np.cumsum([0] + sizes[:-1])
+        offsets = np.concatenate([np.zeros(1, dtype=np.int64)] +
+                                 [p.offsets[1:] - p.offsets[0] + s for p, s in zip(parts, shifts)])
+        return cls(np.concatenate([p.values[p.offsets[0]:p.offsets[-1]] for p in parts]),
+                   offsets,
+                   np.concatenate([p.valid for p in parts]))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> Optional[List[float]]:
+        if not self.valid[i]:
+            return None
+        return self.values[self.offsets[i]:self.offsets[i + 1]].tolist()
+
+    @property
+    def starts(self) -> np.ndarray:
+        return self.offsets[:-1]
+
+    @property
+    def counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def tolist(self) -> List[Optional[List[float]]]:
+        """Unpack back into Python lists (None for missing rows)."""
+        return [self[i] for i in range(len(self))]
+
+    def take(self, rows: np.ndarray) -> "RaggedArray":
+        """Return a new RaggedArray holding only `rows`, in that order."""
+        rows    = np.asarray(rows, dtype=np.int64)
+        starts  = self.offsets[rows]
+        counts  = self.offsets[rows + 1] - starts
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        idx = np.repeat(starts - offsets[:-1], counts) + np.arange(offsets[-1])
+        return RaggedArray(self.values[idx], offsets, self.valid[rows])
+
+    def slice(self, start: int, stop: int) -> "RaggedArray":
+        """Rows [start, stop) as a RaggedArray sharing this one's values buffer."""
+        stop   = min(stop, len(self))
+        lo, hi = self.offsets[start], self.offsets[stop]
+        return RaggedArray(self.values[lo:hi], self.offsets[start:stop + 1] - lo,
+                           self.valid[start:stop])
+
+    def filter_band(self, lower: float, upper: float) -> "RaggedArray":
+        """Keep only values in [lower,upper], row structure preserved."""
+        # float64 bounds, so float32 values are compared exactly
+        lower, upper = np.float64(lower), np.float64(upper)
+        keep = (self.values >= lower) & (self.values <= upper)
+        csum = np.zeros(len(keep) + 1, dtype=np.int64)
+        np.cumsum(keep, out=csum[1:])
+        return RaggedArray(self.values[keep], csum[self.offsets], self.valid)
+
+
+class SortedRagged(RaggedArray):
+    """
+    RaggedArray with every row sorted ascending and a running sum per row,
+    built once per column so any [lower,upper] band can be aggregated
+    without filtering or sorting: the band is two binary searches per row,
+    and min, max, median, percentile, mean, k_nearest and k_farthest are
+    then O(1) each.
+
+    An opt-in trade of exactness for speed when many profiles score the
+    same listings. min, max, median and percentile equal score_property's
+    bit for bit; the means are prefix-sum differences, which can differ
+    from score_property's POI-order sums in the last bits, and so can
+    decay-weighted means (summed in sorted order over the band).
+
+    Args:
+        values, offsets, valid: as RaggedArray, every row already sorted
+        csum: the running sums of these values, when already computed
+              (e.g. a view of a SharedBatch block); built otherwise
+
+    Attributes:
+        csum: csum[j] is the sum of row values from the row's start up to
+              and including position j
+    """
+
+    __slots__ = ("csum",)
+
+    def __init__(self,
+                 values: np.ndarray,
+                 offsets: np.ndarray,
+                 valid: Optional[np.ndarray] = None,
+                 csum: Optional[np.ndarray] = None):
+        super().__init__(values, offsets, valid)
+        if csum is None:
+            starts, counts = self.starts, self.counts
+            csum = self.values.astype(float)
+            for j in range(1, int(counts.max(initial=0))):
+                rows = np.flatnonzero(counts > j)
+                pos  = starts[rows] + j
+                csum[pos] += csum[pos - 1]
+        self.csum = csum
+
+    @classmethod
+    def from_ragged(cls, r: RaggedArray) -> "SortedRagged":
+        """Sort every row of `r` (rows and validity unchanged)."""
+        if isinstance(r, SortedRagged):
+            return r
+        lo = r.offsets[0]
+        return cls(_sorted_values(r), r.offsets - lo, r.valid)
+
+    @classmethod
+    def from_lists(cls, rows: Sequence[Any]) -> "SortedRagged":
+        return cls.from_ragged(RaggedArray.from_lists(rows))
+
+    # running sums restart at every row, so they move with their rows
+
+    def take(self, rows: np.ndarray) -> "SortedRagged":
+        r    = super().take(rows)
+        csum = RaggedArray(self.csum, self.offsets).take(rows).values
+        return SortedRagged(r.values, r.offsets, r.valid, csum)
+
+    def slice(self, start: int, stop: int) -> "SortedRagged":
+        r  = super().slice(start, stop)
+        lo = self.offsets[start]
+        return SortedRagged(r.values, r.offsets, r.valid, self.csum[lo:lo + len(r.values)])
+
+    def band(self, lower: float, upper: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per row, the positions [lo, hi) of the values in [lower,upper].
+        """
+        starts, ends = self.starts, self.offsets[1:]
+        return (_bisect(self.values, starts, ends, lower, right=False),
+                _bisect(self.values, starts, ends, upper, right=True))
+
+    def _range_sum(self, start: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        """Sum of values[lo:hi] per row starting at `start` (start <= lo < hi)."""
+        before = np.where(lo > start, self.csum[np.maximum(lo - 1, 0)], 0.0)
+        return self.csum[hi - 1] - before
+
+    def aggregate(self, fp: FactorPlan) -> np.ndarray:
+        """
+        aggregate() for a sorted column: NaN where a row has nothing in
+        band (or is missing).
+        """
+        lo, hi = self.band(fp.lower, fp.upper)
+        cnt = hi - lo
+        nz  = cnt > 0
+        out = np.full(len(self), np.nan)
+        lo, hi, cnt, start = lo[nz], hi[nz], cnt[nz], self.starts[nz]
+        s = self.values
+
+        if fp.decay:
+            offsets = np.zeros(len(cnt) + 1, dtype=np.int64)
+            np.cumsum(cnt, out=offsets[1:])
+            idx = np.repeat(lo - offsets[:-1], cnt) + np.arange(offsets[-1])
+            out[nz] = segment_decay_mean(RaggedArray(s[idx], offsets), fp)
+        elif fp.agg == AGG_MIN:
+            out[nz] = s[lo]
+        elif fp.agg == AGG_MAX:
+            out[nz] = s[hi - 1]
+        elif fp.agg == AGG_MEDIAN:
+            mid = lo + cnt // 2
+            odd = cnt % 2 == 1
+            a, b = s[np.where(odd, mid, mid - 1)].astype(float), s[mid].astype(float)
+            out[nz] = np.where(odd, b, (a + b) / 2)
+        elif fp.agg == AGG_PERCENTILE:
+            pos  = (cnt - 1) * (fp.pct / 100.0)
+            base = np.floor(pos)
+            frac = pos - base
+            base = base.astype(np.int64)
+            top  = np.minimum(base + 1, cnt - 1)
+            a, b = s[lo + base].astype(float), s[lo + top].astype(float)
+            out[nz] = a + (b - a) * frac
+        elif fp.agg == AGG_K_NEAREST:
+            take = np.minimum(cnt, fp.nearest_k)
+            out[nz] = self._range_sum(start, lo, lo + take) / take
+        elif fp.agg == AGG_K_FARTHEST:
+            take = np.minimum(cnt, fp.farthest_k)
+            out[nz] = self._range_sum(start, hi - take, hi) / take
+        else:
+            out[nz] = self._range_sum(start, lo, hi) / cnt
+        out[~self.valid] = np.nan
+        return out
+
+
+def _bisect(values: np.ndarray,
+            lo: np.ndarray,
+            hi: np.ndarray,
+            x: float,
+            right: bool) -> np.ndarray:
+    """
+    Vectorized bisect_left (bisect_right if `right`) of `x` into each
+    sorted run values[lo[i]:hi[i]].
+    """
+    lo, hi, x = lo.copy(), hi.copy(), np.float64(x)
+    while True:
+        rows = np.flatnonzero(lo < hi)
+        if not len(rows):
+            return lo
+        mid = (lo[rows] + hi[rows]) // 2
+        v   = values[mid]
+        up  = v <= x if right else v < x
+        lo[rows[up]]  = mid[up] + 1
+        hi[rows[~up]] = mid[~up]
+
+
+# ─── Segment kernels ────────────────────────────────────────────────────
+#
+# Every kernel mirrors the operation order of PropertyScorer._aggregate so
+# a batch gives bit-identical results: sums run left to right within each
+# segment (one vector step per position), never pairwise.
+
+def _seq_sum(values: np.ndarray,
+             starts: np.ndarray,
+             counts: np.ndarray,
+             reverse: bool = False) -> np.ndarray:
+    """
+    Left-to-right sum of `counts[i]` values starting at `starts[i]`
+    (or ending just before `starts[i]`, walking backwards, if `reverse`).
+    """
+    out = np.zeros(len(starts))
+    for j, rows in _positions(counts):
+        pos = starts[rows] - 1 - j if reverse else starts[rows] + j
+        out[rows] += values[pos]
+    return out
+
+
+def _positions(counts: np.ndarray):
+    """
+    Yield (j, rows) for every position j, `rows` being the segments longer
+    than j. Segments are ranked longest first once, so each step is a
+    slice instead of a scan of every segment.
+    """
+    order  = np.argsort(-counts, kind="stable")
+    ranked = counts[order]
+    for j in range(int(ranked[0]) if len(ranked) else 0):
+        yield j, order[:np.searchsorted(-ranked, -j, side="left")]
+
+
+def _sorted_values(r: RaggedArray) -> np.ndarray:
+    """Return `r.values` sorted ascending within each segment."""
+    seg = np.repeat(np.arange(len(r)), r.counts)
+    return r.values[np.lexsort((r.values, seg))]
+
+
+def segment_mean(r: RaggedArray) -> np.ndarray:
+    """Per-row mean (NaN for empty rows)."""
+    counts = r.counts
+    out = np.full(len(r), np.nan)
+    nz = counts > 0
+    out[nz] = _seq_sum(r.values, r.starts, counts)[nz] / counts[nz]
+    return out
+
+
+def segment_min(r: RaggedArray) -> np.ndarray:
+    """Per-row minimum (NaN for empty rows)."""
+    out = np.full(len(r), np.nan)
+    nz = r.counts > 0
+    if nz.any():
+        out[nz] = np.minimum.reduceat(r.values, r.starts[nz])
+    return out
+
+
+def segment_max(r: RaggedArray) -> np.ndarray:
+    """Per-row maximum (NaN for empty rows)."""
+    out = np.full(len(r), np.nan)
+    nz = r.counts > 0
+    if nz.any():
+        out[nz] = np.maximum.reduceat(r.values, r.starts[nz])
+    return out
+
+
+def _by_count(r: RaggedArray, kth):
+    """
+    Yield (rows, c, part) for every distinct non-zero row length c:
+    `rows` are the rows of that length and `part` their values as an
+    (len(rows), c) matrix, np.partition-ed so that every column index in
+    kth(c) holds the value a full sort would put there. Rows of one
+    length share their kth, so each group is a single introselect call
+    and nothing is sorted.
+    """
+    counts = r.counts
+    order  = np.argsort(counts, kind="stable")
+    ranked = counts[order]
+    for rows in np.split(order, np.flatnonzero(np.diff(ranked)) + 1):
+        c = int(counts[rows[0]]) if len(rows) else 0
+        if c == 0:
+            continue
+        block = r.values[r.starts[rows][:, None] + np.arange(c)].astype(float, copy=False)
+        yield rows, c, np.partition(block, kth(c), axis=1)
+
+
+def segment_median(r: RaggedArray) -> np.ndarray:
+    """Per-row median, matching statistics.median (NaN for empty rows)."""
+    out = np.full(len(r), np.nan)
+    for rows, c, part in _by_count(r, lambda c: [(c - 1) // 2, c // 2]):
+        mid = c // 2
+        if c % 2:
+            out[rows] = part[:, mid]
+        else:
+            out[rows] = (part[:, mid - 1] + part[:, mid]) / 2
+    return out
+
+
+def segment_k_mean(r: RaggedArray, k: int, farthest: bool = False) -> np.ndarray:
+    """
+    Per-row mean of the k smallest (or k largest) values (NaN for empty
+    rows), summed smallest first (largest first) like the scalar path.
+    """
+    out = np.full(len(r), np.nan)
+    if farthest:
+        kth = lambda c: list(range(c - min(c, k), c))
+    else:
+        kth = lambda c: list(range(min(c, k)))
+    for rows, c, part in _by_count(r, kth):
+        take  = min(c, k)
+        total = np.zeros(len(rows))
+        for j in range(take):
+            total += part[:, c - 1 - j] if farthest else part[:, j]
+        out[rows] = total / take
+    return out
+
+
+def segment_percentile(r: RaggedArray, pct: float) -> np.ndarray:
+    """
+    Per-row linear-interpolated percentile, `pct` in [0,100]
+    (NaN for empty rows). Same definition as np.percentile's default.
+    """
+    def bounds(c):
+        pos = (c - 1) * (pct / 100.0)
+        lo  = math.floor(pos)
+        return lo, min(lo + 1, c - 1), pos - lo
+
+    out = np.full(len(r), np.nan)
+    for rows, c, part in _by_count(r, lambda c: sorted(set(bounds(c)[:2]))):
+        lo, hi, frac = bounds(c)
+        a, b = part[:, lo], part[:, hi]
+        out[rows] = a + (b - a) * frac
+    return out
+
+
+def decay_weights(values: np.ndarray, fp: FactorPlan) -> np.ndarray:
+    """Decay weight in [0,1] for every value, by distance from target."""
+    d = np.abs(values - fp.target) / fp.decay_span
+    rd = fp.decay_rate * d
+    if fp.decay == DECAY_EXP:
+        return np.exp(-rd)
+    if fp.decay == DECAY_QUADRATIC:
+        return np.maximum(0.0, 1.0 - rd * rd)
+    return np.maximum(0.0, 1.0 - rd)
+
+
+def decay_mean(values: np.ndarray, fp: FactorPlan) -> float:
+    """
+    Decay-weighted mean of one property's in-band values, falling back to
+    the unweighted mean when every weight is zero. Same arithmetic as
+    segment_decay_mean; np.add.accumulate sums strictly left to right.
+    """
+    w   = decay_weights(values, fp)
+    den = np.add.accumulate(w)[-1]
+    if den:
+        return float(np.add.accumulate(values * w)[-1] / den)
+    return float(np.add.accumulate(values)[-1] / len(values))
+
+
+def segment_decay_mean(r: RaggedArray, fp: FactorPlan) -> np.ndarray:
+    """
+    Per-row decay-weighted mean; rows whose weights are all zero fall back
+    to the unweighted mean (NaN for empty rows).
+
+    One fused pass: each position's weights, weighted sum, weight sum and
+    plain sum are computed together, with no value-sized temporaries.
+    """
+    counts, starts = r.counts, r.starts
+    num   = np.zeros(len(r))
+    den   = np.zeros(len(r))
+    total = np.zeros(len(r))
+    for j, rows in _positions(counts):
+        v = r.values[starts[rows] + j].astype(float, copy=False)
+        w = decay_weights(v, fp)
+        num[rows]   += v * w
+        den[rows]   += w
+        total[rows] += v
+
+    out = np.full(len(r), np.nan)
+    nz  = counts > 0
+    out[nz] = total[nz] / counts[nz]
+    ok  = den != 0
+    out[ok] = num[ok] / den[ok]
+    return out
+
+
+def aggregate(r: RaggedArray, fp: FactorPlan) -> np.ndarray:
+    """
+    Segment-wise PropertyScorer._aggregate: filter every row to the factor's
+    [lower,upper] band, then collapse it per `fp.agg` / `fp.decay`
+    (SortedRagged columns use their presorted fast path instead).
+
+    Returns:
+        float64 array, NaN where a row has nothing in band (or is missing).
+    """
+    if isinstance(r, SortedRagged):
+        return r.aggregate(fp)
+    band = r.filter_band(fp.lower, fp.upper)
+    if fp.decay:
+        out = segment_decay_mean(band, fp)
+    elif fp.agg == AGG_MEDIAN:
+        out = segment_median(band)
+    elif fp.agg == AGG_MIN:
+        out = segment_min(band)
+    elif fp.agg == AGG_MAX:
+        out = segment_max(band)
+    elif fp.agg == AGG_K_NEAREST:
+        out = segment_k_mean(band, fp.nearest_k)
+    elif fp.agg == AGG_K_FARTHEST:
+        out = segment_k_mean(band, fp.farthest_k, farthest=True)
+    elif fp.agg == AGG_PERCENTILE:
+        out = segment_percentile(band, fp.pct)
+    else:
+        out = segment_mean(band)
+    out[~r.valid] = np.nan
+    return out
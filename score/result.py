@@ -0,0 +1,115 @@
+# score/result.py
+
+from __future__ import annotations
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .trace import batch_trace
+
+
+class FactorColumn:
+    """
+    One factor scored over a whole batch.
+
+    Attributes:
+        present: rows that carry the factor (others skip it entirely)
+        x:       value fed to _raw: the raw scalar, or the multi-POI
+                 aggregate (NaN where nothing was in band)
+        r:       raw-match score per row
+        fs:      blended factor score per row
+        failed:  rows failing it as a must_have (None for nice_to_have)
+    """
+
+    __slots__ = ("present", "x", "r", "fs", "failed")
+
+    def __init__(self,
+                 present: np.ndarray,
+                 x: np.ndarray,
+                 r: np.ndarray,
+                 fs: np.ndarray,
+                 failed: Optional[np.ndarray]):
+        self.present = present
+        self.x       = x
+        self.r       = r
+        self.fs      = fs
+        self.failed  = failed
+
+
+def combine_factors(n: int, steps: Sequence[Tuple[float, FactorColumn]]) -> np.ndarray:
+    """
+    Weighted mean of per-factor batch results, accumulated in the given
+    (profile) order exactly as score_property does.
+
+    Args:
+        n:     number of properties
+        steps: (weight, FactorColumn) per factor
+
+    Returns:
+        float64 scores, 0.0 where any must_have failed.
+    """
+    weighted_sum = np.zeros(n)
+    total_weight = np.zeros(n)
+    failed       = np.zeros(n, dtype=bool)
+    for weight, col in steps:
+        present = col.present
+        weighted_sum[present] += weight * col.fs[present]
+        total_weight[present] += weight
+        if col.failed is not None:
+            failed |= col.failed
+
+    scores = np.zeros(n)
+    np.divide(weighted_sum, total_weight, out=scores, where=total_weight != 0)
+    scores[failed] = 0.0
+    return scores
+
+
+class BatchResult:
+    """
+    Final scores plus per-factor detail for a batch, from one pass.
+
+    Attributes:
+        factors:   keys of the scored factors, in profile order (F)
+        scores:    final score per property, shape (n,)
+        fs:        blended factor scores, shape (n, F); NaN where the factor
+                   was skipped for that property
+        failed_on: index into `factors` of the first must_have that zeroed
+                   the property, or -1, shape (n,)
+        trace:     (n, F) trace record array (see score/trace.py), or None
+                   unless tracing was requested
+
+    Args:
+        keys, cols, scores: scored factor keys, their FactorColumns and the
+                            combined scores
+        qualities:          the batch's quality columns, to build the
+                            trace; None skips tracing entirely
+    """
+
+    __slots__ = ("factors", "scores", "fs", "failed_on", "trace")
+
+    def __init__(self,
+                 keys: Sequence[str],
+                 cols: Sequence[FactorColumn],
+                 scores: np.ndarray,
+                 qualities: Optional[Mapping[str, Any]] = None):
+        n, f = len(scores), len(cols)
+        self.factors   = tuple(keys)
+        self.scores    = scores
+        self.fs        = np.full((n, f), np.nan)
+        self.failed_on = np.full(n, -1, dtype=np.int64)
+        for j in reversed(range(f)):
+            col = cols[j]
+            self.fs[col.present, j] = col.fs[col.present]
+            if col.failed is not None:
+                self.failed_on[col.failed] = j
+        self.trace = None if qualities is None else batch_trace(keys, cols, qualities, self.failed_on)
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def row(self, i: int) -> Dict[str, float]:
+        """Factor key → fs for property i (skipped factors omitted)."""
+        return {k: float(v) for k, v in zip(self.factors, self.fs[i]) if not np.isnan(v)}
+
+    def tolist(self) -> List[float]:
+        return self.scores.tolist()
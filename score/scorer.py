@@ -1,52 +1,84 @@
 # score/scorer.py
 
 from __future__ import annotations
+import heapq
 import logging
 import math
 import statistics
-from typing import Dict, Any, List, Optional
-
-import numpy as np  # for percentile calculations
+from typing import TYPE_CHECKING, Dict, Any, Hashable, List, Mapping, Optional, Tuple
+
+import numpy as np  # for batch scoring
+
+from .plan import (
+    CompiledProfile, FactorPlan,
+    MUST_HAVE, IRRELEVANT, AGG_MEAN, AGG_MEDIAN, AGG_MIN, AGG_MAX,
+    AGG_K_NEAREST, AGG_K_FARTHEST, AGG_PERCENTILE,
+)
+from .config import FactorConfig, check_factor
+from .ragged import RaggedArray, aggregate as aggregate_segments, decay_mean
+from .columns import batch_len, take_rows
+from .result import BatchResult, FactorColumn, combine_factors
+from .trace import (
+    new_trace, reset_trace, format_trace,
+    TRACE_SCORED, TRACE_IRRELEVANT, TRACE_MISSING, TRACE_NOT_LIST,
+    TRACE_NO_IN_BAND, TRACE_MUST_FAIL,
+)
+
+if TYPE_CHECKING:
+    from .index import MustHaveIndex
 
 logger = logging.getLogger(__name__)
 
-
-def _weighted_average(values: List[float], weights: List[float]) -> float:
-    """Return the weighted average of `values` with corresponding `weights`."""
-    total_w = sum(weights)
-    return sum(v * w for v, w in zip(values, weights)) / total_w if total_w else statistics.mean(values)
+# Slack when comparing a pruning bound against the k-th best score, so that
+# rounding in the bound can never discard a candidate that would qualify.
+_BOUND_SLACK = 1e-12
 
 
-def _decay_weights(vals: List[float], cfg: Dict[str, Any]) -> List[float]:
+def _mean(values: List[float]) -> float:
+    """
+    Left-to-right mean, the same summation order as the batch kernels.
+    statistics.mean, used before, rounds once from an exact sum; this can
+    differ from it in the last few ulp.
     """
-    Compute per-value decay weights based on distance from target.
+    total = 0.0
+    for v in values:
+        total += v
+    return total / len(values)
 
-    Args:
-        vals: List of raw values.
-        cfg:  Factor config, must contain:
-              - "target": float
-              - "lower", "upper": float
-              - "decay_function": Optional[str] ("linear", "exp", "quadratic")
-              - "decay_rate": float
-
-    Returns:
-        A list of floats in [0.0, 1.0] representing decay-based weights.
+
+def _percentile(sorted_vals: List[float], pct: float) -> float:
+    """
+    Linear-interpolated percentile (pct in [0,100]) of an ascending list:
+    np.percentile's default method, but with segment_percentile's
+    arithmetic, so it can differ from np.percentile in the last few ulp.
     """
-    fn   = cfg.get("decay_function", "linear")
-    rate = float(cfg.get("decay_rate", 1.0))
-    t, l, u = cfg["target"], cfg["lower"], cfg["upper"]
-    rng = max(u - l, 1e-12)
+    n    = len(sorted_vals)
+    pos  = (n - 1) * (pct / 100.0)
+    lo   = math.floor(pos)
+    frac = pos - lo
+    a, b = sorted_vals[lo], sorted_vals[min(lo + 1, n - 1)]
+    return a + (b - a) * frac
 
-    # Normalize distances from target into [0,1]
-    dists = [abs(v - t) / rng for v in vals]
 
-    if fn == "exp":
-        return [math.exp(-rate * d) for d in dists]
-    if fn == "quadratic":
-        return [max(0.0, 1.0 - (rate * d) ** 2) for d in dists]
+def _pow(base: np.ndarray, exp: float) -> np.ndarray:
+    """
+    Elementwise `base ** exp` with Python float semantics.
 
-    # default linear
-    return [max(0.0, 1.0 - rate * d) for d in dists]
+    `np.power` may dispatch to SIMD kernels that differ from libm in the
+    last ulp, so values that actually need a power go through Python's
+    float pow; the common r == 1.0 case, and exponents 0 and 1, are
+    resolved without one.
+    """
+    if exp == 1.0:
+        return np.array(base, dtype=float)
+    out = np.ones_like(base)
+    if exp == 0.0:
+        return out
+    todo = base != 1.0
+    if todo.any():
+        vals = base[todo].tolist()
+        out[todo] = np.fromiter((v ** exp for v in vals), dtype=float, count=len(vals))
+    return out
 
 
 class PropertyScorer:
@@ -65,7 +97,7 @@ class PropertyScorer:
 
     Args:
         profile (Dict[str, Dict[str, Any]]):
-            Mapping factor_key → config dict with:
+            Mapping factor_key → config dict (or FactorConfig) with:
               - mode (str): "must_have" | "nice_to_have" | "irrelevant"
               - target (float): ideal value
               - lower, upper (float, optional): band for nice_to_have decay
@@ -89,6 +121,19 @@ class PropertyScorer:
             Soft band width ± tol for must_have before failing.
         margin_epsilon (float, default=1e-6):
             Tiny epsilon to auto-nudge lower/upper when equal to target.
+        log_blend (bool, default=False):
+            Batch paths blend raw and quality in log space,
+            exp((1-w)·log r + w·log qual), with one exp and one log per
+            rated value instead of a Python float pow. Opt-in: scores then
+            differ from score_property in the last few bits (relative
+            error ~1e-15); the scalar paths are unaffected.
+
+    The keyword parameters can also come as a ScorerParams:
+    `PropertyScorer(profile, **params)`.
+
+    The profile is validated into a private copy and compiled once into
+    `self.plan` (a CompiledProfile), which every scoring path reads; the
+    caller's dicts are never modified, so a scorer can be shared freely.
     """
 
     ALLOWED_AGG = {
@@ -105,36 +150,46 @@ class PropertyScorer:
                  qual_exp: float = 1.0,
                  raw_floor: float = 0.05,
                  must_have_tolerance: float = 0.0,
-                 margin_epsilon: float = 1e-6):
+                 margin_epsilon: float = 1e-6,
+                 log_blend: bool = False):
         # Core parameters
-        self.profile     = profile
+        self.profile     = {factor: dict(cfg) for factor, cfg in profile.items()}
         self.max_quality = max_quality
         self.q_floor     = max(0.0, min(quality_floor, 1.0))
         self.q_weight    = max(0.0, min(quality_weight, 1.0))
         self.qual_exp    = max(0.0, qual_exp)
         self.r_floor     = max(0.0, min(raw_floor, 1.0))
         self.tol         = must_have_tolerance
+        self.inv_tol     = 1.0 / self.tol if self.tol else 0.0
         self.eps         = margin_epsilon
-
-        # Validate + auto-nudge any bounds issues
-        self._validate()
-
-    def _validate(self) -> None:
-        """Ensure every factor config is complete and consistent."""
+        self.log_blend   = bool(log_blend)
+
+        # `_qual(k) ** q_weight` for every integer rating k on a usual
+        # 1…max_quality scale (table index 0 clamps to 1), as its log when
+        # blending in log space; that is only worth it when both sides of
+        # the blend actually need a power
+        self._log_space = self.log_blend and 0.0 < self.q_weight < 1.0
+        top = int(max_quality) if 1 < max_quality <= 100 and float(max_quality).is_integer() else 0
+        self._qparts    = {k: self._qual(k) ** self.q_weight for k in range(1, top + 1)}
+        self._qtable    = None
+        if top:
+            self._qtable = np.array([self._qparts[max(k, 1)] for k in range(top + 1)])
+            if self._log_space:
+                with np.errstate(divide="ignore"):
+                    self._qtable = np.log(self._qtable)
+
+        # Validate + auto-nudge any bounds issues, then compile
+        self._validate(tuple(f for f, cfg in profile.items() if isinstance(cfg, FactorConfig)))
+        self.plan = CompiledProfile(self.profile)
+
+    def _validate(self, checked: Tuple[str, ...] = ()) -> None:
+        """
+        Ensure every factor config is complete and consistent; factors in
+        `checked` came in as FactorConfigs and skip the checks those ran.
+        """
         for factor, cfg in self.profile.items():
-            required = {"mode", "target", "direction", "weight"}
-            missing = required - cfg.keys()
-            if missing:
-                raise ValueError(f"[{factor}] missing keys: {missing}")
-
-            if cfg["mode"] not in ("must_have", "nice_to_have", "irrelevant"):
-                raise ValueError(f"[{factor}] invalid mode={cfg['mode']}")
-
-            if cfg["direction"] not in (-1, 1):
-                raise ValueError(f"[{factor}] direction must be -1 or +1")
-
-            if cfg["weight"] <= 0:
-                raise ValueError(f"[{factor}] weight must be > 0")
+            if factor not in checked:
+                check_factor(factor, cfg)
 
             # target/lower/upper consistency
             t = cfg["target"]
@@ -154,82 +209,79 @@ class PropertyScorer:
 
             # multi-POI aggregation defaults
             if cfg.get("multi"):
-                agg = cfg.get("aggregation")
-                if agg not in self.ALLOWED_AGG:
-                    raise ValueError(f"[{factor}] invalid aggregation={agg}")
-                # set defaults if missing
                 cfg.setdefault("nearest_k", 1)
                 cfg.setdefault("farthest_k", 1)
                 cfg.setdefault("percentile", 0.5)
 
-    def _aggregate(self, vals: List[float], cfg: Dict[str, Any]) -> Optional[float]:
+    def _aggregate(self, vals: List[float], fp: FactorPlan) -> Optional[float]:
         """
         Filter `vals` to [lower,upper] then aggregate.
         Returns None if no values remain in the band.
+
+        Means, percentiles and decay means use the batch kernels' arithmetic
+        rather than statistics.mean / np.percentile, so score_property and
+        score_many agree bit for bit; against those reference reductions an
+        aggregate moves by a few ulp at most (tests/test_reductions.py).
         """
-        l, u = cfg["lower"], cfg["upper"]
+        l, u = fp.lower, fp.upper
         in_band = [v for v in vals if l <= v <= u]
         if not in_band:
             return None
 
         # weighted-decay aggregation?
-        if cfg.get("decay_function"):
-            weights = _decay_weights(in_band, cfg)
-            return _weighted_average(in_band, weights)
+        if fp.decay:
+            return decay_mean(np.array(in_band), fp)
 
         # flat aggregations
-        agg = cfg.get("aggregation")
-        if agg == "mean":
-            return statistics.mean(in_band)
-        if agg == "median":
+        agg = fp.agg
+        if agg == AGG_MEAN:
+            return _mean(in_band)
+        if agg == AGG_MEDIAN:
             return statistics.median(in_band)
-        if agg == "min":
+        if agg == AGG_MIN:
             return min(in_band)
-        if agg == "max":
+        if agg == AGG_MAX:
             return max(in_band)
-        if agg == "k_nearest":
-            k = cfg["nearest_k"]
-            return statistics.mean(sorted(in_band)[:k])
-        if agg == "k_farthest":
-            k = cfg["farthest_k"]
-            return statistics.mean(sorted(in_band, reverse=True)[:k])
-        if agg == "percentile":
-            p = cfg["percentile"] * 100
-            return float(np.percentile(in_band, p))
+        if agg == AGG_K_NEAREST:
+            return _mean(sorted(in_band)[:fp.nearest_k])
+        if agg == AGG_K_FARTHEST:
+            return _mean(sorted(in_band, reverse=True)[:fp.farthest_k])
+        if agg == AGG_PERCENTILE:
+            return _percentile(sorted(in_band), fp.pct)
 
         # fallback
-        return statistics.mean(in_band)
+        return _mean(in_band)
 
-    def _raw(self, x: float, cfg: Dict[str, Any]) -> float:
+    def _raw(self, x: float, fp: FactorPlan) -> float:
         """
         Compute the raw-match score r ∈ [0,1] for a single value x.
         - must_have: pass/fail with optional soft tolerance
         - nice_to_have: linear decay inside [lower,upper]
         """
-        m, d, t, l, u = cfg["mode"], cfg["direction"], cfg["target"], cfg["lower"], cfg["upper"]
+        t = fp.target
 
-        if m == "must_have":
-            if d < 0:
+        if fp.mode == MUST_HAVE:
+            if fp.direction < 0:
                 if x <= t:
                     return 1.0
                 if self.tol and x <= t + self.tol:
-                    return 1.0 - (x - t) / self.tol
+                    return 1.0 - (x - t) * self.inv_tol
                 return 0.0
             else:
                 if x >= t:
                     return 1.0
                 if self.tol and x >= t - self.tol:
-                    return 1.0 - (t - x) / self.tol
+                    return 1.0 - (t - x) * self.inv_tol
                 return 0.0
 
         # nice_to_have
-        if x < l or x > u:
+        if x < fp.lower or x > fp.upper:
             return 0.0
 
-        if d < 0:
-            raw = 1.0 if x <= t else 1.0 - (x - t) / (u - t)
+        if fp.direction < 0:
+            raw = 1.0 if x <= t else 1.0 - (x - t) * fp.inv_upper
         else:
-            raw = 1.0 if x >= t else 1.0 - (t - x) / (t - l)
+            raw = 1.0 if x >= t else 1.0 - (t - x) * fp.inv_lower
 
         return max(self.r_floor, raw)
 
@@ -244,76 +296,388 @@ class PropertyScorer:
             norm = (math.exp(self.qual_exp * norm) - 1.0) / (math.exp(self.qual_exp) - 1.0)
         return self.q_floor + (1.0 - self.q_floor) * norm
 
+    def _qual_part(self, q: float) -> float:
+        """`_qual(q) ** q_weight`, looked up for integer ratings."""
+        part = self._qparts.get(q)
+        return self._qual(q) ** self.q_weight if part is None else part
+
     def score_property(self,
                        raw: Dict[str, Any],
                        quality: Dict[str, float],
-                       verbose: bool = False) -> float:
+                       verbose: bool = False,
+                       trace: Optional[np.ndarray] = None) -> float:
         """
         Compute the final blended score for one property.
 
         Args:
             raw:     Dict factor_key → raw numeric or list of numerics
             quality: Dict factor_key → subjective rating (1…max_quality)
-            verbose: if True, print per-factor debug output
+            verbose: if True, print the formatted per-factor trace
+            trace:   optional record array from `new_trace()`, filled with
+                     one record per profile factor (see score/trace.py)
 
         Returns:
             A float in [0.0,1.0].
         """
+        if verbose or trace is not None:
+            if trace is None:
+                trace = self.new_trace()
+            score = self._score_traced(raw, quality, trace)
+            if verbose:
+                print("\n── Scoring property ──")
+                print(format_trace(trace, self.plan.keys, score))
+            return score
+
         total_weight = 0.0
         weighted_sum = 0.0
 
-        if verbose:
-            print("\n── Scoring property ──")
+        for fp in self.plan.active_factors():
+            val = raw.get(fp.key)
+            if val is None:
+                continue
 
-        for factor, cfg in self.profile.items():
-            if cfg["mode"] == "irrelevant":
-                if verbose:
-                    print(f"{factor}: irrelevant → skip")
+            # handle multi-POI vs scalar
+            if fp.multi:
+                if not isinstance(val, list):
+                    continue
+                x_agg = self._aggregate(val, fp)
+                r = 0.0 if x_agg is None else self._raw(x_agg, fp)
+            else:
+                r = self._raw(float(val), fp)
+
+            # must_have fail short-circuits to zero
+            if fp.mode == MUST_HAVE and r == 0.0:
+                return 0.0
+
+            qv = quality.get(fp.key)
+            if qv is None:
+                fs = r  # raw-only
+            else:
+                fs = (r ** (1 - self.q_weight)) * self._qual_part(qv)
+
+            weighted_sum += fp.weight * fs
+            total_weight += fp.weight
+
+        return weighted_sum / total_weight if total_weight else 0.0
+
+    def new_trace(self) -> np.ndarray:
+        """Preallocate a trace buffer for `score_property(..., trace=)`."""
+        return new_trace(len(self.plan))
+
+    def _score_traced(self,
+                      raw: Dict[str, Any],
+                      quality: Dict[str, float],
+                      trace: np.ndarray) -> float:
+        """score_property, recording every factor into `trace`."""
+        reset_trace(trace)
+        nan = math.nan
+        total_weight = 0.0
+        weighted_sum = 0.0
+
+        for j, fp in enumerate(self.plan.factors):
+            if fp.mode == IRRELEVANT:
+                trace[j] = (nan, nan, nan, nan, TRACE_IRRELEVANT)
                 continue
 
-            val = raw.get(factor)
+            val = raw.get(fp.key)
             if val is None:
-                if verbose:
-                    print(f"{factor}: missing raw → skip")
+                trace[j] = (nan, nan, nan, nan, TRACE_MISSING)
                 continue
 
-            # handle multi-POI vs scalar
-            if cfg.get("multi"):
+            reason = TRACE_SCORED
+            if fp.multi:
                 if not isinstance(val, list):
-                    if verbose:
-                        print(f"{factor}: expected list → skip")
+                    trace[j] = (nan, nan, nan, nan, TRACE_NOT_LIST)
                     continue
-
-                x_agg = self._aggregate(val, cfg)
-                r = 0.0 if x_agg is None else self._raw(x_agg, cfg)
-                if verbose:
-                    if x_agg is None:
-                        print(f"{factor}: no in-band → r=0")
-                    else:
-                        print(f"{factor}: aggregated x={x_agg:.3f} → r={r:.3f}")
+                x = self._aggregate(val, fp)
+                if x is None:
+                    x, r, reason = nan, 0.0, TRACE_NO_IN_BAND
+                else:
+                    r = self._raw(x, fp)
             else:
                 x = float(val)
-                r = self._raw(x, cfg)
-                if verbose:
-                    print(f"{factor}: x={x:.3f} → r={r:.3f}")
+                r = self._raw(x, fp)
+
+            qv = quality.get(fp.key)
+            q  = nan if qv is None else qv
 
             # must_have fail short-circuits to zero
-            if cfg["mode"] == "must_have" and r == 0.0:
-                if verbose:
-                    print(f"{factor}: must_have failed → total=0")
+            if fp.mode == MUST_HAVE and r == 0.0:
+                trace[j] = (x, r, q, nan, TRACE_MUST_FAIL)
                 return 0.0
 
-            qv = quality.get(factor)
             if qv is None:
                 fs = r  # raw-only
-                if verbose:
-                    print(f"    raw-only → fs={fs:.3f}")
             else:
-                fs = (r ** (1 - self.q_weight)) * (self._qual(qv) ** self.q_weight)
-                if verbose:
-                    print(f"    blended with q={qv} → fs={fs:.3f}")
+                fs = (r ** (1 - self.q_weight)) * self._qual_part(qv)
+            trace[j] = (x, r, q, fs, reason)
 
-            weighted_sum += cfg["weight"] * fs
-            total_weight += cfg["weight"]
+            weighted_sum += fp.weight * fs
+            total_weight += fp.weight
 
         return weighted_sum / total_weight if total_weight else 0.0
+
+    # ─── Top-K ranking ──────────────────────────────────────────────────
+
+    def _factor_score(self,
+                      fp: FactorPlan,
+                      val: Any,
+                      qv: Optional[float]) -> Tuple[float, float]:
+        """Return (r, fs) for one factor whose raw value is present."""
+        if fp.multi:
+            x_agg = self._aggregate(val, fp)
+            r = 0.0 if x_agg is None else self._raw(x_agg, fp)
+        else:
+            r = self._raw(float(val), fp)
+        if qv is None:
+            return r, r
+        return r, (r ** (1 - self.q_weight)) * self._qual_part(qv)
+
+    def top_k(self,
+              properties: Mapping[Hashable, Dict[str, Any]],
+              k: int,
+              qualities: Optional[Mapping[Hashable, Dict[str, float]]] = None
+              ) -> List[Tuple[Hashable, float]]:
+        """
+        Return the `k` best-scoring properties without fully scoring the rest.
+
+        Factors are evaluated heaviest first. After each one the best final
+        score a property could still reach is bounded by
+        (sum + rest) / (weight + rest), where `rest` is the weight of its
+        remaining present factors (each contributes at most weight × 1.0);
+        once that bound falls below the current k-th best the property is
+        abandoned. A failed must_have abandons it immediately.
+
+        Args:
+            properties: Mapping property_id → raw dict (as for score_property)
+            k:          number of results to return
+            qualities:  Mapping property_id → quality dict (default: none)
+
+        Returns:
+            Up to k (property_id, score) pairs, best first. Scores equal
+            score_property's; ties keep input order.
+        """
+        if k <= 0:
+            return []
+        qualities = qualities or {}
+        ranked    = self.plan.by_weight
+
+        best: List[Tuple[float, int, Hashable]] = []   # min-heap of the k best
+        for pos, (pid, raw) in enumerate(properties.items()):
+            quality = qualities.get(pid) or {}
+            full    = len(best) == k
+            kth     = best[0][0] if full else 0.0
+
+            present = [fp for fp in ranked
+                       if raw.get(fp.key) is not None
+                       and (not fp.multi or isinstance(raw[fp.key], list))]
+            rest = 0.0
+            for fp in present:
+                rest += fp.weight
+
+            fs_map: Optional[Dict[str, float]] = {}
+            weighted_sum = total_weight = 0.0
+            for fp in present:
+                r, fs = self._factor_score(fp, raw[fp.key], quality.get(fp.key))
+                if fp.mode == MUST_HAVE and r == 0.0:
+                    fs_map = None
+                    break
+                fs_map[fp.key] = fs
+                weighted_sum  += fp.weight * fs
+                total_weight  += fp.weight
+                rest          -= fp.weight
+                if full and (weighted_sum + rest) / (total_weight + rest) < kth - _BOUND_SLACK:
+                    break
+            else:
+                # completed: re-sum in profile order so the score is exact
+                weighted_sum = total_weight = 0.0
+                for fp in self.plan.active_factors():
+                    if fp.key in fs_map:
+                        weighted_sum += fp.weight * fs_map[fp.key]
+                        total_weight += fp.weight
+                score = weighted_sum / total_weight if total_weight else 0.0
+                if not full:
+                    heapq.heappush(best, (score, -pos, pid))
+                elif score > kth:
+                    heapq.heapreplace(best, (score, -pos, pid))
+                continue
+
+            # must_have failure: score 0.0, which only fills a non-full heap
+            if fs_map is None and not full:
+                heapq.heappush(best, (0.0, -pos, pid))
+
+        return [(pid, score) for score, _, pid in sorted(best, reverse=True)]
+
+    # ─── Batch scoring ──────────────────────────────────────────────────
+
+    def _raw_many(self, x: np.ndarray, fp: FactorPlan) -> np.ndarray:
+        """Vectorized `_raw`: same branches, evaluated as array masks."""
+        t = fp.target
+
+        if fp.mode == MUST_HAVE:
+            if fp.direction < 0:
+                ok, soft = x <= t, x <= t + self.tol
+                ramp = 1.0 - (x - t) * self.inv_tol if self.tol else None
+            else:
+                ok, soft = x >= t, x >= t - self.tol
+                ramp = 1.0 - (t - x) * self.inv_tol if self.tol else None
+            r = np.where(ok, 1.0, 0.0)
+            if ramp is not None:
+                r = np.where(~ok & soft, ramp, r)
+            return r
+
+        # nice_to_have
+        if fp.direction < 0:
+            raw = np.where(x <= t, 1.0, 1.0 - (x - t) * fp.inv_upper)
+        else:
+            raw = np.where(x >= t, 1.0, 1.0 - (t - x) * fp.inv_lower)
+        in_band = (x >= fp.lower) & (x <= fp.upper)
+        return np.where(in_band, np.maximum(self.r_floor, raw), 0.0)
+
+    def _qual_parts(self, q: np.ndarray) -> np.ndarray:
+        """
+        `_qual(q) ** q_weight` per rating (its log in log space). Ratings
+        that clamp to an integer are looked up in the precomputed table;
+        other scales fall back to one evaluation per distinct rating.
+        """
+        if self._qtable is not None:
+            qc  = np.clip(q, 1.0, self.max_quality)
+            idx = qc.astype(np.intp)
+            if (idx == qc).all():
+                return self._qtable[idx]
+        uq, inv = np.unique(q, return_inverse=True)
+        parts = np.array([self._qual(v) ** self.q_weight for v in uq.tolist()])
+        if self._log_space:
+            with np.errstate(divide="ignore"):
+                parts = np.log(parts)
+        return parts[inv.reshape(-1)]
+
+    def _raw_parts(self, r: np.ndarray) -> np.ndarray:
+        """`r ** (1 - q_weight)` per raw match (its log in log space)."""
+        if self._log_space:
+            with np.errstate(divide="ignore"):
+                return (1 - self.q_weight) * np.log(r)
+        return _pow(r, 1 - self.q_weight)
+
+    def _combine(self, rpart: np.ndarray, qpart: np.ndarray) -> np.ndarray:
+        """Blend from _raw_parts and _qual_parts: a product, or one exp."""
+        if self._log_space:
+            return np.exp(rpart + qpart)
+        return rpart * qpart
+
+    def _blend_many(self, r: np.ndarray, q: np.ndarray) -> np.ndarray:
+        """Vectorized raw/quality blend of rated values."""
+        return self._combine(self._raw_parts(r), self._qual_parts(q))
+
+    def score_many(self,
+                   columns: Mapping[str, Any],
+                   qualities: Optional[Mapping[str, Any]] = None,
+                   *,
+                   index: Optional["MustHaveIndex"] = None) -> np.ndarray:
+        """
+        Compute final scores for a columnar batch of properties.
+
+        Produces exactly the values `score_property` returns row by row:
+        factors are accumulated in profile order and every per-element
+        operation mirrors the scalar path (unless log_blend is set).
+
+        Args:
+            columns:   Mapping factor_key → per-property values. Scalar
+                       factors are 1-D float arrays (NaN = missing raw);
+                       multi factors are RaggedArrays, or sequences of
+                       lists (None = missing) packed on the fly. float32
+                       columns (columns.compact) are scored in float64,
+                       exactly as their float32 values would be.
+            qualities: Mapping factor_key → 1-D array of ratings
+                       (NaN = no rating → raw-only).
+            index:     optional MustHaveIndex over `columns`; rows it rules
+                       out on a must_have are set to 0.0 without scoring.
+
+        Returns:
+            A float64 array of scores in [0.0,1.0], one per property.
+        """
+        qualities = qualities or {}
+        n = batch_len(columns, qualities)
+
+        if index is not None:
+            rows = index.candidates(self)
+            if len(rows) < n:
+                # gather only this profile's factors, not the whole corpus
+                keys = self.plan.keys
+                scores = np.zeros(n)
+                scores[rows] = self.score_many(
+                    take_rows({k: columns[k] for k in keys if k in columns}, rows),
+                    take_rows({k: qualities[k] for k in keys if k in qualities}, rows))
+                return scores
+
+        steps = [(fp.weight, self._factor_many(fp, col, qualities.get(fp.key), n))
+                 for fp, col in self._batch_factors(columns)]
+        return combine_factors(n, steps)
+
+    def evaluate(self,
+                 columns: Mapping[str, Any],
+                 qualities: Optional[Mapping[str, Any]] = None,
+                 *,
+                 trace: bool = False) -> BatchResult:
+        """
+        Score a columnar batch and keep the per-factor detail.
+
+        Same inputs and scores as `score_many`, plus the (n, F) fs matrix of
+        every scored factor and the must_have that zeroed each failed
+        property; with `trace=True` also the (n, F) trace record array.
+        See BatchResult.
+        """
+        qualities = qualities or {}
+        n = batch_len(columns, qualities)
+        keys, cols = [], []
+        for fp, col in self._batch_factors(columns):
+            keys.append(fp.key)
+            cols.append(self._factor_many(fp, col, qualities.get(fp.key), n))
+        scores = combine_factors(n, [(self.plan[k].weight, c) for k, c in zip(keys, cols)])
+        return BatchResult(keys, cols, scores, qualities if trace else None)
+
+    def _batch_factors(self, columns: Mapping[str, Any]):
+        """Yield (FactorPlan, column) for every active factor the batch carries."""
+        for fp in self.plan.active_factors():
+            col = columns.get(fp.key)
+            if col is not None:
+                yield fp, col
+
+    def _factor_many(self,
+                     fp: FactorPlan,
+                     col: Any,
+                     qv: Optional[Any],
+                     n: int) -> FactorColumn:
+        """Score one factor column of a batch."""
+        # handle multi-POI vs scalar
+        if fp.multi:
+            if not isinstance(col, RaggedArray):
+                col = RaggedArray.from_lists(col)
+            x, present = aggregate_segments(col, fp), col.valid
+            r = np.zeros(n)
+            has_x = ~np.isnan(x)
+            r[has_x] = self._raw_many(x[has_x], fp)
+        else:
+            x = np.asarray(col, dtype=float)
+            present = ~np.isnan(x)
+            r = self._raw_many(x, fp)
+
+        # must_have fail short-circuits to zero
+        failed = present & (r == 0.0) if fp.mode == MUST_HAVE else None
+
+        fs = r
+        if qv is not None:
+            qv = np.asarray(qv, dtype=float)
+            has_q = present & ~np.isnan(qv)
+            if has_q.any():
+                fs = r.copy()
+                fs[has_q] = self._blend_many(r[has_q], qv[has_q])
+        return FactorColumn(present, x, r, fs, failed)
+
+    def factor_signature(self, fp: FactorPlan) -> Tuple[Any, ...]:
+        """
+        Everything a factor's fs column depends on besides the data: the
+        compiled factor minus its weight, plus the scorer parameters.
+        """
+        return (fp.signature, self.tol, self.r_floor, self.max_quality,
+                self.q_floor, self.q_weight, self.qual_exp, self._log_space)
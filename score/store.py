@@ -0,0 +1,281 @@
+# score/store.py
+
+"""
+Memory-mapped property store for corpora larger than RAM.
+
+Every factor is a set of fixed-width binary column files read through
+np.memmap, opened only when a column is first looked up. Scoring a profile
+therefore touches the pages of its active factors and nothing else; an
+irrelevant factor costs no I/O at all.
+
+Layout:
+    <dir>/store.json             rows, dtype and the column list
+    <dir>/strings.bytes          interned UTF-8 strings, back to back
+    <dir>/strings.offsets        int64, one more than the string count
+    <dir>/ids.codes              int64 string code of every row's id
+    <dir>/col/<key>.f            scalar factor values
+    <dir>/col/<key>.values       multi factor CSR values
+    <dir>/col/<key>.offsets      … int64 offsets (rows + 1)
+    <dir>/col/<key>.valid        … uint8 row mask
+    <dir>/q/<key>.f              float64 quality column (NaN = none)
+"""
+
+from __future__ import annotations
+import json
+import os
+from collections.abc import Mapping
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .columns import is_multi_column
+from .ragged import RaggedArray
+
+STORE_VERSION = 2
+
+
+def _memmap(path: str, dtype: Any, length: int) -> np.ndarray:
+    """Read-only memmap of a raw column file (np.memmap rejects empty files)."""
+    if length == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(length,))
+
+
+class StringTable:
+    """
+    Row ids as codes into a table of distinct strings.
+
+    Repeated strings are stored once; a row costs one int64 code plus its
+    share of the distinct bytes. Strings are decoded only when read.
+    """
+
+    __slots__ = ("codes", "_bytes", "_offsets", "_index")
+
+    def __init__(self, codes: np.ndarray, data: np.ndarray, offsets: np.ndarray):
+        self.codes    = codes
+        self._bytes   = data
+        self._offsets = offsets
+        self._index: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def string(self, code: int) -> str:
+        lo, hi = self._offsets[code], self._offsets[code + 1]
+        return self._bytes[lo:hi].tobytes().decode("utf-8")
+
+    def __getitem__(self, row: int) -> str:
+        return self.string(int(self.codes[row]))
+
+    def tolist(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """Decode rows [start, stop); each distinct string is decoded once."""
+        codes = self.codes[start:stop]
+        uniq, inv = np.unique(codes, return_inverse=True)
+        strings = [self.string(c) for c in uniq.tolist()]
+        return [strings[i] for i in inv.reshape(-1).tolist()]
+
+    def rows(self, value: str) -> np.ndarray:
+        """Rows whose id is `value` (builds the reverse index on first use)."""
+        if self._index is None:
+            n = len(self._offsets) - 1
+            self._index = {self.string(c): c for c in range(n)}
+        code = self._index.get(value)
+        if code is None:
+            return np.zeros(0, dtype=np.int64)
+        return np.flatnonzero(self.codes == code)
+
+
+class _LazyColumns(Mapping):
+    """Mapping factor_key → column that opens each column on first lookup."""
+
+    def __init__(self, store: "PropertyStore", kind: str, keys: Iterable[str]):
+        self._store  = store
+        self._kind   = kind
+        self._keys   = tuple(keys)
+        self._open: Dict[str, Any] = {}
+        self.rows    = store.n       # lets batch_len skip opening a column
+
+    def __getitem__(self, key: str) -> Any:
+        col = self._open.get(key)
+        if col is None:
+            if key not in self._keys:
+                raise KeyError(key)
+            col = self._open[key] = self._store._open_column(self._kind, key)
+            self._store.opened.add((self._kind, key))
+        return col
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class PropertyStore:
+    """
+    Read side of a store written by PropertyStore.build.
+
+    `columns` and `qualities` are Mappings in the batch format, so they go
+    straight into PropertyScorer.score_many / evaluate, score_matrix or
+    IncrementalScorer; only the columns those look up are ever opened
+    (see `opened`).
+
+    Args:
+        path: store directory
+
+    Attributes:
+        n:         number of properties
+        dtype:     dtype of the stored factor values
+        ids:       StringTable of property ids
+        columns:   lazy Mapping factor_key → float memmap or RaggedArray
+        qualities: lazy Mapping factor_key → float memmap
+        opened:    ("col" | "q", factor_key) pairs opened so far
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "store.json")) as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"{path}: unsupported store version {meta.get('version')!r}")
+        self.path  = path
+        self.n     = meta["rows"]
+        self.dtype = np.dtype(meta["dtype"])
+        self._multi: Set[str] = set(meta["multi"])
+        self._sizes: Dict[str, int] = meta["sizes"]
+        self.opened: Set[Tuple[str, str]] = set()
+
+        n_strings = meta["strings"]
+        self.ids = StringTable(
+            _memmap(os.path.join(path, "ids.codes"), np.int64, self.n),
+            _memmap(os.path.join(path, "strings.bytes"), np.uint8, meta["string_bytes"]),
+            _memmap(os.path.join(path, "strings.offsets"), np.int64, n_strings + 1),
+        )
+        self.columns   = _LazyColumns(self, "col", meta["columns"])
+        self.qualities = _LazyColumns(self, "q", meta["qualities"])
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _open_column(self, kind: str, key: str) -> Any:
+        base = os.path.join(self.path, kind, key)
+        if kind == "col" and key in self._multi:
+            return RaggedArray(_memmap(f"{base}.values", self.dtype, self._sizes[key]),
+                               _memmap(f"{base}.offsets", np.int64, self.n + 1),
+                               _memmap(f"{base}.valid", np.uint8, self.n).view(bool))
+        return _memmap(f"{base}.f", self.dtype if kind == "col" else np.float64, self.n)
+
+    # ─── Write side ─────────────────────────────────────────────────────
+
+    @classmethod
+    def build(cls,
+              path: str,
+              batches: Iterable[Tuple[List[Hashable], Mapping[str, Any], Mapping[str, Any]]],
+              *,
+              dtype: Any = np.float64) -> "PropertyStore":
+        """
+        Write a store from a stream of (ids, columns, qualities) batches,
+        e.g. pipeline.parse_chunks, appending batch by batch so memory
+        stays bounded by the batch size.
+
+        Every batch must carry the same factor keys; whether a factor is
+        multi is decided by the first batch.
+
+        Args:
+            path:    directory to create (or overwrite)
+            batches: columnar batches; multi factors as RaggedArrays or
+                     sequences of lists
+            dtype:   stored factor value dtype. float64 keeps scores
+                     identical to the in-memory paths; float32
+                     (columns.COMPACT_DTYPE) halves the footprint, within
+                     the deviation bound documented in columns.py.
+                     Qualities are always stored as float64.
+
+        Returns:
+            The opened store.
+        """
+        dtype = np.dtype(dtype)
+        for sub in ("col", "q"):
+            os.makedirs(os.path.join(path, sub), exist_ok=True)
+
+        files: Dict[str, Any] = {}
+
+        def out(name: str):
+            f = files.get(name)
+            if f is None:
+                f = files[name] = open(os.path.join(path, name), "wb")
+            return f
+
+        interned: Dict[str, int] = {}
+        string_bytes = 0
+        rows, multi, sizes = 0, set(), {}
+        columns: List[str] = []
+        qualities: List[str] = []
+        try:
+            out("strings.offsets").write(np.zeros(1, dtype=np.int64).tobytes())
+            for ids, cols, quals in batches:
+                codes = np.empty(len(ids), dtype=np.int64)
+                for i, pid in enumerate(ids):
+                    pid  = str(pid)
+                    code = interned.get(pid)
+                    if code is None:
+                        code = interned[pid] = len(interned)
+                        data = pid.encode("utf-8")
+                        string_bytes += len(data)
+                        out("strings.bytes").write(data)
+                        out("strings.offsets").write(np.int64(string_bytes).tobytes())
+                    codes[i] = code
+                out("ids.codes").write(codes.tobytes())
+
+                if not columns and not qualities:
+                    columns, qualities = list(cols), list(quals)
+                    multi = {key for key in columns if is_multi_column(cols[key])}
+                for key in columns:
+                    col = cols[key]
+                    if key in multi:
+                        if not isinstance(col, RaggedArray):
+                            col = RaggedArray.from_lists(col)
+                        if key not in sizes:
+                            out(f"col/{key}.offsets").write(np.zeros(1, dtype=np.int64).tobytes())
+                        base = sizes.get(key, 0)
+                        vals = col.values[col.offsets[0]:col.offsets[-1]]
+                        out(f"col/{key}.values").write(vals.astype(dtype).tobytes())
+                        offs = col.offsets[1:] - col.offsets[0] + base
+                        out(f"col/{key}.offsets").write(offs.astype(np.int64).tobytes())
+                        out(f"col/{key}.valid").write(col.valid.astype(np.uint8).tobytes())
+                        sizes[key] = base + len(vals)
+                    else:
+                        out(f"col/{key}.f").write(np.asarray(col, dtype=float).astype(dtype).tobytes())
+                for key in qualities:
+                    out(f"q/{key}.f").write(np.asarray(quals[key], dtype=float).tobytes())
+                rows += len(ids)
+        finally:
+            for f in files.values():
+                f.close()
+
+        # make sure every declared column has its files, even with no rows
+        for name in (["strings.bytes", "ids.codes"] +
+                     [f"col/{k}.f" for k in columns if k not in multi] +
+                     [f"col/{k}.{ext}" for k in multi for ext in ("values", "valid")] +
+                     [f"q/{k}.f" for k in qualities]):
+            open(os.path.join(path, name), "ab").close()
+        for key in multi - sizes.keys():
+            with open(os.path.join(path, f"col/{key}.offsets"), "wb") as f:
+                f.write(np.zeros(1, dtype=np.int64).tobytes())
+
+        meta = {
+            "version":      STORE_VERSION,
+            "rows":         rows,
+            "dtype":        dtype.str,
+            "columns":      columns,
+            "qualities":    qualities,
+            "multi":        sorted(multi),
+            "sizes":        sizes,
+            "strings":      len(interned),
+            "string_bytes": string_bytes,
+        }
+        with open(os.path.join(path, "store.json"), "w") as f:
+            json.dump(meta, f, indent=1)
+        return cls(path)
@@ -0,0 +1,158 @@
+# score/trace.py
+
+from __future__ import annotations
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+import numpy as np
+
+# Why a factor ended up the way it did
+TRACE_SCORED      = 0   # scored normally
+TRACE_IRRELEVANT  = 1   # mode == "irrelevant"
+TRACE_MISSING     = 2   # no raw value → skipped
+TRACE_NOT_LIST    = 3   # multi factor whose raw value is not a list → skipped
+TRACE_NO_IN_BAND  = 4   # multi factor with nothing in [lower,upper] → r = 0
+TRACE_MUST_FAIL   = 5   # must_have failed → property total = 0
+TRACE_NOT_REACHED = 6   # after a must_have failure: never evaluated
+
+# One record per (property, factor); NaN marks a field that was not computed
+TRACE_DTYPE = np.dtype([
+    ("x",      "f8"),   # value fed to _raw (the aggregate for multi-POI)
+    ("r",      "f8"),   # raw-match score
+    ("q",      "f8"),   # quality rating (NaN = raw-only)
+    ("fs",     "f8"),   # blended factor score
+    ("reason", "u1"),   # TRACE_* code
+])
+
+_EMPTY = np.array((np.nan, np.nan, np.nan, np.nan, TRACE_NOT_REACHED), dtype=TRACE_DTYPE)
+
+
+def new_trace(*shape: int) -> np.ndarray:
+    """Preallocate a trace record array, every record marked not reached."""
+    return np.full(shape, _EMPTY, dtype=TRACE_DTYPE)
+
+
+def reset_trace(trace: np.ndarray) -> None:
+    """Mark every record of a reused trace buffer as not reached."""
+    trace[...] = _EMPTY
+
+
+def batch_trace(keys: Sequence[str],
+                cols: Sequence[Any],
+                qualities: Mapping[str, Any],
+                failed_on: np.ndarray) -> np.ndarray:
+    """
+    Build the (n, F) trace of a scored batch from its FactorColumns.
+
+    Records after a property's first failing must_have are left
+    TRACE_NOT_REACHED, exactly as score_property stops evaluating there.
+    """
+    n, f  = len(failed_on), len(cols)
+    trace = new_trace(n, f)
+    for j, (key, col) in enumerate(zip(keys, cols)):
+        rec, present = trace[:, j], col.present
+        rec["x"][present]  = col.x[present]
+        rec["r"][present]  = col.r[present]
+        rec["fs"][present] = col.fs[present]
+        qv = qualities.get(key)
+        if qv is not None:
+            rec["q"][present] = np.asarray(qv, dtype=float)[present]
+
+        reason = np.where(present, TRACE_SCORED, TRACE_MISSING).astype(np.uint8)
+        reason[present & np.isnan(col.x)] = TRACE_NO_IN_BAND
+        if col.failed is not None:
+            reason[col.failed] = TRACE_MUST_FAIL
+            rec["fs"][col.failed] = np.nan
+        rec["reason"] = reason
+
+    later = np.arange(f)[None, :] > failed_on[:, None]
+    trace[later & (failed_on[:, None] >= 0)] = _EMPTY
+    return trace
+
+
+def format_trace(records: np.ndarray,
+                 keys: Sequence[str],
+                 score: float,
+                 labels: Optional[Mapping[str, str]] = None) -> str:
+    """
+    Render one property's trace records as readable text.
+
+    Args:
+        records: 1-D trace records, aligned with `keys`
+        keys:    factor keys
+        score:   the property's final score
+        labels:  optional factor_key → display label
+
+    Returns:
+        Multi-line text, one block per evaluated factor.
+    """
+    labels = labels or {}
+    lines  = []
+    for key, rec in zip(keys, records.tolist()):
+        x, r, q, fs, reason = rec
+        name = labels.get(key, key)
+        if reason == TRACE_NOT_REACHED:
+            continue
+        if reason == TRACE_IRRELEVANT:
+            lines.append(f"{name}: irrelevant → skip")
+            continue
+        if reason == TRACE_MISSING:
+            lines.append(f"{name}: missing raw → skip")
+            continue
+        if reason == TRACE_NOT_LIST:
+            lines.append(f"{name}: expected list → skip")
+            continue
+
+        if reason == TRACE_NO_IN_BAND or np.isnan(x):
+            lines.append(f"{name}: no in-band → r=0")
+        else:
+            lines.append(f"{name}: x={x:.3f} → r={r:.3f}")
+        if reason == TRACE_MUST_FAIL:
+            lines.append(f"{name}: must_have failed → total=0")
+            continue
+
+        if np.isnan(q):
+            lines.append(f"    raw-only → fs={fs:.3f}")
+        else:
+            lines.append(f"    blended with q={q:g} → fs={fs:.3f}")
+
+    lines.append(f"→ final score = {score:.3f}")
+    return "\n".join(lines)
+
+
+class TraceView(Mapping):
+    """
+    Read-only Mapping property_id → formatted trace text.
+
+    Holds the raw record array and formats a property only when it is
+    looked up, so tracing a large batch costs no string work up front.
+
+    Args:
+        ids:    property ids, aligned with the trace rows
+        trace:  (n, F) trace record array
+        keys:   factor keys, aligned with the trace columns
+        scores: final scores, aligned with the trace rows
+        labels: optional factor_key → display label
+    """
+
+    def __init__(self,
+                 ids: Sequence[Any],
+                 trace: np.ndarray,
+                 keys: Sequence[str],
+                 scores: np.ndarray,
+                 labels: Optional[Mapping[str, str]] = None):
+        self._rows: Dict[Any, int] = {pid: i for i, pid in enumerate(ids)}
+        self.trace  = trace
+        self.keys   = tuple(keys)
+        self.scores = scores
+        self.labels = labels
+
+    def __getitem__(self, pid: Any) -> str:
+        i = self._rows[pid]
+        return format_trace(self.trace[i], self.keys, float(self.scores[i]), self.labels)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
@@ -0,0 +1,77 @@
+# tests/randomized.py
+
+"""Random profiles and property batches shared by the parity tests."""
+
+import random
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+AGGREGATIONS = ["mean", "median", "min", "max", "k_nearest", "k_farthest", "percentile"]
+DECAYS       = ["linear", "exp", "quadratic"]
+
+
+def random_profile(rng: random.Random, n_factors: int = 6) -> Dict[str, Dict[str, Any]]:
+    """Every mode, coinciding bounds, and a multi factor on every other key."""
+    profile = {}
+    for i in range(n_factors):
+        mode = rng.choice(["must_have", "nice_to_have", "nice_to_have", "irrelevant"])
+        t = rng.uniform(2, 20)
+        l = t if rng.random() < .2 else t - rng.uniform(0, 5)
+        u = t if rng.random() < .2 else t + rng.uniform(0, 10)
+        cfg = {"mode": mode, "target": t, "lower": l, "upper": u,
+               "direction": rng.choice([-1, 1]), "weight": rng.choice([1, 2, 4, 0.5, 3.3])}
+        if mode == "must_have" and rng.random() < .5:
+            del cfg["lower"], cfg["upper"]
+        if i % 2:
+            cfg.update(multi=True, aggregation=rng.choice(AGGREGATIONS),
+                       nearest_k=rng.choice([1, 2, 3]), farthest_k=rng.choice([1, 2, 3]),
+                       percentile=rng.choice([0.1, 0.5, 0.9, 0.33]))
+            if rng.random() < .3:
+                cfg.update(decay_function=rng.choice(DECAYS), decay_rate=rng.choice([0.5, 1.0, 2.0]))
+        profile[f"f{i}"] = cfg
+    return profile
+
+
+def random_params(rng: random.Random) -> Dict[str, float]:
+    return dict(must_have_tolerance=rng.choice([0.0, 0.0, 1.5]),
+                quality_weight=rng.choice([0.8, 0.0, 1.0, 0.37]),
+                qual_exp=rng.choice([1.0, 2.0]),
+                margin_epsilon=rng.choice([1e-6, 0.0, 1e-3]))
+
+
+def random_properties(rng: random.Random,
+                      profile: Dict[str, Dict[str, Any]],
+                      n: int = 200) -> Tuple[List[Dict[str, Any]], List[Dict[str, float]]]:
+    """(raw, quality) records with missing values, empty lists and odd ratings."""
+    props, quals = [], []
+    for _ in range(n):
+        raw, q = {}, {}
+        for key, cfg in profile.items():
+            if rng.random() < .1:
+                continue
+            if cfg.get("multi"):
+                raw[key] = [] if rng.random() < .05 else [
+                    round(rng.uniform(0, 35), rng.choice([0, 1, 3]))
+                    for _ in range(rng.randint(1, 15))]
+            else:
+                raw[key] = rng.choice([cfg["target"], round(rng.uniform(0, 35), 2), rng.uniform(0, 35)])
+            if rng.random() < .6:
+                q[key] = rng.choice([1, 2, 3, 4, 5, 2.5, 0.3, 7])
+        props.append(raw)
+        quals.append(q)
+    return props, quals
+
+
+def to_columns(profile: Dict[str, Dict[str, Any]],
+               props: List[Dict[str, Any]],
+               quals: List[Dict[str, float]]) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """The records in the batch format: float arrays and lists of lists."""
+    columns, qualities = {}, {}
+    for key, cfg in profile.items():
+        if cfg.get("multi"):
+            columns[key] = [p.get(key) for p in props]
+        else:
+            columns[key] = np.array([p.get(key, np.nan) for p in props], dtype=float)
+        qualities[key] = np.array([q.get(key, np.nan) for q in quals], dtype=float)
+    return columns, qualities
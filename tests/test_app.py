@@ -0,0 +1,30 @@
+# tests/test_app.py
+
+import os
+
+import pytest
+
+testing = pytest.importorskip("streamlit.testing.v1")
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def test_trace_text_is_formatted_only_for_open_expanders():
+    at = testing.AppTest.from_file(APP, default_timeout=60).run()
+    at.button[0].click().run()
+    assert not at.exception
+    assert [e.label for e in at.expander][:3] == [f"Property {p} verbose output" for p in "ABC"]
+    assert not at.text
+
+    # what opening one expander does: its state flips and the page reruns
+    at.session_state["verbose_1_B"] = True
+    at.session_state["keep_results"] = True
+    at.run()
+    assert [t.value for t in at.text] == [at.session_state.history[-1]["verbose_outputs"]["B"]]
+    assert len(at.dataframe) >= 1
+
+    # the history entry renders its traces once opened
+    assert not at.code
+    at.session_state["history_1"] = True
+    at.run()
+    assert len(at.code) == 3
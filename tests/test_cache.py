@@ -0,0 +1,105 @@
+# tests/test_cache.py
+
+import json
+import random
+
+import numpy as np
+import pytest
+
+from score import FeedCache, PropertyScorer
+from score.defaults import OPTIONAL_DEFAULTS
+from score.pipeline import feed_bounds, parse_chunks, read_chunks
+
+FACTORS = {
+    "a": {"csv_column": "A", "qual_method": "lower_is_better"},
+    "b": {"csv_column": "B", "qual_method": "lower_is_better"},
+}
+
+
+def _write(path, rows):
+    lines = ["Address,A,B"] + [f"{i} Main St,{i * 1.5},{i % 7}" for i in range(rows)]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_lazy_feed_refuses_a_rewritten_file(tmp_path):
+    feed_path = tmp_path / "feed.csv"
+    _write(feed_path, 16)
+    cache = FeedCache(str(tmp_path / "cache"))
+    feed  = cache.lazy(str(feed_path), FACTORS, OPTIONAL_DEFAULTS)
+    feed.load(["a"])
+
+    _write(feed_path, 10)
+    # already cached for the original file: still served, rows still match
+    assert len(feed.columns["a"]) == len(feed.ids) == 16
+    with pytest.raises(ValueError, match="changed"):
+        feed.load(["b"])
+    assert "b" not in feed.loaded
+
+    fresh = cache.lazy(str(feed_path), FACTORS, OPTIONAL_DEFAULTS)
+    fresh.load(["b"])
+    assert len(fresh.ids) == len(fresh.columns["b"]) == 10
+    assert np.array_equal(fresh.columns["b"], np.arange(10) % 7)
+
+
+POI_FACTORS = {
+    "walk":   {"csv_column": "Walk", "qual_method": "lower_is_better"},
+    "size":   {"csv_column": "Size", "qual_method": "higher_is_better"},
+    "school": {"csv_column": "Schools", "multi": True, "multi_path": "walking.travel_time"},
+    "shop":   {"csv_column": "Schools", "multi": True, "multi_path": "walking.distance"},
+}
+PROFILE = {
+    "walk":   {"mode": "nice_to_have", "target": 8.0, "lower": 2.0, "upper": 25.0,
+               "direction": -1, "weight": 3},
+    "size":   {"mode": "must_have", "target": 300.0, "direction": 1, "weight": 2},
+    "school": {"mode": "nice_to_have", "target": 10.0, "lower": 0.0, "upper": 40.0,
+               "direction": -1, "weight": 2, "multi": True, "aggregation": "mean"},
+    "shop":   {"mode": "nice_to_have", "target": 0.5, "lower": 0.0, "upper": 3.0,
+               "direction": -1, "weight": 1, "multi": True, "aggregation": "median"},
+}
+
+
+def _write_poi_feed(path, rng, n):
+    rows = ["Address,Walk,Size,Schools"]
+    for i in range(n):
+        pois = [{"walking": {"travel_time": f"{rng.uniform(1, 40):.2f} mins",
+                             "distance": f"{rng.randint(100, 3000)} m"}}
+                for _ in range(rng.randint(0, 5))]
+        cell = json.dumps(pois).replace('"', '""')
+        walk = rng.choice([f"{rng.uniform(0, 30):.3f} mins", "n/a"])
+        rows.append(f'{i} Main St,{walk},{rng.uniform(100, 900):.1f},"{cell}"')
+    path.write_text("\n".join(rows) + "\n")
+
+
+def _parsed(path, factors):
+    """The whole feed parsed in memory, without a cache."""
+    bounds = feed_bounds(path, factors, OPTIONAL_DEFAULTS)
+    unparsed = {}
+    (_, columns, qualities), = parse_chunks(read_chunks(path, factors, chunk_rows=1 << 20),
+                                            factors, OPTIONAL_DEFAULTS, bounds,
+                                            unparsed=unparsed)
+    return columns, qualities, unparsed
+
+
+@pytest.mark.parametrize("chunk_rows", [7, 64, 1000])
+def test_rebuilt_cache_scores_like_an_uncached_parse(tmp_path, chunk_rows):
+    feed_path = str(tmp_path / "feed.csv")
+    _write_poi_feed(tmp_path / "feed.csv", random.Random(chunk_rows), 150)
+    scorer = PropertyScorer(PROFILE)
+    cache  = FeedCache(str(tmp_path / "cache"), chunk_rows=chunk_rows)
+
+    factors = dict(POI_FACTORS)
+    for step in range(3):
+        feed = cache.load(feed_path, factors, OPTIONAL_DEFAULTS)
+        columns, qualities, unparsed = _parsed(feed_path, factors)
+        assert np.array_equal(scorer.score_many(feed.columns, feed.qualities),
+                              scorer.score_many(columns, qualities))
+        assert feed.unparsed == {key: unparsed.get(key, 0) for key in factors}
+        if step == 0:
+            assert sorted(feed.rebuilt) == sorted(factors)
+            # change two specs: only those two are parsed again
+            factors["school"] = {**factors["school"], "multi_path": "walking.distance"}
+            factors["walk"]   = {**factors["walk"], "qual_method": "higher_is_better"}
+        elif step == 1:
+            assert sorted(feed.rebuilt) == ["school", "walk"]
+        else:
+            assert feed.rebuilt == []
@@ -0,0 +1,12 @@
+# tests/test_cli.py
+
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_score_feed_does_not_import_streamlit():
+    code = "import sys, score_feed; sys.exit('streamlit' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=ROOT).returncode == 0
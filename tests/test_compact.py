@@ -0,0 +1,176 @@
+# tests/test_compact.py
+
+"""
+Compact (float32) scores stay within the bound documented next to
+COMPACT_EPS in score/columns.py, measured against float64 score_property.
+"""
+
+import json
+import random
+
+import numpy as np
+import pytest
+
+from score import FeedCache, PropertyScorer, PropertyStore, RaggedArray
+from score.columns import COMPACT_DTYPE, COMPACT_EPS, compact
+from score.plan import MUST_HAVE
+from score.trace import TRACE_SCORED
+
+from .randomized import random_params, random_profile, random_properties, to_columns
+
+# accumulated float64 rounding of the sums, on top of the documented bound
+SLACK = 1e-12
+
+
+def _records(columns, qualities, n):
+    """Per-property (raw, quality) dicts of a float64 batch, for score_property."""
+    props = [{} for _ in range(n)]
+    quals = [{} for _ in range(n)]
+    for key, col in columns.items():
+        for i in range(n):
+            v = col[i] if isinstance(col, RaggedArray) else (None if np.isnan(col[i]) else float(col[i]))
+            if v is not None:
+                props[i][key] = v
+    for key, col in qualities.items():
+        for i in range(n):
+            if not np.isnan(col[i]):
+                quals[i][key] = float(col[i])
+    return props, quals
+
+
+def _row_values(col, i):
+    """The stored values of one row: the scalar, or every POI value."""
+    if isinstance(col, RaggedArray):
+        v = col[i]
+        return np.array(v if v else [], dtype=float)
+    return np.array([] if np.isnan(col[i]) else [col[i]], dtype=float)
+
+
+def _bound(scorer, columns, qualities):
+    """
+    Per row: the COMPACT_EPS-derived bound on |score difference|, and
+    whether the row has a value within rounding of a band edge or a
+    must_have threshold (the documented exception).
+    """
+    res64 = scorer.evaluate(columns, qualities, trace=True)
+    res32 = scorer.evaluate(compact(columns), qualities, trace=True)
+    n = len(res64.scores)
+    bound  = np.zeros(n)
+    weight = np.zeros(n)
+    edge   = np.zeros(n, dtype=bool)
+    plans  = {fp.key: fp for fp in scorer.plan.factors}
+    w      = scorer.q_weight
+    for j, key in enumerate(res64.factors):
+        fp, col = plans[key], columns[key]
+        slope = max(fp.inv_upper, fp.inv_lower)
+        if fp.mode == MUST_HAVE:
+            slope = scorer.inv_tol
+            cuts  = [fp.target, fp.target - scorer.tol, fp.target + scorer.tol]
+        else:
+            cuts = []
+        t64, t32 = res64.trace[:, j], res32.trace[:, j]
+        for i in range(n):
+            vals = _row_values(col, i)
+            if not len(vals):
+                continue
+            dx = np.abs(vals).max() * COMPACT_EPS
+            near = np.abs(vals[:, None] - np.array([fp.lower, fp.upper])).min() <= 2 * dx
+            if cuts and not np.isnan(t64["x"][i]):
+                near |= np.abs(t64["x"][i] - np.array(cuts)).min() <= 2 * dx
+            edge[i] |= bool(near)
+            if t64["reason"][i] != TRACE_SCORED or t32["reason"][i] != TRACE_SCORED:
+                continue
+            lip = 1.0
+            if not np.isnan(t64["q"][i]):
+                r_lo = min(t64["r"][i], t32["r"][i])
+                qpart = scorer._qual(t64["q"][i]) ** w
+                lip = 0.0 if w == 1.0 else (1 - w) * qpart * (r_lo ** -w if r_lo > 0 else np.inf)
+            bound[i]  += fp.weight * lip * slope * dx
+            weight[i] += fp.weight
+    bound = np.divide(bound, weight, out=np.zeros(n), where=weight > 0)
+    return bound + SLACK, edge
+
+
+def _assert_within(scorer, columns, qualities, got):
+    n = len(got)
+    props, quals = _records(columns, qualities, n)
+    exact = np.array([scorer.score_property(p, q) for p, q in zip(props, quals)])
+    bound, edge = _bound(scorer, columns, qualities)
+    diff = np.abs(got - exact)
+    assert (diff[~edge] <= bound[~edge]).all(), np.max(diff[~edge] - bound[~edge])
+    # the generator puts many values exactly on targets and band edges
+    assert (~edge).sum() >= n // 4
+
+
+def _batch(seed, n=200):
+    rng = random.Random(seed)
+    profile = random_profile(rng)
+    for cfg in profile.values():
+        # decay weights move with the values: not covered by the bound
+        cfg.pop("decay_function", None)
+    scorer = PropertyScorer(profile, **random_params(rng))
+    props, quals = random_properties(rng, profile, n)
+    columns, qualities = to_columns(profile, props, quals)
+    columns = {k: RaggedArray.from_lists(c) if isinstance(c, list) else c
+               for k, c in columns.items()}
+    return scorer, columns, qualities
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_compact_score_many_within_bound(seed):
+    scorer, columns, qualities = _batch(seed)
+    _assert_within(scorer, columns, qualities, scorer.score_many(compact(columns), qualities))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_compact_store_within_bound(seed, tmp_path):
+    scorer, columns, qualities = _batch(seed)
+    ids   = [f"p{i}" for i in range(len(qualities["f0"]))]
+    store = PropertyStore.build(str(tmp_path / "store"), [(ids, columns, qualities)],
+                                dtype=COMPACT_DTYPE)
+    assert store.columns["f0"].dtype == COMPACT_DTYPE
+    _assert_within(scorer, columns, qualities, scorer.score_many(store.columns, store.qualities))
+
+
+FEED_FACTORS = {
+    "walk":   {"csv_column": "Walk", "qual_method": "lower_is_better"},
+    "size":   {"csv_column": "Size", "qual_method": "higher_is_better"},
+    "school": {"csv_column": "Schools", "qual_method": "lower_is_better",
+               "multi": True, "multi_path": "walking.travel_time"},
+}
+FEED_DEFAULTS = {"multi_path": "walking.travel_time", "aggregation": "mean", "nearest_k": 1,
+                 "farthest_k": 1, "percentile": 0.5, "decay_function": None,
+                 "decay_rate": 1.0, "qual_method": "lower_is_better"}
+
+
+def _write_feed(path, rng, n):
+    rows = ["Address,Walk,Size,Schools"]
+    for i in range(n):
+        pois = [{"walking": {"travel_time": f"{rng.uniform(1, 40):.4f} mins"}}
+                for _ in range(rng.randint(0, 6))]
+        cell = json.dumps(pois).replace('"', '""')
+        rows.append(f'{i} Main St,{rng.uniform(0, 30):.6f} mins,{rng.uniform(200, 900):.3f},"{cell}"')
+    path.write_text("\n".join(rows) + "\n")
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_compact_feed_cache_within_bound(seed, tmp_path):
+    rng = random.Random(seed)
+    feed_path = tmp_path / "feed.csv"
+    _write_feed(feed_path, rng, 150)
+    profile = {
+        "walk":   {"mode": "nice_to_have", "target": 8.0, "lower": 2.0, "upper": 25.0,
+                   "direction": -1, "weight": 3},
+        "size":   {"mode": "must_have", "target": 400.0, "direction": 1, "weight": 2},
+        "school": {"mode": "nice_to_have", "target": 10.0, "lower": 3.0, "upper": 30.0,
+                   "direction": -1, "weight": 2, "multi": True,
+                   "aggregation": rng.choice(["mean", "median", "k_nearest", "percentile"]),
+                   "nearest_k": 2, "percentile": 0.33},
+    }
+    scorer = PropertyScorer(profile, **random_params(rng))
+    full   = FeedCache(str(tmp_path / "f64")).load(str(feed_path), FEED_FACTORS, FEED_DEFAULTS)
+    small  = FeedCache(str(tmp_path / "f32"), dtype=COMPACT_DTYPE).load(
+        str(feed_path), FEED_FACTORS, FEED_DEFAULTS)
+    assert small.columns["walk"].dtype == COMPACT_DTYPE
+    _assert_within(scorer, full.columns, full.qualities,
+                   scorer.score_many(small.columns, small.qualities))
@@ -0,0 +1,68 @@
+# tests/test_config.py
+
+import pickle
+
+import pytest
+
+from score import FactorConfig, PropertyScorer, ScorerParams
+from score.memo import SCORER_DEFAULTS
+
+
+def test_scorer_params_defaults_match_property_scorer():
+    assert dict(ScorerParams()) == SCORER_DEFAULTS
+
+
+@pytest.mark.parametrize("bad", [
+    {"max_quality": 1}, {"max_quality": 0}, {"max_quality": 4.5},
+    {"quality_floor": 1.5}, {"qual_exp": -1.0}, {"margin_epsilon": float("nan")},
+])
+def test_scorer_params_rejects(bad):
+    with pytest.raises(ValueError):
+        ScorerParams(**bad)
+
+
+def test_scorer_params_smallest_scale_scores():
+    params = ScorerParams(max_quality=2)
+    scorer = PropertyScorer({"a": {"mode": "must_have", "target": 1.0, "direction": -1,
+                                   "weight": 1}}, **params)
+    assert scorer.score_property({"a": 0.5}, {"a": 2}) == 1.0
+
+
+def test_factor_config_is_a_frozen_hashable_mapping():
+    cfg = FactorConfig(mode="nice_to_have", target=1.0, lower=0.5, upper=1.5,
+                       direction=-1, weight=4)
+    assert dict(cfg) == {"mode": "nice_to_have", "target": 1.0, "lower": 0.5,
+                         "upper": 1.5, "direction": -1, "weight": 4}
+    assert cfg.get("aggregation") is None
+    assert hash(cfg) == hash(pickle.loads(pickle.dumps(cfg)))
+    with pytest.raises(AttributeError):
+        cfg.target = 2.0
+    assert cfg.replace(mode="irrelevant")["mode"] == "irrelevant"
+
+
+@pytest.mark.parametrize("bad", [
+    {"mode": "x"}, {"direction": 0}, {"weight": 0}, {"lower": 2.0, "mode": "must_have"},
+    {"multi": True, "aggregation": "mode"},
+])
+def test_factor_config_rejects(bad):
+    cfg = {"mode": "nice_to_have", "target": 1.0, "direction": -1, "weight": 1, **bad}
+    with pytest.raises(ValueError):
+        FactorConfig(**cfg)
+
+
+@pytest.mark.parametrize("bad, message", [
+    ({"mode": "x"}, "invalid mode"), ({"weight": 0}, "weight must be > 0"),
+    ({"lower": 2.0, "mode": "must_have"}, "require lower"), ({"target": "1"}, "must be a number"),
+])
+def test_factor_config_errors_name_the_factor(bad, message):
+    cfg = {"mode": "nice_to_have", "target": 1.0, "direction": -1, "weight": 1, **bad}
+    with pytest.raises(ValueError, match=rf"^\[train_dist\] .*{message}"):
+        FactorConfig(**cfg, factor="train_dist")
+    with pytest.raises(ValueError, match=rf"^\[FactorConfig\] .*{message}"):
+        FactorConfig(**cfg)
+
+
+def test_factor_name_is_not_a_field():
+    named = FactorConfig(mode="must_have", target=1.0, direction=-1, weight=1, factor="a")
+    assert named == FactorConfig(mode="must_have", target=1.0, direction=-1, weight=1)
+    assert "factor" not in named
@@ -0,0 +1,87 @@
+# tests/test_incremental.py
+
+"""
+IncrementalScorer, driven through random profile edits: after every edit
+its scores equal a fresh score_many and `recomputed` names exactly the
+factors whose configuration changed.
+"""
+
+import copy
+import random
+
+import numpy as np
+import pytest
+
+from score import IncrementalScorer, PropertyScorer
+
+from .randomized import random_params, random_profile, random_properties, to_columns
+
+MODES = ["must_have", "nice_to_have", "irrelevant"]
+
+
+def _edit(rng, profile):
+    """Change one factor's weight, target or mode in place; return the kind of edit."""
+    cfg = profile[rng.choice(list(profile))]
+    kind = rng.choice(["weight", "target", "mode"])
+    if kind == "weight":
+        cfg["weight"] = rng.choice([w for w in (0.5, 1, 2, 3.3, 7) if w != cfg["weight"]])
+    elif kind == "target":
+        l, u = cfg.get("lower"), cfg.get("upper")
+        cfg["target"] = cfg["target"] + 1.0 if l is None else l + (u - l) * rng.random()
+    else:
+        cfg["mode"] = rng.choice([m for m in MODES if m != cfg["mode"]])
+    return kind
+
+
+def _expected_recomputed(before, after):
+    """Active factors that are new or changed in anything but their weight."""
+    def sig(cfg):
+        return {k: v for k, v in cfg.items() if k != "weight"}
+    return tuple(key for key, cfg in after.items()
+                 if cfg["mode"] != "irrelevant"
+                 and (before[key]["mode"] == "irrelevant" or sig(before[key]) != sig(cfg)))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_tracks_profile_edits(seed):
+    rng = random.Random(seed)
+    profile = random_profile(rng)
+    params  = random_params(rng)
+    props, quals = random_properties(rng, profile, 200)
+    columns, qualities = to_columns(profile, props, quals)
+
+    inc = IncrementalScorer(columns, qualities)
+    scorer = PropertyScorer(profile, **params)
+    assert np.array_equal(inc.score(scorer), scorer.score_many(columns, qualities))
+    assert inc.recomputed == tuple(fp.key for fp in scorer.plan.active_factors())
+
+    kinds = set()
+    for _ in range(30):
+        before = copy.deepcopy(profile)
+        kind = _edit(rng, profile)
+        scorer = PropertyScorer(profile, **params)
+        assert np.array_equal(inc.score(scorer), scorer.score_many(columns, qualities))
+        assert inc.recomputed == _expected_recomputed(before, profile)
+        if kind == "weight":
+            assert inc.recomputed == ()
+        kinds.add(kind)
+    assert kinds == {"weight", "target", "mode"}
+
+
+def test_incremental_evaluate_and_parameter_change():
+    rng = random.Random(0)
+    profile = random_profile(rng)
+    props, quals = random_properties(rng, profile, 200)
+    columns, qualities = to_columns(profile, props, quals)
+    inc = IncrementalScorer(columns, qualities)
+
+    inc.score(PropertyScorer(profile, quality_weight=0.8))
+    scorer = PropertyScorer(profile, quality_weight=0.5)
+    res, ref = inc.evaluate(scorer), scorer.evaluate(columns, qualities)
+    # a scorer parameter feeds every factor
+    assert inc.recomputed == tuple(fp.key for fp in scorer.plan.active_factors())
+    assert np.array_equal(res.scores, ref.scores)
+    assert np.array_equal(res.fs, ref.fs, equal_nan=True)
+
+    inc.evaluate(scorer)
+    assert inc.recomputed == ()
@@ -0,0 +1,53 @@
+# tests/test_index.py
+
+import random
+from collections.abc import Mapping
+
+import numpy as np
+import pytest
+
+from score import MustHaveIndex, PropertyScorer
+
+from .randomized import random_params, random_profile, random_properties, to_columns
+
+
+class _Tracked(Mapping):
+    """A batch Mapping that records which columns were read."""
+
+    def __init__(self, columns, rows):
+        self._columns = columns
+        self.rows = rows
+        self.read = set()
+
+    def __getitem__(self, key):
+        self.read.add(key)
+        return self._columns[key]
+
+    def __contains__(self, key):
+        return key in self._columns
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self):
+        return len(self._columns)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_index_scores_match_and_gather_only_profile_factors(seed):
+    rng = random.Random(seed)
+    profile = random_profile(rng)
+    for cfg in profile.values():
+        if not cfg.get("multi") and rng.random() < .6:
+            cfg["mode"] = "must_have"
+    scorer = PropertyScorer(profile, **random_params(rng))
+    props, quals = random_properties(rng, profile, 300)
+    columns, qualities = to_columns(profile, props, quals)
+    corpus = {**columns, "unused": np.arange(300.0)}
+    quals_ = {**qualities, "unused": np.full(300, 3.0)}
+
+    index = MustHaveIndex(corpus)
+    cols, qs = _Tracked(corpus, 300), _Tracked(quals_, 300)
+    got = scorer.score_many(cols, qs, index=index)
+    assert np.array_equal(got, scorer.score_many(columns, qualities))
+    assert "unused" not in cols.read | qs.read
@@ -0,0 +1,69 @@
+# tests/test_log_blend.py
+
+"""
+log_blend trades Python's float pow for one exp and one log per rated
+value: blends and scores stay within ~1e-15 of the exact ones, and are
+exact where the blend is skipped (quality_weight 0 or 1) or degenerate
+(a raw match of 0).
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from score import PropertyScorer
+
+from .randomized import random_params, random_profile, random_properties, to_columns
+
+TOL = 1e-15
+PROFILE = {"f": {"mode": "nice_to_have", "target": 5.0, "lower": 1.0, "upper": 9.0,
+                 "direction": -1, "weight": 1}}
+
+
+def _exact(scorer, r, q):
+    w = scorer.q_weight
+    return np.array([rv ** (1 - w) * scorer._qual(qv) ** w for rv, qv in zip(r.tolist(), q.tolist())])
+
+
+@pytest.mark.parametrize("w", [0.001, 0.37, 0.5, 0.8, 0.999])
+@pytest.mark.parametrize("qual_exp", [1.0, 2.0])
+def test_log_blend_close_to_exact_blend(w, qual_exp):
+    rng = np.random.default_rng(int(w * 1000) + int(qual_exp))
+    scorer = PropertyScorer(PROFILE, quality_weight=w, qual_exp=qual_exp, log_blend=True)
+    assert scorer._log_space
+    r = np.concatenate([[0.0, 1.0, 0.0, 1.0, scorer.r_floor, 5e-324, 1e-300],
+                        rng.uniform(0, 1, 5000)])
+    for q in (rng.integers(1, 6, len(r)).astype(float),        # table lookups
+              rng.uniform(0.5, 6.0, len(r))):                  # per-rating fallback
+        got, want = scorer._blend_many(r, q), _exact(scorer, r, q)
+        assert np.abs(got - want).max() <= TOL
+        assert (got[r == 0.0] == 0.0).all()
+        assert ((got >= 0.0) & (got <= 1.0)).all()
+
+
+@pytest.mark.parametrize("w", [0.0, 1.0])
+def test_log_blend_exact_without_a_blend(w):
+    rng = random.Random(int(w))
+    profile = random_profile(rng)
+    props, quals = random_properties(rng, profile)
+    columns, qualities = to_columns(profile, props, quals)
+    scorer = PropertyScorer(profile, quality_weight=w, log_blend=True)
+    assert not scorer._log_space
+    want = np.array([scorer.score_property(p, q) for p, q in zip(props, quals)])
+    assert np.array_equal(scorer.score_many(columns, qualities), want)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_log_blend_scores_close_to_score_property(seed):
+    rng = random.Random(seed)
+    profile = random_profile(rng)
+    params  = {**random_params(rng), "quality_weight": rng.choice([0.2, 0.5, 0.8, 0.999])}
+    props, quals = random_properties(rng, profile)
+    columns, qualities = to_columns(profile, props, quals)
+    scorer = PropertyScorer(profile, **params, log_blend=True)
+    want = np.array([scorer.score_property(p, q) for p, q in zip(props, quals)])
+    got  = scorer.score_many(columns, qualities)
+    assert np.abs(got - want).max() <= TOL
+    assert np.array_equal(got == 0.0, want == 0.0)
+    assert np.array_equal(scorer.evaluate(columns, qualities).scores, got)
@@ -0,0 +1,51 @@
+# tests/test_matrix.py
+
+import random
+
+import numpy as np
+import pytest
+
+from score import PropertyScorer, RaggedArray, score_matrix
+
+from .randomized import random_params, random_profile, random_properties, to_columns
+
+
+def _scorers(rng, count):
+    """Profiles over different subsets of f0…f7 (odd keys are always multi)."""
+    scorers = []
+    for _ in range(count):
+        profile = random_profile(rng, n_factors=8)
+        for key in rng.sample(sorted(profile), rng.randint(0, 6)):
+            del profile[key]
+        scorers.append(PropertyScorer(profile, **random_params(rng),
+                                      log_blend=rng.random() < .2))
+    return scorers
+
+
+@pytest.mark.parametrize("seed", range(15))
+@pytest.mark.parametrize("chunk_size", [None, 9, 37])
+def test_score_matrix_rows_match_score_many(seed, chunk_size):
+    rng = random.Random(seed)
+    scorers = _scorers(rng, 12)
+    assert len({sc.plan.keys for sc in scorers}) > 1
+    props, quals = random_properties(rng, random_profile(rng, n_factors=8), 200)
+    columns, qualities = to_columns(random_profile(rng, n_factors=8), props, quals)
+    if seed % 2:
+        columns = {k: RaggedArray.from_lists(c) if isinstance(c, list) else c
+                   for k, c in columns.items()}
+
+    got = score_matrix(scorers, columns, qualities, chunk_size=chunk_size)
+    assert got.shape == (len(scorers), 200)
+    for p, sc in enumerate(scorers):
+        # bit-identical, not just close
+        assert np.array_equal(got[p], sc.score_many(columns, qualities)), p
+
+
+def test_score_matrix_with_no_scorers_or_rows():
+    rng = random.Random(0)
+    props, quals = random_properties(rng, random_profile(rng), 5)
+    columns, qualities = to_columns(random_profile(rng), props, quals)
+    assert score_matrix([], columns, qualities).shape == (0, 5)
+    sc = PropertyScorer(random_profile(rng))
+    empty = {k: (c[:0] if isinstance(c, np.ndarray) else []) for k, c in columns.items()}
+    assert score_matrix([sc], empty).shape == (1, 0)
@@ -0,0 +1,180 @@
+# tests/test_memo.py
+
+import random
+
+import numpy as np
+import pytest
+
+from score import PropertyScorer
+from score.memo import PropertyScoreCache, ScorerCache, nbytes, profile_fingerprint
+
+from .randomized import random_profile, random_properties, to_columns
+
+PROFILE = {
+    "walk": {"mode": "nice_to_have", "target": 8, "lower": 2, "upper": 25,
+             "direction": -1, "weight": 3},
+    "size": {"mode": "must_have", "target": 300.0, "direction": 1, "weight": 2},
+}
+
+
+def _variant(i):
+    """PROFILE with a distinct walk target."""
+    return {**PROFILE, "walk": {**PROFILE["walk"], "target": 8 + i}}
+
+
+def test_fingerprint_ignores_order_spelling_and_defaults():
+    fp = profile_fingerprint(PROFILE)
+    reordered = {"size": dict(reversed(list(PROFILE["size"].items()))),
+                 "walk": {k: float(v) if isinstance(v, int) else v
+                          for k, v in PROFILE["walk"].items()}}
+    assert profile_fingerprint(reordered) == fp
+    assert profile_fingerprint(PROFILE, quality_weight=0.80, max_quality=5) == fp
+    assert profile_fingerprint(PROFILE, quality_weight=0.5) != fp
+    assert profile_fingerprint(_variant(1)) != fp
+    with pytest.raises(TypeError, match="unknown"):
+        profile_fingerprint(PROFILE, qualty_weight=0.5)
+
+
+def test_scorer_hits_reuse_the_compiled_scorer():
+    cache = ScorerCache()
+    first = cache.scorer(PROFILE)
+    assert isinstance(first, PropertyScorer)
+    assert cache.scorer({"size": PROFILE["size"], "walk": PROFILE["walk"]}) is first
+    assert cache.scorer(PROFILE, margin_epsilon=1e-6) is first
+    assert cache.scorer(PROFILE, quality_weight=0.5) is not first
+    info = cache.info()
+    assert (info.hits, info.misses, info.entries) == (2, 2, 2)
+    assert cache.hit_rate == 0.5
+
+
+def test_evaluate_reuses_the_result_while_the_data_key_holds():
+    cache, calls = ScorerCache(), []
+
+    def run(scorer):
+        calls.append(scorer)
+        return np.arange(4.0)
+
+    first = cache.evaluate(PROFILE, "v1", run)
+    assert cache.evaluate(PROFILE, "v1", run) is first
+    assert len(calls) == 1
+    cache.evaluate(PROFILE, "v2", run)
+    assert len(calls) == 2
+    info = cache.info()
+    assert (info.result_hits, info.result_misses) == (1, 2)
+    assert info.nbytes == nbytes(first)
+
+
+def test_max_entries_evicts_least_recently_used():
+    cache = ScorerCache(max_entries=3)
+    scorers = [cache.scorer(_variant(i)) for i in range(3)]
+    cache.scorer(_variant(0))                   # 0 is now the most recent
+    cache.scorer(_variant(3))                   # evicts 1
+    assert len(cache) == 3
+    assert cache.scorer(_variant(0)) is scorers[0]
+    assert cache.scorer(_variant(2)) is scorers[2]
+    misses = cache.info().misses
+    assert cache.scorer(_variant(1)) is not scorers[1]
+    assert cache.info().misses == misses + 1
+
+
+def test_max_bytes_bounds_the_kept_results():
+    size  = nbytes(np.zeros(1000))
+    cache = ScorerCache(max_bytes=2 * size + size // 2)
+    for i in range(4):
+        cache.evaluate(_variant(i), "data", lambda sc: np.zeros(1000))
+        assert cache.info().nbytes <= cache.max_bytes
+    # only the two most recent results fit
+    assert len(cache) == 2
+    hits = cache.result_hits
+    cache.evaluate(_variant(3), "data", lambda sc: np.zeros(1000))
+    assert cache.result_hits == hits + 1
+
+    # a result larger than the whole budget is returned but not kept
+    big = cache.evaluate(_variant(9), "data", lambda sc: np.zeros(10_000))
+    assert len(big) == 10_000
+    assert cache.info().nbytes <= cache.max_bytes
+    misses = cache.result_misses
+    cache.evaluate(_variant(9), "data", lambda sc: np.zeros(10_000))
+    assert cache.result_misses == misses + 1
+
+    cache.clear()
+    assert len(cache) == 0 and cache.info().nbytes == 0
+
+
+def _corpus(seed, n=120):
+    rng = random.Random(seed)
+    profile = random_profile(rng)
+    props, quals = random_properties(rng, profile, n)
+    columns, qualities = to_columns(profile, props, quals)
+    return rng, profile, props, quals, columns, qualities
+
+
+def _from_scratch(profile, props, quals, params):
+    scorer = PropertyScorer(profile, **params)
+    return np.array([scorer.score_property(p, q) for p, q in zip(props, quals)])
+
+
+def test_property_score_cache_results_are_snapshots():
+    rng, profile, props, quals, columns, qualities = _corpus(0)
+    cache = PropertyScoreCache(list(range(len(props))), columns, qualities)
+    first = cache.scores(profile)
+    kept  = first.copy()
+    assert cache.recomputed == 0
+
+    # an upsert, a new property and the rescoring they cause
+    new_raw, new_q = random_properties(rng, profile, 2)
+    assert cache.upsert(3, new_raw[0], new_q[0])
+    assert cache.upsert("new", new_raw[1], new_q[1])
+    second = cache.scores(profile)
+    assert cache.recomputed == 2
+    assert np.array_equal(first, kept)
+    assert len(second) == len(props) + 1
+
+    # an unchanged upsert invalidates nothing
+    assert not cache.upsert(3, new_raw[0], new_q[0])
+    third = cache.scores(profile)
+    assert cache.recomputed == 0
+    assert third is not second and np.array_equal(third, second)
+
+    # writing to a result does not reach the cache either
+    third[:] = -1.0
+    assert np.array_equal(cache.scores(profile), second)
+    assert cache.score(3, profile) == second[3]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_property_score_cache_tracks_upserts(seed):
+    rng, profile, props, quals, columns, qualities = _corpus(seed)
+    profiles = [(profile, {}), (profile, {"quality_weight": 0.5}), (random_profile(rng), {})]
+    cache = PropertyScoreCache(list(range(len(props))), columns, qualities)
+    props, quals = list(props), list(quals)
+    upserted = set()
+    pending  = [None] * len(profiles)          # rows changed since each profile's last call
+    history  = []
+    for step in range(15):
+        for _ in range(rng.randint(0, 4)):
+            row = rng.randrange(len(props) + 1)
+            if row < len(props) and rng.random() < .3:
+                raw, q = props[row], quals[row]          # same content again
+            else:
+                (raw,), (q,) = random_properties(rng, profile, 1)
+            if row == len(props):
+                props.append(raw)
+                quals.append(q)
+            else:
+                props[row], quals[row] = raw, q
+            if cache.upsert(row, raw, q):
+                upserted.add(row)
+                for rows in pending:
+                    if rows is not None:
+                        rows.add(row)
+        i = step % len(profiles) if step < 9 else rng.randrange(len(profiles))
+        prof, params = profiles[i]
+        got = cache.scores(prof, **params)
+        assert np.array_equal(got, _from_scratch(prof, props, quals, params))
+        # a fresh profile scores the batch and then every upserted row
+        assert cache.recomputed == len(upserted if pending[i] is None else pending[i])
+        pending[i] = set()
+        history.append((got, got.copy()))
+        for result, snapshot in history:
+            assert np.array_equal(result, snapshot)
@@ -0,0 +1,73 @@
+# tests/test_parallel.py
+
+import random
+
+import numpy as np
+
+from score import ParallelScorer, PropertyScorer, SharedBatch, SortedRagged
+from score.columns import COMPACT_DTYPE, compact, presort
+from score.parallel import attach_batch
+
+from .randomized import random_params, random_profile, random_properties, to_columns
+
+
+def _presorted_batch(seed):
+    rng = random.Random(seed)
+    profile = random_profile(rng)
+    scorer  = PropertyScorer(profile, **random_params(rng))
+    props, quals = random_properties(rng, profile, 300)
+    columns, qualities = to_columns(profile, props, quals)
+    return scorer, presort(columns), qualities
+
+
+def _check_sorted(attached, columns):
+    keys = [key for key, col in columns.items() if isinstance(col, SortedRagged)]
+    assert keys
+    for key in keys:
+        got, col = attached[key], columns[key]
+        assert isinstance(got, SortedRagged)
+        assert np.array_equal(got.csum, col.csum)
+        assert np.array_equal(got.slice(7, 90).csum, col.slice(7, 90).csum)
+        taken = got.take(np.array([5, 2, 40]))
+        assert np.array_equal(taken.csum, SortedRagged(taken.values, taken.offsets).csum)
+
+
+def test_shared_batch_keeps_sorted_columns():
+    _, columns, qualities = _presorted_batch(0)
+    with SharedBatch(columns, qualities) as batch:
+        block, attached, _ = attach_batch(batch.spec)
+        try:
+            _check_sorted(attached, columns)
+        finally:
+            del attached
+            block.close()
+
+
+def test_parallel_matches_single_process_on_presorted_batch():
+    for seed in range(3):
+        scorer, columns, qualities = _presorted_batch(seed)
+        with ParallelScorer(columns, qualities, workers=2, shard_size=64) as pool:
+            assert np.array_equal(pool.score_many(scorer), scorer.score_many(columns, qualities))
+
+
+def test_shared_batch_keeps_compact_dtype():
+    rng = random.Random(1)
+    profile = random_profile(rng)
+    scorer  = PropertyScorer(profile, **random_params(rng))
+    props, quals = random_properties(rng, profile, 300)
+    columns, qualities = to_columns(profile, props, quals)
+    small = compact(columns)
+    with SharedBatch(small, qualities) as batch:
+        block, attached, _ = attach_batch(batch.spec)
+        try:
+            for key, col in small.items():
+                got = attached[key]
+                if isinstance(col, np.ndarray):
+                    assert got.dtype == COMPACT_DTYPE
+                else:
+                    assert got.values.dtype == col.values.dtype == COMPACT_DTYPE
+        finally:
+            del attached, got
+            block.close()
+    with ParallelScorer(small, qualities, workers=2, shard_size=64) as pool:
+        assert np.array_equal(pool.score_many(scorer), scorer.score_many(small, qualities))
@@ -0,0 +1,42 @@
+# tests/test_parity.py
+
+"""The batch paths must equal score_property bit for bit."""
+
+import random
+
+import numpy as np
+import pytest
+
+from score import PropertyScorer, RaggedArray
+
+from .randomized import random_params, random_profile, random_properties, to_columns
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_score_many_matches_score_property(seed):
+    rng = random.Random(seed)
+    profile = random_profile(rng)
+    scorer  = PropertyScorer(profile, **random_params(rng))
+    props, quals = random_properties(rng, profile)
+    columns, qualities = to_columns(profile, props, quals)
+
+    expected = np.array([scorer.score_property(p, q) for p, q in zip(props, quals)])
+    assert np.array_equal(scorer.score_many(columns, qualities), expected)
+    assert np.array_equal(scorer.evaluate(columns, qualities).scores, expected)
+
+    packed = {k: RaggedArray.from_lists(c) if isinstance(c, list) else c
+              for k, c in columns.items()}
+    assert np.array_equal(scorer.score_many(packed, qualities), expected)
+
+
+def test_parity_covers_must_have_failures():
+    failed = 0
+    for seed in range(60):
+        rng = random.Random(seed)
+        profile = random_profile(rng)
+        scorer  = PropertyScorer(profile, **random_params(rng))
+        props, quals = random_properties(rng, profile)
+        columns, qualities = to_columns(profile, props, quals)
+        result = scorer.evaluate(columns, qualities)
+        failed += int((result.failed_on >= 0).sum())
+    assert failed > 0
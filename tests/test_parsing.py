@@ -0,0 +1,113 @@
+# tests/test_parsing.py
+
+import json
+import random
+
+import pytest
+
+from score.parsing import (MultiPathExtractor, _parse_text, clear_parse_cache,
+                           decode_poi_list, extract_multi_path, parse_cache_info,
+                           parse_numeric)
+
+CELLS = [
+    "12 mins", "12 Mins", " 12 mins ", "1 hour 15 mins", "2 hr", "90 sec", "1h 2m 30s",
+    "2.3 km", "500 m", "0.8km", "42", "3.5", "about 7 mins walk", "n/a", "", "km",
+    "1.2.3", "approx 1 hour", "5 m", "10 mins (bus)", "1 hr 5 min", "7 hours",
+]
+
+
+def _uncached(cell):
+    return _parse_text(cell.strip().lower())
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_parse_cache()
+    yield
+    clear_parse_cache()
+
+
+def test_cached_parse_equals_uncached():
+    rng = random.Random(0)
+    cells = [rng.choice(CELLS) for _ in range(500)]
+    cells += [f"{rng.uniform(0, 90):.{rng.randint(0, 3)}f} {rng.choice(['mins', 'km', 'm', 'hr', ''])}"
+              for _ in range(500)]
+    for cell in cells + cells:
+        assert parse_numeric(cell) == _uncached(cell), cell
+
+
+def test_parse_cache_counts_hits_and_misses():
+    cells = CELLS * 3
+    for cell in cells:
+        parse_numeric(cell)
+    info = parse_cache_info()
+    assert info.misses == info.currsize == len(set(CELLS))
+    assert info.hits == len(cells) - len(set(CELLS))
+
+    # numbers and non-strings never reach the cache
+    parse_numeric(4.5)
+    parse_numeric(None)
+    assert parse_cache_info() == info
+
+
+def test_clear_parse_cache():
+    for cell in CELLS:
+        parse_numeric(cell)
+    assert parse_cache_info().currsize
+    clear_parse_cache()
+    info = parse_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (0, 0, 0)
+    assert parse_numeric("12 mins") == 12.0
+    assert parse_cache_info().misses == 1
+
+
+PATHS = ["walking.travel_time", "walking.distance", "driving.travel_time", "rating", "walking"]
+
+
+def _leaf(rng):
+    return rng.choice([f"{rng.randint(1, 60)} mins", f"{rng.uniform(0, 5):.2f} km", "500 m",
+                       rng.uniform(0, 30), rng.randint(0, 9), None, "n/a", [3], {"x": 1}])
+
+
+def _poi(rng):
+    poi = {}
+    for mode in ("walking", "driving"):
+        r = rng.random()
+        if r < .7:
+            poi[mode] = {"travel_time": _leaf(rng), "distance": _leaf(rng)}
+        elif r < .8:
+            poi[mode] = _leaf(rng)
+    if rng.random() < .5:
+        poi["rating"] = _leaf(rng)
+    return poi if rng.random() < .95 else rng.choice(["oops", 4, None])
+
+
+def _cell(rng):
+    pois = [_poi(rng) for _ in range(rng.randint(0, 6))]
+    r = rng.random()
+    if r < .6:
+        return json.dumps(pois)
+    if r < .75:
+        return pois
+    return rng.choice([None, float("nan"), "{}", "3", "null", '"walking"', '{"walking": 1}', 7])
+
+
+def test_decode_poi_list_only_returns_lists():
+    assert decode_poi_list('[{"a": 1}]') == [{"a": 1}]
+    assert decode_poi_list([{"a": 1}]) == [{"a": 1}]
+    for cell in ("{}", '{"walking": {"travel_time": "5 mins"}}', "3", "null", '"abc"',
+                 None, float("nan"), 7, {"a": 1}):
+        assert decode_poi_list(cell) == []
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_multi_path_extractor_matches_extract_multi_path(seed):
+    rng = random.Random(seed)
+    cells = [_cell(rng) for _ in range(300)]
+    paths = rng.sample(PATHS, rng.randint(1, len(PATHS)))
+    got = MultiPathExtractor(paths).extract(cells)
+    assert len(got) == len(paths)
+    for path, ragged in zip(paths, got):
+        assert len(ragged) == len(cells)
+        expected = [extract_multi_path(decode_poi_list(cell), path) for cell in cells]
+        assert ragged.tolist() == expected, path
@@ -0,0 +1,60 @@
+# tests/test_profile_config.py
+
+import pytest
+
+testing = pytest.importorskip("streamlit.testing.v1")
+
+AMENITIES = ["train_dist", "hospital_dist", "supermarket_dist", "park_dist", "school_dist"]
+
+
+def _app():
+    import streamlit as st
+    import ui.components.profile_config as pc
+    from score.config import FactorConfig
+
+    # a min time of 0.5 makes the amenity's own config fail to build
+    def failing(*args, **kwargs):
+        if kwargs.get("target") == 0.5:
+            raise ValueError("rejected")
+        return FactorConfig(*args, **kwargs)
+
+    pc.FactorConfig = failing
+    try:
+        profile, _ = pc.create_profile_config({})
+    finally:
+        pc.FactorConfig = FactorConfig
+    for key, cfg in profile.items():
+        st.write(f"{key}={cfg['mode']}")
+
+
+def _modes(at):
+    return dict(m.value.split("=") for m in at.markdown if "=" in m.value)
+
+
+def _run(at):
+    at.run(timeout=30)
+    assert not at.exception
+    return _modes(at)
+
+
+def test_amenity_yes_is_nice_to_have():
+    at = testing.AppTest.from_function(_app)
+    modes = _run(at)
+    # every amenity defaults to "yes", school_dist's FACTORS mode is must_have
+    assert all(modes[key] == "nice_to_have" for key in AMENITIES)
+
+    at.radio(key="need_school_dist").set_value("no")
+    assert _run(at)["school_dist"] == "irrelevant"
+    at.radio(key="need_school_dist").set_value("yes")
+    assert _run(at)["school_dist"] == "nice_to_have"
+
+
+def test_amenity_yes_fallback_keeps_nice_to_have():
+    at = testing.AppTest.from_function(_app)
+    _run(at)
+    # no last valid config: the fallback is built from the FACTORS defaults
+    at.session_state["last_valid_config"] = {}
+    at.number_input(key="school_dist_lower").set_value(0.5)
+    modes = _run(at)
+    assert any("rejected" in e.value for e in at.error)
+    assert modes["school_dist"] == "nice_to_have"
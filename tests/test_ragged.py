@@ -0,0 +1,103 @@
+# tests/test_ragged.py
+
+"""
+SortedRagged's presorted aggregates against the RaggedArray reductions,
+with empty, missing, single-element and all-NaN rows in the mix.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from score import PropertyScorer, RaggedArray, SortedRagged
+from score.ragged import aggregate
+
+from .randomized import AGGREGATIONS, DECAYS
+
+# order-only aggregates must match bit for bit; the means go through
+# prefix-sum differences (or a sorted-order decay sum) and may not
+EXACT = {"min", "max", "median", "percentile"}
+
+
+def _rows(rng, n=300):
+    rows = []
+    for _ in range(n):
+        kind = rng.random()
+        if kind < .1:
+            rows.append(None)
+        elif kind < .2:
+            rows.append([])
+        elif kind < .35:
+            rows.append([round(rng.uniform(0, 35), 1)])
+        elif kind < .45:
+            rows.append([float("nan")] * rng.randint(1, 4))
+        else:
+            row = [round(rng.uniform(0, 35), rng.choice([0, 2])) for _ in range(rng.randint(2, 12))]
+            if rng.random() < .2:
+                row[rng.randrange(len(row))] = float("nan")
+            rows.append(row)
+    return rows
+
+
+def _plan(rng, agg, decay=None):
+    t = rng.uniform(5, 20)
+    cfg = {"mode": "nice_to_have", "target": t, "lower": t - rng.uniform(0, 8),
+           "upper": t + rng.uniform(0, 15), "direction": -1, "weight": 1, "multi": True,
+           "aggregation": agg, "nearest_k": rng.choice([1, 2, 3]),
+           "farthest_k": rng.choice([1, 2, 3]), "percentile": rng.choice([0.1, 0.5, 0.9])}
+    if decay:
+        cfg.update(decay_function=decay, decay_rate=rng.choice([0.5, 1.0, 2.0]))
+    return PropertyScorer({"f": cfg}).plan["f"]
+
+
+def _check(rows, fp, agg):
+    r = RaggedArray.from_lists(rows)
+    s = SortedRagged.from_lists(rows)
+    want, got = aggregate(r, fp), aggregate(s, fp)
+    assert np.array_equal(np.isnan(got), np.isnan(want))
+    if agg in EXACT:
+        assert np.array_equal(got, want, equal_nan=True)
+    else:
+        np.testing.assert_allclose(got, want, rtol=1e-13, atol=1e-13)
+    # missing, empty and all-NaN rows aggregate to NaN
+    for i, row in enumerate(rows):
+        if not row or all(v != v for v in row):
+            assert np.isnan(got[i])
+
+
+@pytest.mark.parametrize("agg", AGGREGATIONS)
+def test_sorted_aggregates_match_ragged(agg):
+    rng = random.Random(agg)
+    rows = _rows(rng)
+    for _ in range(10):
+        _check(rows, _plan(rng, agg), agg)
+
+
+@pytest.mark.parametrize("decay", DECAYS)
+def test_sorted_decay_means_match_ragged(decay):
+    rng = random.Random(decay)
+    rows = _rows(rng)
+    for _ in range(10):
+        _check(rows, _plan(rng, "mean", decay), "decay")
+
+
+@pytest.mark.parametrize("agg", AGGREGATIONS)
+def test_sorted_edge_rows(agg):
+    rng = random.Random(0)
+    fp = _plan(rng, agg)
+    inside = (fp.lower + fp.upper) / 2
+    rows = [[], None, [inside], [float("nan")], [float("nan")] * 3, [fp.lower], [fp.upper],
+            [fp.lower - 1], [inside, float("nan")], [], [inside]]
+    _check(rows, fp, agg)
+    # all-empty and all-missing columns
+    _check([[], [], []], fp, agg)
+    _check([None, None], fp, agg)
+    _check([], fp, agg)
+
+
+def test_sorted_csum_restarts_every_row():
+    rows = [[3.0, 1.0], [], [2.0], None, [5.0, 4.0, 6.0]]
+    s = SortedRagged.from_lists(rows)
+    assert s.values.tolist() == [1.0, 3.0, 2.0, 4.0, 5.0, 6.0]
+    assert s.csum.tolist() == [1.0, 4.0, 2.0, 4.0, 9.0, 15.0]
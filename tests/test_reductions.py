@@ -0,0 +1,120 @@
+# tests/test_reductions.py
+
+"""
+score_property's aggregates use the batch kernels' arithmetic; they stay
+within a few ulp of the statistics.mean / np.percentile reductions the
+scorer used before, and whole scores within rounding of them.
+"""
+
+import math
+import random
+import statistics
+
+import numpy as np
+import pytest
+
+from score import PropertyScorer
+from score.plan import (AGG_K_FARTHEST, AGG_K_NEAREST, AGG_MAX, AGG_MEAN, AGG_MEDIAN,
+                        AGG_MIN, AGG_PERCENTILE, DECAY_EXP, DECAY_QUADRATIC)
+from score.scorer import _mean, _percentile
+
+from .randomized import random_params, random_profile, random_properties
+
+# a few ulp of the aggregated value
+AGG_RTOL = 8 * np.finfo(float).eps
+SCORE_ATOL = 1e-9
+
+
+def _reference_decay(vals, fp):
+    rate, t, span = fp.decay_rate, fp.target, fp.decay_span
+    dists = [abs(v - t) / span for v in vals]
+    if fp.decay == DECAY_EXP:
+        weights = [math.exp(-rate * d) for d in dists]
+    elif fp.decay == DECAY_QUADRATIC:
+        weights = [max(0.0, 1.0 - (rate * d) ** 2) for d in dists]
+    else:
+        weights = [max(0.0, 1.0 - rate * d) for d in dists]
+    total_w = sum(weights)
+    if not total_w:
+        return statistics.mean(vals)
+    return sum(v * w for v, w in zip(vals, weights)) / total_w
+
+
+class ReferenceScorer(PropertyScorer):
+    """PropertyScorer with the reference reductions in _aggregate."""
+
+    def _aggregate(self, vals, fp):
+        in_band = [v for v in vals if fp.lower <= v <= fp.upper]
+        if not in_band:
+            return None
+        if fp.decay:
+            return _reference_decay(in_band, fp)
+        agg = fp.agg
+        if agg == AGG_MEDIAN:
+            return statistics.median(in_band)
+        if agg == AGG_MIN:
+            return min(in_band)
+        if agg == AGG_MAX:
+            return max(in_band)
+        if agg == AGG_K_NEAREST:
+            return statistics.mean(sorted(in_band)[:fp.nearest_k])
+        if agg == AGG_K_FARTHEST:
+            return statistics.mean(sorted(in_band, reverse=True)[:fp.farthest_k])
+        if agg == AGG_PERCENTILE:
+            return float(np.percentile(in_band, fp.pct))
+        assert agg == AGG_MEAN
+        return statistics.mean(in_band)
+
+
+def _lists(rng, count=300):
+    for _ in range(count):
+        n = rng.randint(1, 40)
+        scale = rng.choice([1e-3, 1.0, 35.0, 1e6])
+        yield [rng.uniform(-scale, scale) if rng.random() < .2 else rng.uniform(0, scale)
+               for _ in range(n)]
+
+
+def test_mean_within_ulps_of_statistics_mean():
+    rng = random.Random(3)
+    for vals in _lists(rng):
+        ref = statistics.mean(vals)
+        scale = max(abs(v) for v in vals)
+        assert abs(_mean(vals) - ref) <= AGG_RTOL * len(vals) * scale
+
+
+@pytest.mark.parametrize("pct", [0.0, 10.0, 33.0, 50.0, 90.0, 100.0])
+def test_percentile_within_ulps_of_np_percentile(pct):
+    rng = random.Random(int(pct))
+    for vals in _lists(rng):
+        vals.sort()
+        ref = float(np.percentile(vals, pct))
+        assert _percentile(vals, pct) == pytest.approx(ref, rel=AGG_RTOL, abs=AGG_RTOL * abs(vals[-1]))
+
+
+def test_percentile_exact_on_sample_points():
+    vals = sorted(random.Random(0).uniform(0, 35) for _ in range(11))
+    for i, v in enumerate(vals):
+        assert _percentile(vals, i * 10.0) == v
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_scores_close_to_reference_reductions(seed):
+    rng = random.Random(seed)
+    profile = random_profile(rng)
+    params  = random_params(rng)
+    props, quals = random_properties(rng, profile, 150)
+    scorer, ref = PropertyScorer(profile, **params), ReferenceScorer(profile, **params)
+    for fp in scorer.plan.factors:
+        if not fp.multi:
+            continue
+        for p in props:
+            vals = p.get(fp.key)
+            if not vals:
+                continue
+            got, want = scorer._aggregate(vals, fp), ref._aggregate(vals, fp)
+            assert (got is None) == (want is None)
+            if got is not None:
+                assert got == pytest.approx(want, rel=AGG_RTOL, abs=AGG_RTOL * max(map(abs, vals)))
+    got  = np.array([scorer.score_property(p, q) for p, q in zip(props, quals)])
+    want = np.array([ref.score_property(p, q) for p, q in zip(props, quals)])
+    np.testing.assert_allclose(got, want, rtol=0, atol=SCORE_ATOL)
@@ -0,0 +1,78 @@
+# tests/test_top_k.py
+
+"""
+Every top-k path returns the first k of a stable best-first sort of the
+score_property scores: same ids, same scores, ties in input order.
+"""
+
+import random
+
+import pytest
+
+from score import ParallelScorer, PropertyScorer
+from score.pipeline import TopK
+
+from .randomized import random_params, random_profile, random_properties, to_columns
+
+KS = [0, 1, 2, 5, 17, 64, 250, 1000]
+
+
+def _batch(seed, n=250):
+    """A random batch with every fifth property repeated later on, so scores tie."""
+    rng = random.Random(seed)
+    profile = random_profile(rng)
+    scorer  = PropertyScorer(profile, **random_params(rng))
+    props, quals = random_properties(rng, profile, n)
+    for i in range(0, n, 5):
+        j = rng.randrange(n)
+        props[j], quals[j] = props[i], quals[i]
+    return scorer, profile, props, quals
+
+
+def _expected(scorer, props, quals, k):
+    scores = [scorer.score_property(p, q) for p, q in zip(props, quals)]
+    order  = sorted(range(len(scores)), key=lambda i: -scores[i])
+    return [(i, scores[i]) for i in order[:k]]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_top_k_matches_stable_sort(seed):
+    scorer, _, props, quals = _batch(seed)
+    ids = {i: p for i, p in enumerate(props)}
+    qs  = {i: q for i, q in enumerate(quals)}
+    for k in KS:
+        assert scorer.top_k(ids, k, qs) == _expected(scorer, props, quals, k)
+
+
+def test_top_k_breaks_ties_by_input_order():
+    scorer, _, props, quals = _batch(0)
+    same = [(props[0], quals[0])] * 9
+    ids  = {f"p{i}": p for i, (p, _) in enumerate(same)}
+    qs   = {f"p{i}": q for i, (_, q) in enumerate(same)}
+    got  = scorer.top_k(ids, 4, qs)
+    assert [pid for pid, _ in got] == ["p0", "p1", "p2", "p3"]
+    assert len({score for _, score in got}) == 1
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("chunk", [1, 7, 64, 1000])
+def test_top_k_sink_over_chunks_matches_stable_sort(seed, chunk):
+    scorer, profile, props, quals = _batch(seed)
+    columns, qualities = to_columns(profile, props, quals)
+    scores = scorer.score_many(columns, qualities)
+    for k in KS:
+        sink = TopK(k)
+        for start in range(0, len(props), chunk):
+            sink.push(list(range(start, min(start + chunk, len(props)))),
+                      scores[start:start + chunk])
+        assert sink.results() == _expected(scorer, props, quals, k)
+
+
+def test_parallel_top_k_matches_stable_sort():
+    for seed in range(3):
+        scorer, profile, props, quals = _batch(seed)
+        columns, qualities = to_columns(profile, props, quals)
+        with ParallelScorer(columns, qualities, workers=2, shard_size=40) as pool:
+            for k in KS:
+                got = pool.top_k(scorer, k)
+                assert [(int(row), s) for row, s in got] == _expected(scorer, props, quals, k)
@@ -2,20 +2,47 @@
 
 import streamlit as st
 import pandas as pd
-import sys
-from io import StringIO
 from datetime import datetime
 
-from score.scorer import PropertyScorer
-from ui.config      import FACTORS
+from score.columns     import columns_from_records
+from score.incremental import IncrementalScorer
+from score.memo        import ScorerCache
+from score.pipeline    import scoring_profile
+from score.trace       import TraceView
+from ui.config         import FACTORS, OPTIONAL_DEFAULTS
 
-def capture_output(func, *args, **kwargs):
-    """Capture stdout from func."""
-    old, sys.stdout = sys.stdout, StringIO()
-    result = func(*args, **kwargs)
-    txt    = sys.stdout.getvalue()
-    sys.stdout = old
-    return result, txt
+def _scoring_profile(profile):
+    """
+    Add each multi-POI factor's aggregation settings from FACTORS to the
+    profile built in the UI, so the scorer aggregates as configured.
+    """
+    return scoring_profile(profile, FACTORS, OPTIONAL_DEFAULTS)
+
+def _engine(properties_data, qualities_data, multi_keys):
+    """
+    Session-wide IncrementalScorer over the current property data, rebuilt
+    only when the data changes, so re-running after a profile tweak only
+    recomputes the factors that changed.
+    """
+    data   = (properties_data, qualities_data)
+    cached = st.session_state.get("scoring_engine")
+    if cached is not None and cached[0] == data:
+        return cached[1]
+
+    records = list(properties_data.values())
+    keys    = {k for rec in records for k in rec}
+    columns = columns_from_records(records, keys, multi_keys & keys)
+    quals   = columns_from_records(list(qualities_data.values()), keys)
+    engine  = IncrementalScorer(columns, quals)
+    st.session_state.scoring_engine = (data, engine)
+    return engine
+
+def _scorer_cache():
+    """Session-wide ScorerCache of compiled scorers and their last results."""
+    cache = st.session_state.get("scorer_cache")
+    if cache is None:
+        cache = st.session_state.scorer_cache = ScorerCache()
+    return cache
 
 def _color_scale(val):
     """
@@ -42,102 +69,48 @@ def run_calculation(profile,
     if not st.button("Run Calculation"):
         return None, None
 
-    scorer = PropertyScorer(
-        profile,
-        must_have_tolerance=scorer_params["must_have_tolerance"],
-        margin_epsilon=   scorer_params["margin_epsilon"],
-        quality_floor=    scorer_params["quality_floor"],
-        quality_weight=   scorer_params["quality_weight"],
-    )
-
     multi_keys   = {k for k, v in FACTORS.items() if v.get("multi")}
     order        = st.session_state.property_order
     priority_map = st.session_state.priority_map
 
+    # ─── Compute all scores ─────────────────────────────────────────
+    addrs  = list(properties_data)
+    engine = _engine(properties_data, qualities_data, multi_keys)
+    cache  = _scorer_cache()
+    res    = cache.evaluate(_scoring_profile(profile), engine,
+                            lambda scorer: engine.evaluate(scorer, trace=True), **scorer_params)
+
     results       = {}
-    verbose       = {}
     factor_scores = {}
-
-    # ─── Compute all scores ─────────────────────────────────────────
-    for addr in order:
-        raw  = properties_data[addr]
-        qual = qualities_data[addr]
-
-        raw2 = {}
-        lines = [f"\n─ Property: {addr} (Priority {priority_map.get(addr,'')}) ─"]
-
-        # aggregate or pass through
-        for key, x in raw.items():
-            cfg   = profile[key]
-            label = FACTORS[key]["label"]
-
-            if key in multi_keys:
-                lows, highs = cfg["lower"], cfg["upper"]
-                orig = x or []
-                in_range = [d for d in orig if lows <= d <= highs]
-                avg = sum(in_range)/len(in_range) if in_range else None
-                lines.append(f"{label}: all={orig}, in-band={in_range}")
-                if avg is not None:
-                    raw2[key] = avg
-                    lines.append(f"  → avg={avg:.3f}")
-                else:
-                    raw2[key] = highs + 1.0
-                    lines.append(f"  → none in range → force raw=0")
-            else:
-                raw2[key] = x
-                lines.append(f"{label}: x={x}")
-
-        total_w = 0.0
-        sum_wfs = 0.0
-        fs_map  = {}
-
-        # score each factor
-        for key, x2 in raw2.items():
-            cfg   = profile[key]
-            label = FACTORS[key]["label"]
-            r     = scorer._raw(x2, cfg)
-            if r is None:
-                continue
-            if cfg["mode"] == "must_have" and r == 0.0:
-                lines.append(f"{label}: must-have failed → total=0")
-                results[addr] = 0.0
-                fs_map = {k: 0.0 for k in profile}
-                break
-
-            q = qual.get(key)
-            if q is None:
-                fs = r
-                lines.append(f"  • {label} raw-only: r={r:.3f} → fs={fs:.3f}")
-            else:
-                qn = scorer._qual(q)
-                fs = (r ** (1 - scorer.q_weight)) * (qn ** scorer.q_weight)
-                lines.append(f"  • {label} blended: r={r:.3f}, qn={qn:.3f} → fs={fs:.3f}")
-
-            fs_map[key]    = fs
-            sum_wfs       += cfg["weight"] * fs
-            total_w       += cfg["weight"]
+    for i, addr in enumerate(addrs):
+        results[addr] = float(res.scores[i])
+        if res.failed_on[i] >= 0:
+            factor_scores[addr] = {k: 0.0 for k in res.factors}
         else:
-            final = (sum_wfs / total_w) if total_w else 0.0
-            results[addr] = final
-            lines.append(f"→ Final score = {final:.3f}")
+            factor_scores[addr] = res.row(i)
 
-        verbose[addr]       = "\n".join(lines)
-        factor_scores[addr] = fs_map
+    # trace text is formatted only when an expander asks for it
+    labels  = {k: FACTORS[k]["label"] for k in res.factors}
+    verbose = TraceView(addrs, res.trace, res.factors, res.scores, labels)
 
     # ─── Save history ────────────────────────────────────────────────
     if "history" not in st.session_state:
         st.session_state.history = []
     st.session_state.history.append({
         "timestamp":       datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "profile":         profile.copy(),
+        "profile":         profile.copy(),          # FactorConfigs are immutable
         "properties":      properties_data.copy(),
         "qualities":       qualities_data.copy(),
-        "params":          scorer_params.copy(),
+        "params":          scorer_params,
         "results":         results.copy(),
-        "verbose_outputs": verbose.copy(),
+        "verbose_outputs": verbose,
         "active_props":    active_properties.copy(),
     })
 
+    info = cache.info()
+    st.caption(f"Scorer cache: {cache.hit_rate:.0%} hit rate, {info.result_hits} reused results, "
+               f"{info.entries} configurations, {info.nbytes / 2**20:.1f} MB")
+
     # ─── Display a legend for score colors ───────────────────────────
     st.markdown("**Score color scale**")
     legend_html = """
@@ -1,9 +1,30 @@
 # ui/components/profile_config.py
 
 import streamlit as st
+from score.config import FactorConfig, ScorerParams
 from ui.config import FACTORS
 
-def create_property_inputs(factor_key: str, defaults: dict) -> dict:
+# mode of an amenity answered "yes"
+AMENITY_MODE = "nice_to_have"
+
+def _checked(name: str, label: str, build, fallback):
+    """
+    Build a FactorConfig / ScorerParams from the current inputs. Bad input
+    is shown with st.error and the last valid one (else `fallback()`) is
+    used instead, so the page keeps rendering.
+    """
+    valid = st.session_state.setdefault("last_valid_config", {})
+    try:
+        value = build()
+    except ValueError as e:
+        st.error(f"{label}: {e}. Using the last valid settings.")
+        value = valid.get(name)
+        return fallback() if value is None else value
+    valid[name] = value
+    return value
+
+
+def create_property_inputs(factor_key: str, defaults: dict) -> FactorConfig:
     """
     Render full inputs for non-amenity factors:
       Mode, Target, Lower, Upper, Direction, Weight
@@ -57,14 +78,15 @@ def create_property_inputs(factor_key: str, defaults: dict) -> dict:
                 key=f"{factor_key}_upper"
             )
 
-    return {
-        "mode":      mode,
-        "target":    target,
-        "lower":     lower,
-        "upper":     upper,
-        "direction": direction,
-        "weight":    weight,
-    }
+    return _checked(factor_key, label, lambda: FactorConfig(
+        mode=     mode,
+        target=   target,
+        lower=    lower,
+        upper=    upper,
+        direction=direction,
+        weight=   weight,
+        factor=   factor_key,
+    ), lambda: FactorConfig(**defaults))
 
 
 def create_profile_config(active_properties: dict):
@@ -119,18 +141,19 @@ def create_profile_config(active_properties: dict):
                     value=float(defaults["weight"]),
                     key=f"{key}_weight"
                 )
-            profile[key] = {
-                "mode":      "nice_to_have",
-                "target":    min_t,
-                "lower":     min_t,
-                "upper":     max_t,
-                "direction": direction,
-                "weight":    weight,
-            }
+            # "yes" is always a nice_to_have band, fallback included
+            # (school_dist defaults to must_have)
+            profile[key] = _checked(key, base_label, lambda: FactorConfig(
+                mode=     AMENITY_MODE,
+                target=   min_t,
+                lower=    min_t,
+                upper=    max_t,
+                direction=direction,
+                weight=   weight,
+                factor=   key,
+            ), lambda: FactorConfig(**{**defaults, "mode": AMENITY_MODE}, factor=key))
         else:
-            cfg = defaults.copy()
-            cfg["mode"] = "irrelevant"
-            profile[key] = cfg
+            profile[key] = FactorConfig(**defaults).replace(mode="irrelevant")
 
         st.divider()
 
@@ -176,11 +199,11 @@ def create_profile_config(active_properties: dict):
             help="Blend raw vs quality (0=raw only,1=quality only)"
         )
 
-    scorer_params = {
-        "must_have_tolerance": must_have_tolerance,
-        "margin_epsilon":      margin_epsilon,
-        "quality_floor":       quality_floor,
-        "quality_weight":      quality_weight,
-    }
+    scorer_params = _checked("scorer_params", "PropertyScorer parameters", lambda: ScorerParams(
+        must_have_tolerance=must_have_tolerance,
+        margin_epsilon=     margin_epsilon,
+        quality_floor=      quality_floor,
+        quality_weight=     quality_weight,
+    ), ScorerParams)
 
     return profile, scorer_params